@@ -0,0 +1,10 @@
+"""
+Benchmark suite for master-agent and the MCP gateway
+
+Run from the repository root:
+
+    python -m benchmarks                       # load + micro, print a report
+    python -m benchmarks --save-baseline local # store benchmarks/baselines/local.json
+    python -m benchmarks --compare local       # exit 1 on regression against it
+    python -m benchmarks --compare reference   # against the committed baseline (1 CPU, stub agents)
+"""
@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from .harness import LocalStack
+from .load import run_load
+from .micro import run_micro
+from .stats import compare, environment, format_table, load_baseline, save_baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Super Agent benchmark suite")
+    parser.add_argument("--suite", choices=["all", "load", "micro"], default="all")
+    parser.add_argument("--only", action="append", help="Run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per load scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each load scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent load-generator workers")
+    parser.add_argument("--agent-latency-ms", type=float, default=0.0, help="Delay added by each stub agent")
+    parser.add_argument("--gateway-workers", type=int, default=1, help="MCP gateway worker processes")
+    parser.add_argument("--iterations", type=int, default=10000, help="Calls per microbenchmark")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Store the report as benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Baseline name or path to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative throughput drop / p50, p99 growth before a regression")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    report = {
+        "environment": environment(),
+        "settings": {
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "agent_latency_ms": args.agent_latency_ms,
+            "gateway_workers": args.gateway_workers,
+            "iterations": args.iterations,
+        },
+        "results": {},
+    }
+
+    if args.suite in ("all", "micro"):
+        print("🔬 Microbenchmarks")
+        report["results"].update(run_micro(args.iterations, args.only))
+
+    if args.suite in ("all", "load"):
+        print("🚀 Load (master-agent + mcp-gateway, stub agents and tools)")
+        with LocalStack(agent_latency_ms=args.agent_latency_ms, gateway_workers=args.gateway_workers) as stack:
+            report["results"].update(asyncio.run(
+                run_load(stack, args.concurrency, args.duration, args.warmup, args.only)
+            ))
+
+    print()
+    print(format_table(report["results"], baseline))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved: {save_baseline(args.save_baseline, report)}")
+
+    if baseline is not None:
+        if baseline.get("settings") != report["settings"]:
+            print("\n⚠️ Baseline was recorded with different settings; comparison is indicative only")
+        regressions = compare(baseline, report, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions beyond {args.tolerance:.0%}:")
+            for name, metric, before, after in regressions:
+                print(f"   {name} {metric}: {before:,.3f} -> {after:,.3f}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
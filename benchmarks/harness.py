@@ -0,0 +1,219 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterator, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MASTER_DIR = REPO_ROOT / "master-agent"
+GATEWAY_DIR = REPO_ROOT / "mcp-gateway"
+POLICY_PATH = REPO_ROOT / "config" / "security-policy.json"
+
+for _path in (MASTER_DIR, GATEWAY_DIR):
+    if str(_path) not in sys.path:
+        sys.path.append(str(_path))
+
+BENCH_SECRET = "benchmark-secret"
+
+
+class StubAgent:
+    """Answers every task after a fixed delay, so runs measure the stack rather than a model"""
+
+    cacheable = True
+
+    def __init__(self, name: str, latency_ms: float = 0.0):
+        self.name = name
+        self.latency = latency_ms / 1000
+
+    def get_status(self):
+        return {"name": self.name, "status": "ready", "stub": True}
+
+    async def handle(self, task):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return {"agent": self.name, "answer": f"stub answer to {task.get('description', '')[:32]}", "confidence": 0.9}
+
+
+def stub_factories(latency_ms: float = 0.0) -> Dict[str, Callable[[], StubAgent]]:
+    return {name: partial(StubAgent, name, latency_ms) for name in ("math", "code", "research")}
+
+
+def write_stub_tools(tools_dir: Path, count: int):
+    for index in range(count):
+        tool = tools_dir / f"tool_{index}"
+        tool.mkdir(parents=True, exist_ok=True)
+        (tool / "tool.py").write_text("def run(**kwargs):\n    return kwargs\n")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def isolated_workdir(log_level: str = "WARNING") -> Iterator[Path]:
+    """Temporary cwd and HOME holding a copy of the policy; nothing outside it is touched"""
+    workdir = Path(tempfile.mkdtemp(prefix="super-agent-bench-"))
+    policy = json.loads(POLICY_PATH.read_text())
+    policy.setdefault("logging", {})["level"] = log_level
+    (workdir / "config").mkdir()
+    (workdir / "config" / "security-policy.json").write_text(json.dumps(policy, indent=2))
+
+    previous_cwd, previous_home = os.getcwd(), os.environ.get("HOME")
+    os.chdir(workdir)
+    # TrashManager keeps its trash under ~/.super-agent
+    os.environ["HOME"] = str(workdir)
+    try:
+        yield workdir
+    finally:
+        os.chdir(previous_cwd)
+        if previous_home is None:
+            os.environ.pop("HOME", None)
+        else:
+            os.environ["HOME"] = previous_home
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def seed_trash(count: int):
+    """Give trash listing a realistic amount of work"""
+    from core.trash_manager import TrashManager
+
+    trash = TrashManager()
+    seed_dir = Path("seed")
+    seed_dir.mkdir(exist_ok=True)
+    for index in range(count):
+        path = seed_dir / f"file_{index}.txt"
+        path.write_text("x" * 256)
+        trash.delete_to_trash(path)
+
+
+def serve_master(workdir: str, port: int, agent_latency_ms: float, trash_items: int):
+    """Child process: MasterApplication with stub agents on 127.0.0.1"""
+    os.chdir(workdir)
+    os.environ["HOME"] = workdir
+    import uvicorn
+    import main
+
+    # The policy sets WARNING once loaded; this covers seeding and early startup
+    main.log_pipeline.configure({"level": "WARNING"})
+    seed_trash(trash_items)
+    main.AGENT_FACTORIES = stub_factories(agent_latency_ms)
+    app = main.MasterApplication()
+    server = uvicorn.Server(uvicorn.Config(
+        app.app, host="127.0.0.1", port=port, log_config=None, log_level="warning", access_log=False
+    ))
+    app.serve(server)
+
+
+def serve_gateway(tools_dir: str, port: int, workers: int):
+    """Child process: MCPGatewayServer over the stub tools bundle, or a supervisor of several"""
+    from common.structured_logging import LogPipeline
+    from gateway.server import MCPGatewayServer
+    from gateway.auth_handler import MCPAuthHandler
+    from gateway.workers import WorkerSupervisor
+
+    LogPipeline().configure({"level": "WARNING"})
+    # Inherited by gateway workers, which build their own auth handler
+    os.environ["MCP_SECRET_KEY"] = BENCH_SECRET
+    if workers > 1:
+        WorkerSupervisor("127.0.0.1", port, tools_dir, workers).run()
+        return
+    server = MCPGatewayServer(MCPAuthHandler(BENCH_SECRET), "127.0.0.1", port, tools_dir=tools_dir)
+    asyncio.run(server.start())
+
+
+def _wait_until(check: Callable[[], bool], process, what: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not process.is_alive():
+            raise RuntimeError(f"{what} exited during startup (code {process.exitcode})")
+        try:
+            if check():
+                return
+        except OSError:
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f"{what} not ready after {timeout}s")
+
+
+def _master_ready(port: int) -> bool:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+        return response.status == 200
+
+
+def _gateway_ready(port: int) -> bool:
+    with socket.create_connection(("127.0.0.1", port), timeout=1):
+        return True
+
+
+class LocalStack:
+    """Master agent and MCP gateway in child processes, so the load generator does not share their loop"""
+
+    def __init__(self, agent_latency_ms: float = 0.0, trash_items: int = 200, tools: int = 20,
+                 gateway_workers: int = 1):
+        self.agent_latency_ms = agent_latency_ms
+        self.trash_items = trash_items
+        self.tools = tools
+        self.gateway_workers = gateway_workers
+        self.master_port: Optional[int] = None
+        self.gateway_port: Optional[int] = None
+        self._processes = []
+        self._workdir = None
+
+    @property
+    def master_url(self) -> str:
+        return f"http://127.0.0.1:{self.master_port}"
+
+    def __enter__(self) -> "LocalStack":
+        # spawn: children start clean instead of inheriting this process's loop and logging
+        context = multiprocessing.get_context("spawn")
+        self._workdir = isolated_workdir()
+        workdir = self._workdir.__enter__()
+        try:
+            tools_dir = workdir / "tools-bundle"
+            write_stub_tools(tools_dir, self.tools)
+
+            self.master_port, self.gateway_port = free_port(), free_port()
+            master = context.Process(
+                target=serve_master, name="bench-master",
+                args=(str(workdir), self.master_port, self.agent_latency_ms, self.trash_items)
+            )
+            gateway = context.Process(
+                target=serve_gateway, name="bench-gateway",
+                args=(str(tools_dir), self.gateway_port, self.gateway_workers)
+            )
+            for process in (master, gateway):
+                process.start()
+                self._processes.append(process)
+
+            _wait_until(partial(_master_ready, self.master_port), master, "master-agent")
+            _wait_until(partial(_gateway_ready, self.gateway_port), gateway, "mcp-gateway")
+        except BaseException:
+            self.__exit__(*sys.exc_info())
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        for process in self._processes:
+            if process.is_alive():
+                # SIGTERM: the master drains and flushes as it would in production
+                process.terminate()
+        for process in self._processes:
+            process.join(35)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self._processes.clear()
+        if self._workdir is not None:
+            self._workdir.__exit__(*exc_info)
+            self._workdir = None
@@ -0,0 +1,145 @@
+import asyncio
+import itertools
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List
+
+import httpx
+
+from .harness import BENCH_SECRET, LocalStack
+from .stats import summarize
+
+# session(worker) -> async context yielding the request callable that worker repeats
+Scenario = Callable[[int], AsyncIterator[Callable[[], Awaitable]]]
+
+# Pause after a failed request, doubled per consecutive failure
+ERROR_BACKOFF_SECONDS = 0.01
+MAX_ERROR_BACKOFF_SECONDS = 0.5
+
+
+async def drive(session: Scenario, concurrency: int, duration: float, warmup: float) -> Dict[str, Any]:
+    """Closed loop: each worker issues its next request as soon as the previous one returns"""
+    latencies: List[float] = []
+    errors = 0
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+
+    async def worker(index: int):
+        nonlocal errors
+        failures = 0
+        async with session(index) as request:
+            while True:
+                started = time.perf_counter()
+                if started >= stop_at:
+                    return
+                try:
+                    await request()
+                except Exception:
+                    if started >= measure_from:
+                        errors += 1
+                    # Errors come back fast; retrying at once would spin the loop and flood the server
+                    delay = min(ERROR_BACKOFF_SECONDS * 2 ** failures, MAX_ERROR_BACKOFF_SECONDS)
+                    failures += 1
+                    await asyncio.sleep(min(delay, max(stop_at - time.perf_counter(), 0)))
+                    continue
+                failures = 0
+                if started >= measure_from:
+                    latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return summarize(latencies, duration, errors)
+
+
+def http_scenario(client: httpx.AsyncClient, method: str, path: str,
+                  body: Callable[[], Dict[str, Any]] = None) -> Scenario:
+    @asynccontextmanager
+    async def session(worker: int):
+        async def request():
+            response = await client.request(method, path, json=body() if body else None)
+            if response.status_code != 200:
+                raise RuntimeError(f"{method} {path} returned {response.status_code}")
+        yield request
+    return session
+
+
+def task_body() -> Callable[[], Dict[str, Any]]:
+    """Distinct, deterministic task texts, so every submission takes the full path"""
+    counter = itertools.count()
+
+    def body():
+        n = next(counter)
+        return {"task": f"benchmark task {n}: compute {n} squared", "timeout_ms": 5000}
+    return body
+
+
+async def _mcp_connect(stack: LocalStack, auth):
+    reader, writer = await asyncio.open_connection("127.0.0.1", stack.gateway_port)
+    writer.write(auth.generate_auth_header().encode() + b"\n")
+    await writer.drain()
+    reply = await reader.readline()
+    if not reply.startswith(b"OK"):
+        writer.close()
+        raise RuntimeError(f"MCP authentication failed: {reply!r}")
+    return reader, writer
+
+
+async def _mcp_call(reader, writer, command: bytes):
+    writer.write(command)
+    await writer.drain()
+    reply = await reader.readline()
+    if not reply or reply.startswith(b"ERR"):
+        raise RuntimeError(f"MCP {command.split()[0].decode()} failed: {reply!r}")
+
+
+def mcp_scenario(stack: LocalStack, auth, command: str, load_tool: bool = False) -> Scenario:
+    """One authenticated connection per worker, reused for every request"""
+    @asynccontextmanager
+    async def session(worker: int):
+        reader, writer = await _mcp_connect(stack, auth)
+        tool = f"tool_{worker % stack.tools}"
+        if load_tool:
+            await _mcp_call(reader, writer, f"LOAD {tool}\n".encode())
+        line = (command.format(tool=tool) + "\n").encode()
+        try:
+            yield lambda: _mcp_call(reader, writer, line)
+        finally:
+            writer.close()
+    return session
+
+
+def mcp_connect_scenario(stack: LocalStack, auth) -> Scenario:
+    """Connect, authenticate and close per request: the cost a short-lived client pays"""
+    @asynccontextmanager
+    async def session(worker: int):
+        async def request():
+            reader, writer = await _mcp_connect(stack, auth)
+            writer.close()
+            await writer.wait_closed()
+        yield request
+    return session
+
+
+async def run_load(stack: LocalStack, concurrency: int, duration: float, warmup: float,
+                   only: List[str] = None) -> Dict[str, Dict[str, Any]]:
+    from gateway.auth_handler import MCPAuthHandler
+
+    auth = MCPAuthHandler(BENCH_SECRET)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=stack.master_url, limits=limits, timeout=30) as client:
+        scenarios = {
+            "load.health": http_scenario(client, "GET", "/health"),
+            "load.trash_list": http_scenario(client, "GET", "/api/v1/trash"),
+            "load.task_submit": http_scenario(client, "POST", "/api/v1/task", task_body()),
+            "load.mcp_auth": mcp_connect_scenario(stack, auth),
+            "load.mcp_list_tools": mcp_scenario(stack, auth, "LIST_TOOLS"),
+            "load.mcp_execute": mcp_scenario(stack, auth, 'EXECUTE {tool} {{"n": 1}}', load_tool=True),
+        }
+        results = {}
+        # One scenario at a time: mixing them would make each number depend on the others
+        for name, session in scenarios.items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            results[name] = await drive(session, concurrency, duration, warmup)
+            print(f"  {name}: {results[name]['throughput']:,.0f}/s p99 {results[name]['p99_ms']:.2f}ms", flush=True)
+        return results
@@ -0,0 +1,86 @@
+import time
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+from .harness import BENCH_SECRET, isolated_workdir
+from .stats import summarize
+
+
+def timed(fn: Callable[[Any], Any], iterations: int, setup: Optional[Callable[[int], Any]] = None) -> Dict[str, Any]:
+    """Per-call latencies of fn(setup(i)); setup is excluded from the timing"""
+    latencies: List[float] = []
+    for index in range(iterations):
+        arg = setup(index) if setup else None
+        started = time.perf_counter()
+        fn(arg)
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies, sum(latencies))
+
+
+def bench_acl(iterations: int) -> Dict[str, Dict[str, Any]]:
+    from core.acl_engine import ACLEngine, ACLDecision
+
+    acl = ACLEngine()
+    decision = ACLDecision(True, "benchmark", requires_confirmation=True)
+
+    def confirmation_cycle(_):
+        operation_id = acl.request_confirmation(decision)
+        acl.confirm_operation(operation_id, True)
+        acl.wait_for_confirmation(operation_id, 0)
+
+    return {
+        "micro.acl_check": timed(lambda _: acl.check_resource_access("cpu", 1.0), iterations),
+        "micro.acl_confirmation_cycle": timed(confirmation_cycle, iterations),
+    }
+
+
+def bench_auth(iterations: int) -> Dict[str, Dict[str, Any]]:
+    from gateway.auth_handler import MCPAuthHandler
+    from core.auth_middleware import JWTVerifier
+
+    handler = MCPAuthHandler(BENCH_SECRET)
+    header = (handler.generate_auth_header() + "\n").encode()
+    verifier = JWTVerifier()
+
+    return {
+        "micro.auth_hmac_sign": timed(lambda _: handler.generate_auth_header(), iterations),
+        "micro.auth_hmac_verify": timed(lambda _: handler.authenticate(header), iterations),
+        "micro.auth_jwt_verify": timed(lambda _: verifier.verify_token("benchmark.jwt.token"), iterations),
+    }
+
+
+def bench_trash(iterations: int) -> Dict[str, Dict[str, Any]]:
+    from core.trash_manager import TrashManager
+
+    trash = TrashManager()
+    files = Path("files")
+    files.mkdir(exist_ok=True)
+    trash_ids: List[str] = []
+
+    def make_file(index: int) -> Path:
+        path = files / f"file_{index}.txt"
+        path.write_text("x" * 256)
+        return path
+
+    results = {
+        "micro.trash_delete": timed(
+            lambda path: trash_ids.append(trash.delete_to_trash(path)["trash_id"]), iterations, make_file
+        ),
+    }
+    # Listed while the trash holds everything just deleted
+    results["micro.trash_list"] = timed(lambda _: trash.list_trash(), max(iterations // 10, 1))
+    results["micro.trash_restore"] = timed(trash.restore, iterations, lambda index: trash_ids[index])
+    return results
+
+
+def run_micro(iterations: int, only: List[str] = None) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    # File-touching benchmarks stay inside a throwaway cwd and HOME
+    with isolated_workdir():
+        for bench, count in ((bench_acl, iterations), (bench_auth, iterations), (bench_trash, max(iterations // 50, 1))):
+            for name, result in bench(count).items():
+                if only and not any(pattern in name for pattern in only):
+                    continue
+                results[name] = result
+                print(f"  {name}: {result['throughput']:,.0f}/s p99 {result['p99_ms']:.4f}ms", flush=True)
+    return results
@@ -0,0 +1,104 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Latency percentiles gated by --compare; p999 is reported but too noisy to gate on
+GATED_LATENCIES = ("p50_ms", "p99_ms")
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(int(round(fraction * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, Any]:
+    """Throughput and latency percentiles; latencies are in seconds"""
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 4) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+        "p999_ms": round(percentile(ordered, 0.999) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4) if ordered else 0.0,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """What a result was measured on; baselines only compare like with like"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.time(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def baseline_path(name: str) -> Path:
+    path = Path(name)
+    return path if path.suffix == ".json" else BASELINE_DIR / f"{name}.json"
+
+
+def save_baseline(name: str, report: Dict[str, Any]) -> Path:
+    path = baseline_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def load_baseline(name: str) -> Dict[str, Any]:
+    path = baseline_path(name)
+    if not path.exists():
+        sys.exit(f"❌ Baseline not found: {path}")
+    return json.loads(path.read_text())
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[Tuple[str, str, float, float]]:
+    """(benchmark, metric, baseline, current) for every gated metric worse than tolerance allows"""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if base["throughput"] and result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append((name, "throughput", base["throughput"], result["throughput"]))
+        for metric in GATED_LATENCIES:
+            if base[metric] and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append((name, metric, base[metric], result[metric]))
+    return regressions
+
+
+def format_table(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None) -> str:
+    columns = ("count", "errors", "throughput", "p50_ms", "p99_ms", "p999_ms")
+    width = max([len(name) for name in results] + [9])
+    lines = [f"{'benchmark':<{width}}  " + "  ".join(f"{c:>16}" for c in columns)]
+    for name, result in results.items():
+        cells = []
+        for column in columns:
+            cell = f"{result[column]:,}" if isinstance(result[column], int) else f"{result[column]:,.3f}"
+            base = (baseline or {}).get("results", {}).get(name)
+            if base and column in ("throughput",) + GATED_LATENCIES and base[column]:
+                cell += f" {(result[column] / base[column] - 1) * 100:+.0f}%"
+            cells.append(f"{cell:>16}")
+        lines.append(f"{name:<{width}}  " + "  ".join(cells))
+    return "\n".join(lines)
@@ -0,0 +1 @@
+"""Code shared by the master-agent and mcp-gateway services"""
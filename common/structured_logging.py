@@ -0,0 +1,162 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Set per request/connection; copied into every record logged in that context
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "sample_rate"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if getattr(record, "sample_rate", 1.0) != 1.0:
+            entry["sample_rate"] = record.sample_rate
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class Sampler(logging.Filter):
+    """Keeps a configured fraction of DEBUG and INFO records from loggers (and their children)"""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.configure(rates or {})
+
+    def configure(self, rates: Dict[str, float]):
+        self.rates = {name: min(max(float(rate), 0.0), 1.0) for name, rate in rates.items()}
+        self._resolved: Dict[str, float] = {}
+        self._credit: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Warnings and errors are rare and the ones an operator needs: never sampled
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        # Accumulated credit rather than random: exact for any rate, and evenly spread
+        credit = self._credit.get(record.name, 0.0) + rate
+        if credit < 1.0:
+            self._credit[record.name] = credit
+            return False
+        self._credit[record.name] = credit - 1.0
+        record.sample_rate = rate
+        return True
+
+
+class AsyncQueueHandler(QueueHandler):
+    """Hands records to the writer thread without formatting them on the caller's thread"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.request_id = request_id.get()
+        if record.exc_info:
+            # Tracebacks pin frames; render now and drop the reference
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        # msg/args stay unmerged: %-formatting happens in the writer thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Losing a log line beats stalling the event loop
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Root logger -> bounded queue -> background listener writing JSON file and console output"""
+
+    def __init__(self, log_file: Optional[str] = None, console_format: str = "text", queue_size: int = 10000):
+        self.queue: queue.Queue = queue.Queue(queue_size)
+        self.sampler = Sampler()
+        self.handler = AsyncQueueHandler(self.queue)
+        self.handler.addFilter(self.sampler)
+
+        outputs = []
+        console = logging.StreamHandler()
+        console.setFormatter(JsonFormatter() if console_format == "json" else logging.Formatter(TEXT_FORMAT))
+        outputs.append(console)
+        if log_file:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.FileHandler(log_file)
+            file_handler.setFormatter(JsonFormatter())
+            outputs.append(file_handler)
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(logging.INFO)
+
+        self.listener = QueueListener(self.queue, *outputs, respect_handler_level=True)
+        self.listener.start()
+        self._stopped = False
+        atexit.register(self.stop)
+
+    def configure(self, settings: Dict[str, Any]):
+        """Level and sampling can change at runtime; outputs are fixed at startup"""
+        logging.getLogger().setLevel(str(settings.get("level", "INFO")).upper())
+        self.sampler.configure(settings.get("sampling", {}))
+
+    def stop(self):
+        """Drain what is queued; idempotent so shutdown and atexit can both call it"""
+        if not self._stopped:
+            self._stopped = True
+            self.listener.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": self.queue.qsize(), "dropped_total": self.handler.dropped}
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """Parse "gateway.server=0.01,gateway.auth_handler=0.1" into {logger: rate}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
@@ -0,0 +1,81 @@
+import json
+import logging
+
+import pytest
+
+from common.structured_logging import JsonFormatter, LogPipeline, Sampler, parse_sampling, request_id
+
+
+def record(name="app", level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.makeLogRecord({"name": name, "levelno": level, "levelname": logging.getLevelName(level),
+                                  "msg": msg, "args": args})
+
+
+@pytest.mark.parametrize("rate", [0.7, 0.4, 0.25, 0.01])
+def test_sampler_keeps_the_configured_fraction(rate):
+    sampler = Sampler({"app": rate})
+    kept = sum(sampler.filter(record()) for _ in range(10000))
+    assert kept == pytest.approx(10000 * rate, abs=1)
+
+
+def test_sampler_rules_apply_to_child_loggers_but_not_warnings():
+    sampler = Sampler({"app": 0.0})
+    assert not sampler.filter(record("app.worker"))
+    assert not sampler.filter(record("app.worker", logging.DEBUG))
+    assert sampler.filter(record("other"))
+    assert sampler.filter(record("app.worker", logging.WARNING))
+    assert sampler.filter(record("app.worker", logging.ERROR))
+
+
+def test_parse_sampling():
+    assert parse_sampling("a.b=0.1, c=1") == {"a.b": 0.1, "c": 1.0}
+    assert parse_sampling("") == {}
+
+
+def test_json_formatter_includes_request_id_and_extras():
+    entry = record()
+    entry.request_id = "req-1"
+    entry.task_id = "t1"
+    line = json.loads(JsonFormatter().format(entry))
+    assert line["message"] == "hello world"
+    assert line["request_id"] == "req-1"
+    assert line["task_id"] == "t1"
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    root = logging.getLogger()
+    saved = list(root.handlers), root.level
+    log_file = tmp_path / "app.log"
+    pipeline = LogPipeline(str(log_file))
+    yield pipeline, log_file
+    pipeline.stop()
+    root.handlers[:] = saved[0]
+    root.setLevel(saved[1])
+
+
+def test_pipeline_writes_json_lines_from_a_background_thread(pipeline):
+    pipeline, log_file = pipeline
+    token = request_id.set("abc")
+    try:
+        logging.getLogger("app").info("task %s done", 7)
+    finally:
+        request_id.reset(token)
+    pipeline.stop()
+    line = json.loads(log_file.read_text().splitlines()[-1])
+    assert line["message"] == "task 7 done" and line["request_id"] == "abc"
+
+
+def test_uvicorn_access_lines_go_through_the_pipeline(pipeline):
+    uvicorn = pytest.importorskip("uvicorn")
+    pipeline, log_file = pipeline
+    uvicorn.Config(app=None, log_config=None, log_level=None).configure_logging()
+    access = logging.getLogger("uvicorn.access")
+    assert not access.handlers and access.propagate
+
+    access.info('%s - "%s %s HTTP/%s" %d', "127.0.0.1:1", "GET", "/health", "1.1", 200)
+    pipeline.configure({"level": "WARNING"})
+    access.info('%s - "%s %s HTTP/%s" %d', "127.0.0.1:1", "GET", "/quiet", "1.1", 200)
+    pipeline.stop()
+    text = log_file.read_text()
+    assert "/health" in text and "/quiet" not in text
@@ -1,4 +1,9 @@
 # Placeholder for CodeAgent
 class CodeAgent:
+    name = "code"
+
     def get_status(self):
         return {"name": "code", "status": "ready"}
+
+    async def handle(self, task):
+        return {"agent": "code", "answer": None, "confidence": 0.0}
@@ -1,4 +1,9 @@
 # Placeholder for MathAgent
 class MathAgent:
+    name = "math"
+
     def get_status(self):
         return {"name": "math", "status": "ready"}
+
+    async def handle(self, task):
+        return {"agent": "math", "answer": None, "confidence": 0.0}
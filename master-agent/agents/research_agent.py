@@ -1,4 +1,9 @@
 # Placeholder for ResearchAgent
 class ResearchAgent:
+    name = "research"
+
     def get_status(self):
         return {"name": "research", "status": "ready"}
+
+    async def handle(self, task):
+        return {"agent": "research", "answer": None, "confidence": 0.0}
@@ -1,3 +1,7 @@
+import threading
+import uuid
+from .policy_store import PolicyStore
+
 # Placeholder for ACLEngine
 class ACLDecision:
     def __init__(self, allowed, reason="", requires_confirmation=False):
@@ -6,20 +10,72 @@ class ACLDecision:
         self.requires_confirmation = requires_confirmation
 
 class ACLEngine:
-    def __init__(self, policy_path):
-        self.policy = {}
+    def __init__(self, policy_path="config/security-policy.json", store=None):
+        self.store = store or PolicyStore(policy_path)
+        self._pending = {}
+        self._events = {}
+        self._answers = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    @property
+    def policy(self):
+        return self.store.snapshot.data
 
     def check_resource_access(self, resource, amount):
         return ACLDecision(True)
 
+    def add_listener(self, fn):
+        """fn(event, operation_id, data) on "pending" and "resolved"; may run on any thread"""
+        self._listeners.append(fn)
+
+    def _notify(self, event, operation_id, data):
+        for fn in self._listeners:
+            fn(event, operation_id, data)
+
     def request_confirmation(self, decision):
-        return "op_123"
+        operation_id = f"op_{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._pending[operation_id] = decision
+            self._events[operation_id] = threading.Event()
+        self._notify("pending", operation_id, {"reason": decision.reason})
+        return operation_id
 
     def wait_for_confirmation(self, operation_id, timeout):
-        return True
+        event = self._events.get(operation_id)
+        if event is None:
+            return False
+        answered = event.wait(timeout)
+        with self._lock:
+            self._pending.pop(operation_id, None)
+            self._events.pop(operation_id, None)
+            approved = self._answers.pop(operation_id, False)
+        if not answered:
+            self._notify("resolved", operation_id, {"approved": False, "expired": True})
+        return answered and approved
 
     def get_pending_confirmations(self):
-        return {}
+        with self._lock:
+            return dict(self._pending)
 
     def confirm_operation(self, operation_id, approved):
-        pass
+        with self._lock:
+            event = self._events.get(operation_id)
+            if event is None:
+                raise KeyError(f"No pending operation {operation_id}")
+            self._answers[operation_id] = approved
+            # Answered operations stop showing as pending even before the waiter wakes
+            self._pending.pop(operation_id, None)
+        event.set()
+        self._notify("resolved", operation_id, {"approved": approved})
+
+    def deny_all_pending(self):
+        """Resolve every outstanding confirmation as denied"""
+        with self._lock:
+            operation_ids = list(self._events)
+        for operation_id in operation_ids:
+            try:
+                self.confirm_operation(operation_id, False)
+            except KeyError:
+                pass
+        return len(operation_ids)
@@ -0,0 +1,368 @@
+import asyncio
+import json
+import os
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# Cold-start footprints (MB) used until a task class has been observed, capped at memory_limit_mb
+DEFAULT_FOOTPRINTS_MB = {
+    "media": 4096,
+    "training": 8192,
+    "research": 2048,
+    "general": 1024,
+}
+
+# Reservation of the task running in the current context, for peak reporting
+current_reservation: ContextVar[Optional["Reservation"]] = ContextVar("current_reservation", default=None)
+
+TASK_CLASS_KEYWORDS = (
+    ("media", ("image", "video")),
+    ("training", ("model", "train")),
+    ("research", ("research", "search")),
+)
+
+
+class AdmissionRejected(Exception):
+    """Task can never fit within the configured limits"""
+
+
+class AdmissionTimeout(Exception):
+    """Task waited in the admission queue longer than allowed"""
+
+
+def classify_task(task: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Map a task to the class its memory footprint is learned under"""
+    if metadata and metadata.get("task_class"):
+        return str(metadata["task_class"])
+
+    text = task.lower()
+    for task_class, keywords in TASK_CLASS_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return task_class
+    return "general"
+
+
+class CgroupMemory:
+    """Reads cgroup v2 memory accounting for the current process"""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @classmethod
+    def detect(cls) -> Optional["CgroupMemory"]:
+        try:
+            with open("/proc/self/cgroup", 'r') as f:
+                for line in f:
+                    # cgroup v2 has a single "0::/path" entry
+                    if line.startswith("0::"):
+                        path = CGROUP_ROOT / line[3:].strip().lstrip("/")
+                        if (path / "memory.current").exists():
+                            return cls(path)
+        except OSError:
+            pass
+        return None
+
+    def _read(self, name: str) -> Optional[str]:
+        try:
+            return (self.path / name).read_text().strip()
+        except OSError:
+            return None
+
+    def current_mb(self) -> Optional[float]:
+        value = self._read("memory.current")
+        return int(value) / (1024 * 1024) if value else None
+
+    def max_mb(self) -> Optional[float]:
+        value = self._read("memory.max")
+        if not value or value == "max":
+            return None
+        return int(value) / (1024 * 1024)
+
+    def pressure_avg10(self) -> Optional[float]:
+        """'some' stall percentage over the last 10 seconds"""
+        value = self._read("memory.pressure")
+        if not value:
+            return None
+        for line in value.splitlines():
+            if line.startswith("some "):
+                fields = dict(item.split("=", 1) for item in line.split()[1:])
+                return float(fields.get("avg10", 0.0))
+        return None
+
+
+class Reservation:
+    """Memory reserved for one in-flight task"""
+
+    def __init__(self, key: Tuple[str, str], estimate_mb: float):
+        self.key = key
+        self.estimate_mb = estimate_mb
+        self.peak_mb: Optional[float] = None
+        self.solo = False
+        self.admitted_at = time.monotonic()
+
+    def observe_peak(self, peak_mb: float):
+        """Record the measured peak footprint of the task"""
+        self.peak_mb = max(self.peak_mb or 0.0, peak_mb)
+
+
+class AdmissionController:
+    """Admits tasks against learned memory footprints, queueing instead of rejecting"""
+
+    def __init__(self, resource_manager):
+        self.resource_manager = resource_manager
+        self.configure(resource_manager.store.snapshot)
+        resource_manager.store.subscribe(lambda old, new: self.configure(new))
+
+        self.cgroup = CgroupMemory.detect()
+        self.footprints: Dict[Tuple[str, str], float] = {}
+        self.reserved_mb = 0.0
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._solo_baseline: Optional[float] = None
+        # Available MB when the node was last idle; what has vanished since is held by admitted tasks
+        self._idle_available: Optional[float] = None
+        self._sample: Tuple[float, float, Optional[float]] = (0.0, 0.0, None)
+        self.admitted_total = 0
+        self.queued_total = 0
+        self.timed_out_total = 0
+
+        if self.cgroup:
+            logger.info("📊 Admission control using cgroup v2 at %s", self.cgroup.path)
+
+    def configure(self, policy):
+        settings = policy.get("admission", {})
+        self.ema_alpha = settings.get("ema_alpha", 0.3)
+        self.safety_margin = settings.get("safety_margin", 1.2)
+        self.headroom_mb = settings.get("headroom_mb", 256)
+        self.pressure_threshold = settings.get("pressure_threshold", 10.0)
+        self.queue_timeout = settings.get("queue_timeout_seconds", 30)
+        self.max_queue = settings.get("max_queue", 1000)
+        self.recheck_interval = settings.get("recheck_interval_seconds", 0.25)
+
+    def estimate(self, agent: str, task_class: str) -> float:
+        """Expected peak footprint in MB for an agent/task-class pair"""
+        limit = self.resource_manager.config['resource_allocation']['memory_limit_mb']
+        learned = self.footprints.get((agent, task_class))
+        if learned is None:
+            learned = self.footprints.get(("*", task_class))
+        if learned is None:
+            # A guess above the limit would reject the class before it is ever measured
+            return min(DEFAULT_FOOTPRINTS_MB.get(task_class, DEFAULT_FOOTPRINTS_MB["general"]), limit)
+        # The margin alone never pushes a task that has fit over the limit
+        return min(learned * self.safety_margin, max(learned, limit))
+
+    def record_footprint(self, agent: str, task_class: str, peak_mb: float):
+        """Fold an observed peak into the per-agent and per-class moving averages"""
+        keys = {(agent, task_class), ("*", task_class)}
+        for key in keys:
+            previous = self.footprints.get(key)
+            if previous is None:
+                self.footprints[key] = peak_mb
+            else:
+                self.footprints[key] = previous + self.ema_alpha * (peak_mb - previous)
+
+    def _memory_state(self) -> Tuple[float, Optional[float]]:
+        """Available MB and memory pressure, sampled at most every 100ms"""
+        now = time.monotonic()
+        sampled_at, available, pressure = self._sample
+        if now - sampled_at < 0.1:
+            return available, pressure
+
+        available = self.resource_manager.get_available_memory()
+        pressure = None
+        if self.cgroup:
+            limit = self.cgroup.max_mb()
+            current = self.cgroup.current_mb()
+            if limit is not None and current is not None:
+                available = min(available, limit - current)
+            pressure = self.cgroup.pressure_avg10()
+
+        self._sample = (now, available, pressure)
+        return available, pressure
+
+    def _unallocated_mb(self, available: float) -> float:
+        """Reserved memory admitted tasks have not taken yet; what they have is already out of available"""
+        baseline = available if self._idle_available is None else self._idle_available
+        allocated = max(baseline - available, 0.0)
+        return max(self.reserved_mb - allocated, 0.0)
+
+    def _fits(self, estimate_mb: float) -> bool:
+        # An idle node always admits, otherwise nothing could make progress
+        if self.in_flight == 0:
+            return True
+
+        available, pressure = self._memory_state()
+        if pressure is not None and pressure > self.pressure_threshold:
+            return False
+        return self._unallocated_mb(available) + estimate_mb <= available - self.headroom_mb
+
+    def _grant(self, reservation: Reservation):
+        if self.in_flight == 0:
+            self._idle_available = self._memory_state()[0]
+        self.reserved_mb += reservation.estimate_mb
+        self.in_flight += 1
+        self.admitted_total += 1
+        # RSS deltas can only be attributed to a task that runs alone
+        self._solo_baseline = self._rss_mb() if self.in_flight == 1 else None
+        reservation.solo = self.in_flight == 1
+        reservation.admitted_at = time.monotonic()
+
+    def _wake(self):
+        while self._waiters:
+            reservation, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(reservation.estimate_mb):
+                break
+            self._waiters.popleft()
+            self._grant(reservation)
+            future.set_result(None)
+
+    async def _acquire(self, reservation: Reservation):
+        if not self._waiters and self._fits(reservation.estimate_mb):
+            self._grant(reservation)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionTimeout("Admission queue is full")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = (reservation, future)
+        self._waiters.append(entry)
+        self.queued_total += 1
+        deadline = loop.time() + self.queue_timeout
+
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self.timed_out_total += 1
+                    raise AdmissionTimeout(
+                        f"Waited {self.queue_timeout}s for {reservation.estimate_mb:.0f}MB"
+                    )
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), min(remaining, self.recheck_interval))
+                    return
+                except asyncio.TimeoutError:
+                    # Pressure can ease without a release, so re-check periodically
+                    self._wake()
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self._release(reservation, learn=False)
+            else:
+                future.cancel()
+                try:
+                    self._waiters.remove(entry)
+                except ValueError:
+                    pass
+            raise
+
+    def _release(self, reservation: Reservation, learn: bool = True):
+        if learn:
+            peak = reservation.peak_mb
+            if peak is None and reservation.solo and self._solo_baseline is not None:
+                peak = max(self._rss_mb() - self._solo_baseline, 0.0)
+            if peak:
+                self.record_footprint(reservation.key[0], reservation.key[1], peak)
+
+        self.reserved_mb = max(self.reserved_mb - reservation.estimate_mb, 0.0)
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle_available = None
+        self._solo_baseline = None
+        self._wake()
+
+    @asynccontextmanager
+    async def reserve(self, task_class: str, agent: str = "*"):
+        """Hold a memory reservation for the duration of a task"""
+        estimate = self.estimate(agent, task_class)
+        if not self.resource_manager.check_task_limits(estimate):
+            raise AdmissionRejected(f"Task class {task_class} needs ~{estimate:.0f}MB")
+
+        reservation = Reservation((agent, task_class), estimate)
+        await self._acquire(reservation)
+        token = current_reservation.set(reservation)
+        try:
+            yield reservation
+        finally:
+            current_reservation.reset(token)
+            self._release(reservation)
+
+    @asynccontextmanager
+    async def reserve_batch(self, task_classes: List[str], concurrency: int):
+        """One reservation for a batch; yields how many of its tasks may run at once"""
+        estimates = sorted((self.estimate("*", task_class) for task_class in task_classes), reverse=True)
+        if not self.resource_manager.check_task_limits(estimates[0]):
+            raise AdmissionRejected(f"Largest task in the batch needs ~{estimates[0]:.0f}MB")
+
+        # Shrink the batch's parallelism to what fits now rather than queueing for all of it
+        available, _ = self._memory_state()
+        budget = available - self.headroom_mb - self._unallocated_mb(available)
+        concurrency = max(min(concurrency, len(estimates)), 1)
+        while concurrency > 1 and sum(estimates[:concurrency]) > budget:
+            concurrency -= 1
+
+        reservation = Reservation(("*", "batch"), sum(estimates[:concurrency]))
+        await self._acquire(reservation)
+        try:
+            yield concurrency
+        finally:
+            # Peaks of concurrent tasks cannot be attributed to a class
+            self._release(reservation, learn=False)
+
+    def save_footprints(self, path: str):
+        """Persist learned footprints so a restart does not fall back to cold-start guesses"""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump([[agent, task_class, value] for (agent, task_class), value in self.footprints.items()], f)
+        os.replace(tmp_path, target)
+
+    def load_footprints(self, path: str):
+        try:
+            with open(path, 'r') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load footprints from %s: %s", path, e)
+            return
+        for agent, task_class, value in entries:
+            self.footprints[(agent, task_class)] = float(value)
+
+    @staticmethod
+    def _rss_mb() -> float:
+        return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+
+    def stats(self) -> Dict[str, Any]:
+        available, pressure = self._memory_state()
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "reserved_mb": round(self.reserved_mb, 1),
+            "unallocated_mb": round(self._unallocated_mb(available), 1),
+            "available_mb": round(available, 1),
+            "memory_pressure_avg10": pressure,
+            "cgroup": str(self.cgroup.path) if self.cgroup else None,
+            "admitted_total": self.admitted_total,
+            "queued_total": self.queued_total,
+            "timed_out_total": self.timed_out_total,
+            "footprints_mb": {
+                f"{agent}/{task_class}": round(value, 1)
+                for (agent, task_class), value in self.footprints.items()
+            },
+        }
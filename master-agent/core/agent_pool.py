@@ -0,0 +1,181 @@
+import asyncio
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Callable, List, Optional, Set
+
+from .task_executor import AgentWorker
+
+logger = logging.getLogger(__name__)
+
+
+class AgentPool:
+    """Warm instances of one agent type; checkout bounds the type's concurrency"""
+
+    def __init__(self, name: str, factory: Callable[[], Any], size: int = 1, executor=None):
+        self.name = name
+        self.factory = factory
+        # IsolatedExecutor hosting each instance in a worker process; agents opt out with isolated = False
+        self.executor = executor
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self.instances: List[Any] = []
+        self.target_size = 0
+        # Instances being built in a thread; counted toward target_size
+        self.spawning = 0
+        self._spawns: Set[asyncio.Task] = set()
+        self.spawn_failed_total = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed_total = 0
+        self.failed_total = 0
+        self._wait_ms_total = 0.0
+        self._busy_seconds = 0.0
+        self._created = time.monotonic()
+        self.resize(size)
+
+    @property
+    def cacheable(self) -> bool:
+        return all(getattr(agent, "cacheable", True) for agent in self.instances)
+
+    def _build(self) -> Any:
+        """A new warmed-up instance; blocks, so on the event loop it runs in a thread"""
+        if self.executor is not None and self.executor.isolates(self.factory):
+            # Built and warmed up inside the worker that will run its tasks
+            return self.executor.start_worker(self.name, self.factory)
+        agent = self.factory()
+        warm_up = getattr(agent, "warm_up", None)
+        if callable(warm_up):
+            warm_up()
+        return agent
+
+    def _add(self, agent: Any):
+        self.instances.append(agent)
+        self._idle.put_nowait(agent)
+
+    async def _spawn(self):
+        try:
+            agent = await asyncio.to_thread(self._build)
+        except Exception as e:
+            self.spawn_failed_total += 1
+            logger.error("Could not start a %s instance: %s", self.name, e)
+            return
+        finally:
+            self.spawning -= 1
+        if len(self.instances) >= self.target_size:
+            # Shrunk (or closed) while this instance was starting
+            self._stop(agent)
+        else:
+            self._add(agent)
+
+    @staticmethod
+    def _stop(agent: Any):
+        if not isinstance(agent, AgentWorker):
+            return
+        try:
+            asyncio.get_running_loop().run_in_executor(None, agent.stop)
+        except RuntimeError:
+            agent.stop()
+
+    def _retire(self, agent: Any):
+        self.instances.remove(agent)
+        self._stop(agent)
+
+    def resize(self, size: int):
+        """Grow in background threads (inline off the loop, as at startup); shrink as surplus instances return"""
+        self.target_size = max(int(size), 1)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        while len(self.instances) + self.spawning < self.target_size:
+            if loop is None:
+                self._add(self._build())
+                continue
+            self.spawning += 1
+            task = loop.create_task(self._spawn())
+            self._spawns.add(task)
+            task.add_done_callback(self._spawns.discard)
+        while len(self.instances) > self.target_size and not self._idle.empty():
+            self._retire(self._idle.get_nowait())
+
+    @asynccontextmanager
+    async def checkout(self):
+        waited = time.monotonic()
+        self.waiting += 1
+        try:
+            agent = await self._idle.get()
+        finally:
+            self.waiting -= 1
+        started = time.monotonic()
+        self._wait_ms_total += (started - waited) * 1000
+        self.in_flight += 1
+        try:
+            yield agent
+        finally:
+            self.in_flight -= 1
+            self._busy_seconds += time.monotonic() - started
+            if len(self.instances) > self.target_size:
+                self._retire(agent)
+            else:
+                self._idle.put_nowait(agent)
+
+    async def handle(self, task: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        async with self.checkout() as agent:
+            try:
+                if isinstance(agent, AgentWorker):
+                    result = await agent.handle(task, timeout=timeout)
+                else:
+                    result = await agent.handle(task)
+            except Exception:
+                self.failed_total += 1
+                raise
+            self.completed_total += 1
+            return result
+
+    def close(self):
+        """Stop every worker process; blocks while they exit"""
+        # Instances still starting are stopped as soon as they are ready
+        self.target_size = 0
+        for agent in list(self.instances):
+            self._retire(agent)
+
+    def get_status(self) -> Dict[str, Any]:
+        size = len(self.instances)
+        served = self.completed_total + self.failed_total
+        uptime = max(time.monotonic() - self._created, 1e-9)
+        if self.waiting:
+            status = "saturated"
+        elif self.in_flight:
+            status = "busy"
+        else:
+            status = "ready"
+        return {
+            "name": self.name,
+            "status": status,
+            "size": size,
+            "target_size": self.target_size,
+            "spawning": self.spawning,
+            "in_flight": self.in_flight,
+            "idle": self._idle.qsize(),
+            "waiting": self.waiting,
+            "utilization": round(self.in_flight / size, 3) if size else 0.0,
+            "busy_ratio": round(self._busy_seconds / (uptime * max(size, 1)), 4),
+            "completed_total": self.completed_total,
+            "failed_total": self.failed_total,
+            "spawn_failed_total": self.spawn_failed_total,
+            "avg_wait_ms": round(self._wait_ms_total / served, 2) if served else 0.0,
+            "instances": [agent.get_status() for agent in self.instances],
+        }
+
+
+def build_pools(factories: Dict[str, Callable[[], Any]], settings: Dict[str, Any],
+                executor=None) -> Dict[str, AgentPool]:
+    """One pool per agent type, sized from the agent_pools policy section"""
+    sizes = settings.get("sizes", {})
+    default_size = settings.get("default_size", 1)
+    pools = {
+        name: AgentPool(name, factory, sizes.get(name, default_size), executor)
+        for name, factory in factories.items()
+    }
+    logger.info("🏊 Agent pools: %s", {name: len(pool.instances) for name, pool in pools.items()})
+    return pools
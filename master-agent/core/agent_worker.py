@@ -0,0 +1,92 @@
+"""Entry point of an isolated agent worker: python -m core.agent_worker <request fd> <reply fd>
+
+Imports nothing from main or the rest of core, so a worker starts with the
+interpreter and its agent's own imports only. The parent sends one start frame,
+(factory, cgroup procs file, limits), then (target, args, kwargs) calls, one at a
+time; target is a method name on the hosted agent or a picklable callable. Every
+frame is answered with (ok, payload, peak_mb)."""
+import asyncio
+import os
+import resource
+import sys
+from multiprocessing.connection import Connection
+from typing import Dict, Any, List, Optional
+
+
+def parse_cpuset(cpuset: str) -> List[int]:
+    """Expand a cpuset list such as "0-2,5" into core ids"""
+    cores = []
+    for part in filter(None, cpuset.split(",")):
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cores.extend(range(int(start), int(end) + 1))
+        else:
+            cores.append(int(part))
+    return cores
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm", 'r') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+
+
+def _confine(cgroup_procs: Optional[str], limits: Dict[str, Any]):
+    if cgroup_procs:
+        with open(cgroup_procs, 'w') as f:
+            f.write(str(os.getpid()))
+        return
+    # No cgroups: per-process rlimits and affinity are the fallback
+    memory_bytes = limits["memory_max_mb"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    if limits.get("cpuset"):
+        os.sched_setaffinity(0, parse_cpuset(limits["cpuset"]))
+
+
+def _call(loop, agent, target, args: tuple, kwargs: dict):
+    fn = getattr(agent, target) if isinstance(target, str) else target
+    result = fn(*args, **kwargs)
+    if asyncio.iscoroutine(result):
+        result = loop.run_until_complete(result)
+    return result
+
+
+def serve(requests: Connection, replies: Connection):
+    loop = asyncio.new_event_loop()
+    try:
+        factory, cgroup_procs, limits = requests.recv()
+        _confine(cgroup_procs, limits)
+        agent = None
+        if factory is not None:
+            agent = factory()
+            warm_up = getattr(agent, "warm_up", None)
+            if callable(warm_up):
+                _call(loop, agent, warm_up, (), {})
+        status = agent.get_status() if hasattr(agent, "get_status") else {}
+        replies.send((True, {"status": status, "cacheable": getattr(agent, "cacheable", True)}, _peak_rss_mb()))
+    except BaseException as e:
+        replies.send((False, f"{type(e).__name__}: {e}", _peak_rss_mb()))
+        return
+
+    while True:
+        try:
+            target, args, kwargs = requests.recv()
+        except EOFError:
+            # The parent closed the pipe: this worker is being retired
+            return
+        # The lifetime peak only grows, so the task is charged with how far it
+        # rose above what the worker held when the task started
+        resident = _rss_mb()
+        try:
+            result = _call(loop, agent, target, args, kwargs)
+            replies.send((True, result, max(_peak_rss_mb() - resident, 0.0)))
+        except BaseException as e:
+            replies.send((False, f"{type(e).__name__}: {e}", max(_peak_rss_mb() - resident, 0.0)))
+
+
+if __name__ == "__main__":
+    serve(Connection(int(sys.argv[1]), writable=False), Connection(int(sys.argv[2]), readable=False))
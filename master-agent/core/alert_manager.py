@@ -1,7 +1,294 @@
-# Placeholder for AlertManager
+import asyncio
+import hashlib
+import json
+import os
+import random
+import smtplib
+import time
+import logging
+from collections import OrderedDict
+from email.message import EmailMessage
+from functools import partial
+from typing import Dict, Any, Awaitable, Callable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# How long a channel removed by a policy change gets to deliver what it has queued
+RETIRE_TIMEOUT_SECONDS = 5.0
+
+
+class PermanentDeliveryError(Exception):
+    """The channel rejected the alert; retrying cannot help"""
+
+
+class AlertChannel:
+    """One destination with its own bounded queue, token-bucket rate limit and retries"""
+
+    def __init__(self, name: str, deliver: Callable[[Dict[str, Any]], Awaitable], settings: Dict[str, Any],
+                 target: str = ""):
+        self.name = name
+        self.deliver = deliver
+        # The destination (URL, address) deliver is bound to
+        self.target = target
+        self.queue: asyncio.Queue = asyncio.Queue(settings.get("max_queue", 1000))
+        self.configure(settings)
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._worker: Optional[asyncio.Task] = None
+        self.sent_total = 0
+        self.failed_total = 0
+        self.retried_total = 0
+        self.dropped_total = 0
+
+    def configure(self, settings):
+        self.rate_per_second = settings.get("rate_per_minute", 30) / 60
+        self.burst = settings.get("burst", 10)
+        self.max_retries = settings.get("max_retries", 3)
+        self.backoff = settings.get("backoff_seconds", 0.5)
+        self.max_backoff = settings.get("max_backoff_seconds", 30)
+
+    def offer(self, alert: Dict[str, Any]) -> bool:
+        try:
+            self.queue.put_nowait(alert)
+            return True
+        except asyncio.QueueFull:
+            self.dropped_total += 1
+            return False
+
+    async def _take_token(self):
+        if self.rate_per_second <= 0:
+            # rate_per_minute: 0 turns rate limiting off rather than stalling the channel
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_second)
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+    async def _send(self, alert: Dict[str, Any]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.deliver(alert)
+                self.sent_total += 1
+                return
+            except PermanentDeliveryError as e:
+                logger.error("Alert channel %s rejected %s: %s", self.name, alert["event"], e)
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error("Alert channel %s gave up on %s: %s", self.name, alert["event"], e)
+                    break
+                self.retried_total += 1
+                delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+                # Jitter keeps retries from many alerts from arriving in lockstep
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+        self.failed_total += 1
+
+    async def _run(self):
+        while True:
+            alert = await self.queue.get()
+            try:
+                await self._take_token()
+                await self._send(alert)
+            finally:
+                self.queue.task_done()
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self, timeout: float):
+        """Deliver what is queued within the timeout, then stop"""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Alert channel %s closed with %s alerts undelivered", self.name, self.queue.qsize())
+        self._worker.cancel()
+        self._worker = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "sent_total": self.sent_total,
+            "failed_total": self.failed_total,
+            "retried_total": self.retried_total,
+            "dropped_total": self.dropped_total,
+        }
+
+
 class AlertManager:
-    def __init__(self, policy):
-        pass
+    """Non-blocking alerts: identical events are coalesced per window, then fanned out to channels"""
+
+    def __init__(self, store):
+        # PolicyStore; alert settings are read from the live snapshot
+        self.store = store
+        self.channels: Dict[str, AlertChannel] = {}
+        # fingerprint -> open coalescing window
+        self._windows: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._client = None
+        # Channels dropped by a policy change, still delivering their queues
+        self._retiring: Set[asyncio.Task] = set()
+        self._flusher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.received_total = 0
+        self.coalesced_total = 0
+        self.configure(store.snapshot)
+        store.subscribe(lambda old, new: self.configure(new))
+
+    def configure(self, policy):
+        self.settings = dict(policy.get("alerts", {}))
+        self.window = self.settings.get("coalesce_window_seconds", 60)
+        self.max_windows = self.settings.get("max_open_windows", 10000)
+        for channel in self.channels.values():
+            channel.configure(self.settings)
+        if self._loop is not None:
+            self._sync_channels()
+
+    @staticmethod
+    def fingerprint(event: str, data: Dict[str, Any]) -> str:
+        payload = json.dumps([event, data], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def send_alert(self, event: str, data: Dict[str, Any]):
+        """Never blocks: the first occurrence is queued, repeats inside the window are counted"""
+        if self._loop is None:
+            logger.warning("Alert %s raised before the alert pipeline started: %s", event, data)
+            return
+        self.received_total += 1
+        key = self.fingerprint(event, data)
+        now = time.time()
+
+        window = self._windows.get(key)
+        if window is not None:
+            window["repeats"] += 1
+            window["last_seen"] = now
+            self.coalesced_total += 1
+            return
+
+        if len(self._windows) >= self.max_windows:
+            self._close_window(*self._windows.popitem(last=False))
+        self._windows[key] = {
+            "event": event, "data": data, "first_seen": now, "last_seen": now,
+            "repeats": 0, "closes_at": time.monotonic() + self.window,
+        }
+        self._dispatch({"event": event, "data": data, "fingerprint": key, "count": 1, "timestamp": now})
+
+    def _dispatch(self, alert: Dict[str, Any]):
+        for channel in self.channels.values():
+            channel.offer(alert)
+
+    def _close_window(self, key: str, window: Dict[str, Any]):
+        if window["repeats"]:
+            self._dispatch({
+                "event": window["event"],
+                "data": window["data"],
+                "fingerprint": key,
+                "count": window["repeats"],
+                "repeated": True,
+                "first_seen": window["first_seen"],
+                "last_seen": window["last_seen"],
+                "timestamp": time.time(),
+            })
+
+    async def _flush_windows(self):
+        while True:
+            now = time.monotonic()
+            # Windows open in order and share one length, so expired ones are at the front
+            while self._windows:
+                key, window = next(iter(self._windows.items()))
+                if window["closes_at"] > now:
+                    break
+                self._windows.popitem(last=False)
+                self._close_window(key, window)
+            await asyncio.sleep(min(max(self.window / 4, 0.05), 1.0))
+
+    async def _post_webhook(self, url: str, alert: Dict[str, Any]):
+        response = await self._client.post(url, json=alert)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RuntimeError(f"webhook returned {response.status_code}")
+        if response.status_code >= 400:
+            raise PermanentDeliveryError(f"webhook returned {response.status_code}")
+
+    def _send_email(self, address: str, alert: Dict[str, Any]):
+        message = EmailMessage()
+        count = f" (x{alert['count']})" if alert.get("repeated") else ""
+        message["Subject"] = f"[Super Agent] {alert['event']}{count}"
+        message["From"] = os.getenv("ALERT_EMAIL_FROM", "super-agent@localhost")
+        message["To"] = address
+        message.set_content(json.dumps(alert, indent=2, default=str))
+        with smtplib.SMTP(os.getenv("SMTP_HOST"), int(os.getenv("SMTP_PORT", "25")), timeout=10) as smtp:
+            if os.getenv("SMTP_STARTTLS", "false").lower() == "true":
+                smtp.starttls()
+            if os.getenv("SMTP_USER"):
+                smtp.login(os.getenv("SMTP_USER"), os.getenv("SMTP_PASSWORD", ""))
+            smtp.send_message(message)
+
+    def _build_channel(self, name: str, target: str) -> Optional[AlertChannel]:
+        if name == "webhook":
+            if self._client is None:
+                try:
+                    import httpx
+                except ImportError:
+                    logger.warning("httpx not installed, webhook alerts disabled")
+                    return None
+                # One pooled client: alerts reuse connections instead of reconnecting per send
+                self._client = httpx.AsyncClient(
+                    timeout=self.settings.get("timeout_seconds", 5),
+                    limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+                )
+            return AlertChannel(name, partial(self._post_webhook, target), self.settings, target)
+        if not os.getenv("SMTP_HOST"):
+            logger.warning("SMTP_HOST not set, email alerts disabled")
+            return None
+        return AlertChannel(
+            name, lambda alert: asyncio.to_thread(self._send_email, target, alert), self.settings, target
+        )
+
+    def _sync_channels(self):
+        """Match channels to the configured destinations; a dropped or retargeted one drains in the background"""
+        targets = {name: self.settings.get(name) for name in ("webhook", "email") if self.settings.get(name)}
+        for name, channel in list(self.channels.items()):
+            if targets.get(name) != channel.target:
+                del self.channels[name]
+                task = self._loop.create_task(channel.close(RETIRE_TIMEOUT_SECONDS))
+                self._retiring.add(task)
+                task.add_done_callback(self._retiring.discard)
+        for name, target in targets.items():
+            if name not in self.channels:
+                channel = self._build_channel(name, target)
+                if channel is not None:
+                    self.channels[name] = channel
+                    channel.start()
+
+    def start(self):
+        """Build channels for the configured destinations; needs the running loop"""
+        self._loop = asyncio.get_running_loop()
+        self._sync_channels()
+        self._flusher = self._loop.create_task(self._flush_windows())
+        logger.info("🔔 Alert channels: %s", list(self.channels) or 'none')
+
+    async def close(self, timeout: float = 5.0):
+        """Emit pending repeat summaries and give channels a bounded time to deliver"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        while self._windows:
+            self._close_window(*self._windows.popitem(last=False))
+        await asyncio.gather(*(channel.close(timeout) for channel in self.channels.values()), *self._retiring)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._loop = None
 
-    def send_alert(self, event, data):
-        pass
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "received_total": self.received_total,
+            "coalesced_total": self.coalesced_total,
+            "open_windows": len(self._windows),
+            "channels": {name: channel.stats() for name, channel in self.channels.items()},
+        }
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    """Buffers audit events in memory and appends them to disk in batches"""
+
+    def __init__(self, path: str = "logs/audit.log", flush_interval: float = 1.0, max_buffer: int = 500):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: List[str] = []
+        self._flush_task = None
+        self._lock = None
+        self.written_total = 0
+
+    def record(self, event: str, data: Dict[str, Any]):
+        """Queue an event; never blocks the caller on file I/O"""
+        self._buffer.append(json.dumps({
+            "timestamp": time.time(),
+            "event": event,
+            "data": data
+        }, default=str) + "\n")
+        if len(self._buffer) >= self.max_buffer:
+            asyncio.get_running_loop().create_task(self.flush())
+
+    def _append(self, lines: List[str]):
+        self.path.parent.mkdir(exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.writelines(lines)
+
+    async def flush(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+            try:
+                await asyncio.to_thread(self._append, lines)
+                self.written_total += len(lines)
+            except OSError as e:
+                # Keep the events for the next attempt
+                self._buffer[:0] = lines
+                logger.error("Audit flush failed: %s", e)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
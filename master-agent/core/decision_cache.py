@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = "super-agent:decision:"
+
+
+def _connect_redis():
+    """Shared second tier from the bundled Redis; None when unavailable"""
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        logger.warning("redis package not installed, decision cache stays process-local")
+        return None
+
+    return redis.Redis(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", "6379")),
+        password=os.getenv("REDIS_PASSWORD") or None,
+        # A slow shared tier must not cost more than recomputing
+        socket_timeout=0.05,
+        socket_connect_timeout=0.2,
+    )
+
+
+class DecisionCache:
+    """Opt-in TTL/LRU cache of decisions with single-flight for identical tasks"""
+
+    def __init__(self, agents: Dict[str, Any], settings: Optional[Dict[str, Any]] = None):
+        self.agents = agents
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._redis = None
+        self.hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.uncacheable = 0
+        self.configure(settings or {})
+
+    def configure(self, settings):
+        self.enabled = settings.get("enabled", False)
+        self.ttl = settings.get("ttl_seconds", 300)
+        self.max_entries = settings.get("max_entries", 10000)
+        self.uncacheable_agents = set(settings.get("uncacheable_agents", []))
+        if settings.get("redis", False) and self._redis is None:
+            self._redis = _connect_redis()
+        elif not settings.get("redis", False):
+            self._redis = None
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def key(task: str, metadata: Dict[str, Any]) -> str:
+        normalized = " ".join(task.split())
+        payload = json.dumps([normalized, metadata], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _cacheable(self, decision: Dict[str, Any]) -> bool:
+        for item in decision.get("contributions", []):
+            # Timeouts and errors are transient; caching them would pin a bad answer
+            if item.get("status") != "ok":
+                return False
+            name = item.get("agent")
+            if name in self.uncacheable_agents or not getattr(self.agents.get(name), "cacheable", True):
+                return False
+        return True
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, decision = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return decision
+
+    def _put_local(self, key: str, decision: Dict[str, Any], ttl: Optional[float] = None):
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), decision)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _get_shared(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._redis is None:
+            return None
+        try:
+            pipe = self._redis.pipeline()
+            pipe.get(REDIS_PREFIX + key)
+            pipe.pttl(REDIS_PREFIX + key)
+            raw, ttl_ms = await pipe.execute()
+        except Exception as e:
+            logger.warning("Decision cache Redis read failed: %s", e)
+            return None
+        if raw is None:
+            return None
+        decision = json.loads(raw)
+        self._put_local(key, decision, ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else None)
+        return decision
+
+    async def _put_shared(self, key: str, decision: Dict[str, Any]):
+        try:
+            await self._redis.set(REDIS_PREFIX + key, json.dumps(decision, default=str), ex=int(self.ttl))
+        except Exception as e:
+            logger.warning("Decision cache Redis write failed: %s", e)
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Synchronous local-tier hit, so intake can answer before paying for a journal commit"""
+        if not self.enabled:
+            return None
+        decision = self._get_local(key)
+        if decision is not None:
+            self.hits += 1
+        return decision
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], bool]:
+        """Return (decision, cached); concurrent callers with one key share one computation"""
+        if not self.enabled:
+            return await compute(), False
+
+        decision = self._get_local(key)
+        if decision is not None:
+            self.hits += 1
+            return decision, True
+
+        leader = self._inflight.get(key)
+        if leader is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(leader), True
+            except asyncio.CancelledError:
+                # The leader's request went away; this caller still wants an answer
+                if not leader.cancelled():
+                    raise
+                return await compute(), False
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            decision = await self._get_shared(key)
+            if decision is not None:
+                self.l2_hits += 1
+                future.set_result(decision)
+                return decision, True
+
+            self.misses += 1
+            decision = await compute()
+            if self._cacheable(decision):
+                self._put_local(key, decision)
+                if self._redis is not None:
+                    asyncio.ensure_future(self._put_shared(key, decision))
+            else:
+                self.uncacheable += 1
+            future.set_result(decision)
+            return decision, False
+        except BaseException as e:
+            # Followers see the leader's failure rather than hanging
+            if not future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.l2_hits + self.coalesced + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "l2_hits": self.l2_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "uncacheable": self.uncacheable,
+            "hit_ratio": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            "shared_tier": self._redis is not None,
+        }
@@ -0,0 +1,262 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+import logging
+from pathlib import Path
+from typing import Dict, Any, Awaitable, Callable, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+REDIS_CHANNEL = "super-agent:events"
+
+
+def _connect_redis():
+    """Pub/sub connection to the bundled Redis; None when unavailable"""
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        logger.warning("redis package not installed, events stay within this worker")
+        return None
+
+    return redis.Redis(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", "6379")),
+        password=os.getenv("REDIS_PASSWORD") or None,
+    )
+
+
+class Subscriber:
+    """One connection's bounded queue of encoded events"""
+
+    def __init__(self, topics: Optional[Iterable[str]], max_queue: int):
+        self.topics: Optional[Set[str]] = set(topics) if topics else None
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.dropped = 0
+        self.closed = False
+
+    def wants(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def offer(self, message: str) -> bool:
+        """Enqueue without blocking; a full queue loses its oldest event"""
+        dropped = False
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            dropped = True
+        self.queue.put_nowait(message)
+        return not dropped
+
+    def close(self):
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        # Wakes the reader; None means the hub gave up on this subscriber
+        self.queue.put_nowait(None)
+
+    async def get(self) -> Optional[str]:
+        return await self.queue.get()
+
+
+class EventHub:
+    """In-process pub/sub for push channels, optionally fanned out across workers over Redis"""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.origin = uuid.uuid4().hex
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self.published_total = 0
+        self.dropped_total = 0
+        self.evicted_total = 0
+        self.configure(settings or {})
+
+    def configure(self, settings):
+        self.max_queue = settings.get("max_queue", 256)
+        # Drops a subscriber after this many lost events; it reconnects and resyncs
+        self.max_dropped = settings.get("max_dropped", 1000)
+        self.metrics_interval = settings.get("metrics_interval_seconds", 5)
+        self.redis_enabled = settings.get("redis", False)
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None) -> Subscriber:
+        subscriber = Subscriber(topics, self.max_queue)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def has_subscribers(self, topic: str) -> bool:
+        return any(subscriber.wants(topic) for subscriber in self._subscribers)
+
+    def _deliver(self, topic: str, message: str):
+        for subscriber in list(self._subscribers):
+            if subscriber.closed or not subscriber.wants(topic):
+                continue
+            if not subscriber.offer(message):
+                self.dropped_total += 1
+                if subscriber.dropped >= self.max_dropped:
+                    self.evicted_total += 1
+                    self.unsubscribe(subscriber)
+                    subscriber.close()
+                    logger.warning("Dropped slow event subscriber after %d lost events", subscriber.dropped)
+
+    @staticmethod
+    def encode(topic: str, data: Dict[str, Any]) -> str:
+        return json.dumps({"type": topic, "timestamp": time.time(), "data": data}, default=str)
+
+    def publish(self, topic: str, data: Dict[str, Any]):
+        """Fire-and-forget; safe to call from worker threads"""
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not self._loop:
+            self._loop.call_soon_threadsafe(self.publish, topic, data)
+            return
+
+        # Encoded once and shared by every subscriber
+        message = self.encode(topic, data)
+        self.published_total += 1
+        self._deliver(topic, message)
+        if self._redis is not None:
+            asyncio.ensure_future(self._publish_shared(topic, message))
+
+    async def _publish_shared(self, topic: str, message: str):
+        try:
+            await self._redis.publish(REDIS_CHANNEL, json.dumps([self.origin, topic, message]))
+        except Exception as e:
+            logger.warning("Event fanout to Redis failed: %s", e)
+
+    async def _listen(self):
+        """Deliver events published by other workers"""
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(REDIS_CHANNEL)
+                async for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    origin, topic, message = json.loads(item["data"])
+                    if origin != self.origin:
+                        self._deliver(topic, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Event fanout listener lost Redis: %s", e)
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.close()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        if self.redis_enabled and self._redis is None:
+            self._redis = _connect_redis()
+            if self._redis is not None:
+                self._listener_task = self._loop.create_task(self._listen())
+
+    async def close(self):
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+        self._subscribers.clear()
+        self._loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published_total": self.published_total,
+            "dropped_total": self.dropped_total,
+            "evicted_total": self.evicted_total,
+            "redis_fanout": self._redis is not None,
+        }
+
+
+async def _pump(subscriber: Subscriber, send: Callable[[str], Awaitable], receive: Callable[[], Awaitable],
+                on_message: Optional[Callable[[Dict[str, Any]], Awaitable]]):
+    """Events out, client messages in, until either side goes away"""
+
+    async def outbound():
+        while True:
+            message = await subscriber.get()
+            if message is None:
+                return
+            await send(message)
+
+    async def inbound():
+        while True:
+            # Reading also notices the client disconnecting while no events flow
+            text = await receive()
+            if not text:
+                return
+            try:
+                message = json.loads(text)
+            except ValueError:
+                continue
+            if on_message is not None and isinstance(message, dict):
+                reply = await on_message(message)
+                if reply is not None:
+                    await send(json.dumps(reply, default=str))
+
+    tasks = {asyncio.ensure_future(outbound()), asyncio.ensure_future(inbound())}
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # A disconnect surfaces as an exception here; it only ends the session
+                task.exception()
+
+
+async def pump_websocket(websocket, subscriber: Subscriber,
+                         on_message: Optional[Callable[[Dict[str, Any]], Awaitable]] = None):
+    """Stream a subscriber's events to an accepted WebSocket"""
+    await _pump(subscriber, websocket.send_text, websocket.receive_text, on_message)
+    if subscriber.closed:
+        # Evicted as a slow consumer, or the server is shutting down
+        try:
+            await websocket.close(code=1013, reason="Event stream closed")
+        except RuntimeError:
+            pass
+
+
+async def serve_unix(path: str, hub: EventHub, make_subscriber: Callable[[], Subscriber],
+                     on_message: Optional[Callable[[Dict[str, Any]], Awaitable]] = None):
+    """Local NDJSON event socket; only the server's user may connect"""
+    socket_path = Path(path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        socket_path.unlink()
+    except FileNotFoundError:
+        pass
+
+    async def handle(reader, writer):
+        subscriber = make_subscriber()
+
+        async def send(message: str):
+            writer.write(message.encode() + b"\n")
+            await writer.drain()
+
+        try:
+            await _pump(subscriber, send, reader.readline, on_message)
+        finally:
+            hub.unsubscribe(subscriber)
+            writer.close()
+
+    server = await asyncio.start_unix_server(handle, str(socket_path))
+    os.chmod(socket_path, 0o600)
+    logger.info("🔌 Operator event socket at %s", socket_path)
+    return server
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import logging
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, Callable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_SECTIONS = ("resource_allocation", "recovery", "acl_rules")
+POSITIVE_INT_FIELDS = ("ram_gb", "cpu_cores", "memory_limit_mb")
+
+
+class PolicyValidationError(ValueError):
+    """Security policy is malformed"""
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def validate_policy(data: Dict[str, Any]):
+    """Raise PolicyValidationError if the policy cannot be applied"""
+    if not isinstance(data, dict):
+        raise PolicyValidationError("Policy must be a JSON object")
+
+    for section in REQUIRED_SECTIONS:
+        if not isinstance(data.get(section), dict):
+            raise PolicyValidationError(f"Missing or invalid section: {section}")
+
+    alloc = data["resource_allocation"]
+    for field in POSITIVE_INT_FIELDS:
+        value = alloc.get(field)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            raise PolicyValidationError(f"resource_allocation.{field} must be a positive integer")
+
+    if not isinstance(alloc.get("gpu_memory_gb", 0), (int, float)):
+        raise PolicyValidationError("resource_allocation.gpu_memory_gb must be a number")
+
+    # A bucket that can never hold a whole token would stall its alert channel forever
+    alerts = data.get("alerts", {})
+    burst = alerts.get("burst", 1) if isinstance(alerts, dict) else 1
+    if not isinstance(burst, int) or isinstance(burst, bool) or burst < 1:
+        raise PolicyValidationError("alerts.burst must be an integer of at least 1")
+
+
+class PolicySnapshot:
+    """Immutable view of one version of the policy"""
+
+    def __init__(self, data: Dict[str, Any], version: int):
+        self.data: Mapping[str, Any] = _freeze(data)
+        self.version = version
+        self.loaded_at = time.time()
+
+    def __getitem__(self, section: str) -> Any:
+        return self.data[section]
+
+    def get(self, section: str, default: Any = None) -> Any:
+        return self.data.get(section, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Mutable deep copy, e.g. for serialization or building an update"""
+        return _thaw(self.data)
+
+
+class PolicyStore:
+    """Single owner of security-policy.json: load once, swap atomically, notify"""
+
+    def __init__(self, path: str = "config/security-policy.json", poll_interval: float = 1.0):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self._subscribers: List[Callable[[PolicySnapshot, PolicySnapshot], Any]] = []
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._watch_task: Optional[asyncio.Task] = None
+
+        data = self._read()
+        validate_policy(data)
+        self._file_key = self._stat_key()
+        self._snapshot = PolicySnapshot(data, version=1)
+
+    @property
+    def snapshot(self) -> PolicySnapshot:
+        return self._snapshot
+
+    def get(self, section: str, default: Any = None) -> Any:
+        return self._snapshot.get(section, default)
+
+    def subscribe(self, callback: Callable[[PolicySnapshot, PolicySnapshot], Any]):
+        """Call callback(old, new) after every swap; coroutine functions are scheduled"""
+        self._subscribers.append(callback)
+
+    def _read(self) -> Dict[str, Any]:
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def _stat_key(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _write_atomic(self, data: Dict[str, Any]) -> Optional[Tuple[int, int, int]]:
+        """Write to a temp file in the same directory, fsync, then rename over the policy"""
+        fd, tmp_path = tempfile.mkstemp(prefix=".security-policy.", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        dir_fd = os.open(self.path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        return self._stat_key()
+
+    def _swap(self, data: Dict[str, Any]) -> PolicySnapshot:
+        old = self._snapshot
+        new = PolicySnapshot(data, version=old.version + 1)
+        self._snapshot = new
+
+        for callback in self._subscribers:
+            try:
+                result = callback(old, new)
+                if asyncio.iscoroutine(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                logger.error("Policy subscriber %r failed: %s", callback, e, exc_info=True)
+
+        logger.info("🔄 Security policy v%s active", new.version)
+        return new
+
+    async def update(self, section: str, changes: Dict[str, Any]) -> PolicySnapshot:
+        """Merge changes into a section, persist off the event loop and swap"""
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+
+        async with self._write_lock:
+            data = self._snapshot.to_dict()
+            data.setdefault(section, {}).update(changes)
+            validate_policy(data)
+
+            self._file_key = await asyncio.to_thread(self._write_atomic, data)
+            return self._swap(data)
+
+    async def reload(self) -> Optional[PolicySnapshot]:
+        """Pick up an external edit of the policy file, keeping the old policy if invalid"""
+        key = self._stat_key()
+        if key is None or key == self._file_key:
+            return None
+
+        try:
+            data = await asyncio.to_thread(self._read)
+            validate_policy(data)
+        except (OSError, ValueError) as e:
+            # Editors may leave a half-written file; retry on the next change
+            logger.error("❌ Ignoring invalid policy edit: %s", e)
+            self._file_key = key
+            return None
+
+        self._file_key = key
+        if data == self._snapshot.to_dict():
+            return None
+        return self._swap(data)
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error("Policy watch error: %s", e, exc_info=True)
+
+    def start_watching(self):
+        if self._watch_task is None:
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch())
+            logger.info("👀 Watching %s for policy changes", self.path)
+
+    async def stop_watching(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
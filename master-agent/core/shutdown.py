@@ -1,4 +1,125 @@
-# Placeholder for graceful shutdown
+import asyncio
+import time
+import logging
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ShuttingDown(Exception):
+    """New work is refused because the server is draining"""
+
+
+class TaskInterrupted(Exception):
+    """In-flight work was cut off at the drain deadline"""
+
+
 class GracefulShutdown:
-    def __init__(self, app):
-        pass
+    """Stops intake, drains in-flight tasks within a deadline and flushes buffers"""
+
+    def __init__(self, app, drain_timeout: float = 30.0):
+        self.app = app
+        self.drain_timeout = drain_timeout
+        # Coroutine function receiving the work cut off at the deadline
+        self.persist_unfinished: Optional[Callable[[List[Dict[str, Any]]], Awaitable]] = None
+        self.accepting = True
+        self._in_flight: Dict[asyncio.Task, Tuple[str, Dict[str, Any]]] = {}
+        self._on_drain: List[Tuple[str, Callable]] = []
+        self._on_flush: List[Tuple[str, Callable]] = []
+        self._drain_task = None
+
+    @property
+    def state(self) -> str:
+        return "accepting" if self.accepting else "draining"
+
+    def configure(self, policy):
+        self.drain_timeout = policy.get("shutdown", {}).get("drain_timeout_seconds", self.drain_timeout)
+
+    def on_drain(self, name: str, fn: Callable):
+        """Run fn() as soon as draining starts, e.g. to release waiting requests"""
+        self._on_drain.append((name, fn))
+
+    def on_flush(self, name: str, fn: Callable):
+        """Run fn() after in-flight work has finished or been cut off"""
+        self._on_flush.append((name, fn))
+
+    async def run(self, key: str, payload: Dict[str, Any], work: Awaitable) -> Any:
+        """Run tracked work; payload is what gets persisted if it is cut off"""
+        if not self.accepting:
+            work.close()
+            raise ShuttingDown("Server is shutting down")
+
+        task = asyncio.ensure_future(work)
+        self._in_flight[task] = (key, payload)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if not self.accepting and task.cancelled():
+                raise TaskInterrupted(f"Task {key} interrupted by shutdown and saved for resume")
+            raise
+        finally:
+            self._in_flight.pop(task, None)
+
+    async def _call_hooks(self, hooks: List[Tuple[str, Callable]]):
+        for name, fn in hooks:
+            try:
+                result = fn()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error("Shutdown hook %s failed: %s", name, e, exc_info=True)
+
+    async def _drain(self):
+        started = time.monotonic()
+        self.accepting = False
+        logger.info("🛑 Draining %s in-flight tasks (deadline %ss)", len(self._in_flight), self.drain_timeout)
+        await self._call_hooks(self._on_drain)
+
+        pending = set(self._in_flight)
+        if pending:
+            _, pending = await asyncio.wait(pending, timeout=self.drain_timeout)
+
+        if pending:
+            unfinished = [
+                {"task_id": key, "payload": payload, "interrupted_at": time.time()}
+                for key, payload in (self._in_flight[task] for task in pending if task in self._in_flight)
+            ]
+            for task in pending:
+                task.cancel()
+            await asyncio.wait(pending, timeout=1.0)
+            if self.persist_unfinished is not None:
+                try:
+                    await self.persist_unfinished(unfinished)
+                except Exception as e:
+                    logger.error("Could not persist unfinished tasks: %s", e, exc_info=True)
+            logger.warning("⏱️ Drain deadline hit, %s tasks left unfinished", len(unfinished))
+
+        await self._call_hooks(self._on_flush)
+        logger.info("✅ Drained in %.2fs", time.monotonic() - started)
+
+    async def drain(self):
+        """Idempotent: every caller waits for the same drain"""
+        if self._drain_task is None:
+            self._drain_task = asyncio.ensure_future(self._drain())
+        await asyncio.shield(self._drain_task)
+
+    def attach(self, server):
+        """Drain on the first SIGTERM/SIGINT before letting uvicorn stop"""
+        original = server.handle_exit
+
+        def handle_exit(sig, frame):
+            if not self.accepting or self._drain_task is not None:
+                # Second signal: fall through to uvicorn's forced exit
+                original(sig, frame)
+                return
+
+            self.accepting = False
+            loop = asyncio.get_event_loop()
+
+            def begin():
+                self._drain_task = asyncio.ensure_future(self._drain())
+                self._drain_task.add_done_callback(lambda _: original(sig, frame))
+
+            loop.call_soon_threadsafe(begin)
+
+        server.handle_exit = handle_exit
@@ -0,0 +1,57 @@
+import asyncio
+import time
+import logging
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTracker:
+    """Runs subsystem initializers in stages and records how long each took"""
+
+    def __init__(self):
+        self.state = "starting"
+        self.error: Optional[str] = None
+        self.timings_ms: Dict[str, float] = {}
+        self._started = time.monotonic()
+        self.total_ms: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    async def step(self, name: str, fn: Callable, *args, threaded: bool = True) -> Any:
+        """Run one initializer, in a worker thread unless it must stay on the loop thread"""
+        start = time.monotonic()
+        try:
+            if threaded:
+                return await asyncio.to_thread(fn, *args)
+            return fn(*args)
+        finally:
+            self.timings_ms[name] = round((time.monotonic() - start) * 1000, 1)
+
+    async def stage(self, **steps) -> Dict[str, Any]:
+        """Run independent initializers concurrently: stage(name=(fn, *args), ...)"""
+        names = list(steps)
+        results = await asyncio.gather(*(self.step(name, *steps[name]) for name in names))
+        return dict(zip(names, results))
+
+    def mark_ready(self):
+        self.state = "ready"
+        self.total_ms = round((time.monotonic() - self._started) * 1000, 1)
+        slowest = sorted(self.timings_ms.items(), key=lambda item: item[1], reverse=True)
+        logger.info("✅ Startup complete in %sms: %s", self.total_ms, dict(slowest))
+
+    def mark_failed(self, error: Exception):
+        self.state = "failed"
+        self.error = str(error)
+        logger.error("❌ Startup failed: %s", error, exc_info=error)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "total_ms": self.total_ms,
+            "elapsed_ms": round((time.monotonic() - self._started) * 1000, 1),
+            "subsystems_ms": dict(self.timings_ms),
+            "error": self.error,
+        }
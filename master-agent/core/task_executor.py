@@ -0,0 +1,329 @@
+import asyncio
+import os
+import subprocess
+import sys
+import itertools
+import logging
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable
+
+from .admission_controller import CGROUP_ROOT, current_reservation
+from .agent_worker import parse_cpuset  # noqa: F401 - re-exported for callers of this module
+
+logger = logging.getLogger(__name__)
+
+CONTROLLERS = ("memory", "cpu", "cpuset")
+CPU_PERIOD_US = 100000
+
+# A worker that has not built and warmed its agent by then is killed
+WORKER_START_TIMEOUT_SECONDS = 60.0
+
+
+class TaskKilled(Exception):
+    """The isolated task was killed (timeout, OOM or crash)"""
+
+
+def default_cpuset(cpu_cores: Optional[int]) -> str:
+    """The first cpu_cores cores this process may run on, as a cpuset list"""
+    cores = sorted(os.sched_getaffinity(0))
+    if not cpu_cores or cpu_cores >= len(cores):
+        return ""
+    return ",".join(str(core) for core in cores[:cpu_cores])
+
+
+class CgroupTree:
+    """Delegated cgroup v2 subtree holding one child cgroup per worker"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.tasks_dir = root / "tasks"
+
+    @classmethod
+    def setup(cls, root_override: str = "") -> Optional["CgroupTree"]:
+        try:
+            if root_override:
+                root = Path(root_override)
+            else:
+                with open("/proc/self/cgroup", 'r') as f:
+                    line = next((l for l in f if l.startswith("0::")), None)
+                if line is None:
+                    return None
+                root = CGROUP_ROOT / line[3:].strip().lstrip("/")
+
+            available = (root / "cgroup.controllers").read_text().split()
+            if not all(c in available for c in CONTROLLERS):
+                logger.warning("cgroup %s lacks controllers %s, using rlimits", root, CONTROLLERS)
+                return None
+
+            tree = cls(root)
+            # No-internal-process rule: move ourselves into a leaf before
+            # enabling controllers for the children of root. Only our own pid:
+            # anything else left in root means it is not ours to delegate,
+            # and enabling controllers below fails with EBUSY
+            leaf = root / "master"
+            leaf.mkdir(exist_ok=True)
+            (leaf / "cgroup.procs").write_text(str(os.getpid()))
+            enable = " ".join(f"+{c}" for c in CONTROLLERS)
+            (root / "cgroup.subtree_control").write_text(enable)
+            tree.tasks_dir.mkdir(exist_ok=True)
+            (tree.tasks_dir / "cgroup.subtree_control").write_text(enable)
+            return tree
+        except (OSError, StopIteration) as e:
+            logger.warning("cgroup v2 delegation unavailable, using rlimits: %s", e)
+            return None
+
+    def create(self, name: str, limits: Dict[str, Any]) -> Path:
+        path = self.tasks_dir / name
+        path.mkdir()
+        (path / "memory.max").write_text(str(limits["memory_max_mb"] * 1024 * 1024))
+        # Swap would let a runaway task dodge memory.max
+        try:
+            (path / "memory.swap.max").write_text("0")
+        except OSError:
+            pass
+        quota = int(CPU_PERIOD_US * limits["cpu_max_percent"] / 100)
+        (path / "cpu.max").write_text(f"{quota} {CPU_PERIOD_US}" if quota > 0 else "max")
+        if limits.get("cpuset"):
+            (path / "cpuset.cpus").write_text(limits["cpuset"])
+        return path
+
+    @staticmethod
+    def read_events(path: Path) -> Dict[str, int]:
+        try:
+            lines = (path / "memory.events").read_text().splitlines()
+            return {k: int(v) for k, v in (line.split() for line in lines)}
+        except OSError:
+            return {}
+
+    @staticmethod
+    def remove(path: Path):
+        try:
+            path.rmdir()
+        except OSError as e:
+            logger.warning("Could not remove cgroup %s: %s", path, e)
+
+
+class AgentWorker:
+    """Long-lived child process hosting one agent instance, confined to its own cgroup once
+
+    Calls are served one at a time; a call that times out, is cancelled or kills
+    the worker leaves it stopped, and the next call starts a fresh one."""
+
+    def __init__(self, executor: "IsolatedExecutor", name: str, factory: Optional[Callable[[], Any]]):
+        self.executor = executor
+        self.name = name
+        self.factory = factory
+        self.process: Optional[subprocess.Popen] = None
+        self.cgroup: Optional[Path] = None
+        self.limits: Dict[str, Any] = {}
+        self.cacheable = True
+        self.restarts = 0
+        self.calls_total = 0
+        self._status: Dict[str, Any] = {}
+        self._killed = False
+        self._requests: Optional[Connection] = None
+        self._replies: Optional[Connection] = None
+
+    @property
+    def alive(self) -> bool:
+        # A killed worker may not have been reaped yet
+        return self.process is not None and not self._killed and self.process.poll() is None
+
+    def start(self):
+        """Spawn the worker and wait until its agent is built and warmed up; blocks"""
+        self.limits = dict(self.executor.limits)
+        self._killed = False
+        worker_name = f"{self.name}-{os.getpid()}-{next(self.executor._ids)}"
+        if self.executor.cgroups:
+            try:
+                self.cgroup = self.executor.cgroups.create(worker_name, self.limits)
+            except OSError as e:
+                logger.warning("Could not create cgroup %s, using rlimits: %s", worker_name, e)
+
+        request_read, request_write = os.pipe()
+        reply_read, reply_write = os.pipe()
+        # The child finds core/, agents/ and whatever module the factory lives in
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, sys.path))}
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "core.agent_worker", str(request_read), str(reply_write)],
+                pass_fds=(request_read, reply_write), env=env,
+            )
+        except OSError:
+            os.close(request_write)
+            os.close(reply_read)
+            self._release_cgroup()
+            raise
+        finally:
+            os.close(request_read)
+            os.close(reply_write)
+        self._requests = Connection(request_write, readable=False)
+        self._replies = Connection(reply_read, writable=False)
+
+        try:
+            self._requests.send((self.factory, str(self.cgroup / "cgroup.procs") if self.cgroup else None, self.limits))
+            if not self._replies.poll(WORKER_START_TIMEOUT_SECONDS):
+                raise TaskKilled(f"worker {worker_name} not ready after {WORKER_START_TIMEOUT_SECONDS}s")
+            ok, payload, _ = self._replies.recv()
+        except EOFError:
+            self.stop()
+            raise TaskKilled(f"worker {worker_name} exited with code {self.process.wait()} while starting")
+        except BaseException:
+            self.stop()
+            raise
+        if not ok:
+            self.stop()
+            raise RuntimeError(payload)
+        self._status, self.cacheable = payload["status"], payload["cacheable"]
+        self.executor.workers.add(self)
+
+    def stop(self):
+        """Close the pipes so the worker exits, killing it if it does not; blocks briefly"""
+        if self.process is None:
+            return
+        self.executor.workers.discard(self)
+        for conn in (self._requests, self._replies):
+            if conn is not None:
+                conn.close()
+        self._requests = self._replies = None
+        try:
+            self.process.wait(1.0)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self._release_cgroup()
+
+    def _release_cgroup(self):
+        if self.cgroup is not None:
+            CgroupTree.remove(self.cgroup)
+            self.cgroup = None
+
+    async def call(self, target, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run agent.<target>(*args, **kwargs), or target itself if callable, in the worker"""
+        if not self.alive:
+            if self.process is not None:
+                self.restarts += 1
+                await asyncio.to_thread(self.stop)
+            await asyncio.to_thread(self.start)
+
+        executor = self.executor
+        loop = asyncio.get_running_loop()
+        oom_kills = CgroupTree.read_events(self.cgroup).get("oom_kill", 0) if self.cgroup else 0
+        executor.running += 1
+        self.calls_total += 1
+        try:
+            self._requests.send((target, args, kwargs))
+            # The pipe becomes readable on a result or on EOF when the worker dies
+            ready = loop.create_future()
+            loop.add_reader(self._replies.fileno(), lambda: ready.done() or ready.set_result(None))
+            try:
+                await asyncio.wait_for(ready, timeout)
+            except asyncio.TimeoutError:
+                executor.killed_total += 1
+                raise TaskKilled(f"{self.name} exceeded {timeout}s")
+            finally:
+                loop.remove_reader(self._replies.fileno())
+
+            try:
+                ok, payload, peak_mb = self._replies.recv()
+            except EOFError:
+                executor.killed_total += 1
+                if self.cgroup and CgroupTree.read_events(self.cgroup).get("oom_kill", 0) > oom_kills:
+                    executor.oom_killed_total += 1
+                    raise TaskKilled(f"{self.name} killed by OOM at {self.limits['memory_max_mb']}MB")
+                code = await asyncio.to_thread(self.process.wait)
+                raise TaskKilled(f"{self.name} died with exit code {code}")
+        except BaseException:
+            # Killed, timed out or cancelled mid-call: a late reply would answer the next call
+            if self.alive:
+                self.process.kill()
+                self._killed = True
+            raise
+        finally:
+            executor.running -= 1
+
+        reservation = current_reservation.get()
+        if reservation is not None:
+            reservation.observe_peak(peak_mb)
+        if not ok:
+            raise RuntimeError(payload)
+        executor.completed_total += 1
+        return payload
+
+    async def handle(self, task: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self.call("handle", task, timeout=timeout)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            **self._status,
+            "pid": self.process.pid if self.alive else None,
+            "calls_total": self.calls_total,
+            "restarts": self.restarts,
+        }
+
+
+class IsolatedExecutor:
+    """Hosts agents in long-lived worker processes, each confined to its own cgroup"""
+
+    def __init__(self, store):
+        self.configure(store.snapshot)
+        settings = store.get("isolation", {})
+        self.cgroups = CgroupTree.setup(settings.get("cgroup_root", "")) if self.enabled else None
+        store.subscribe(lambda old, new: self.configure(new))
+        self._ids = itertools.count(1)
+        self.workers = set()
+        self.running = 0
+        self.completed_total = 0
+        self.killed_total = 0
+        self.oom_killed_total = 0
+
+        mode = f"cgroup v2 at {self.cgroups.tasks_dir}" if self.cgroups else "rlimits"
+        logger.info("🧱 Task isolation: %s, limits %s", mode, self.limits)
+
+    def configure(self, policy):
+        """Settings apply to workers started after the call; the cgroup root is fixed at startup"""
+        settings = policy.get("isolation", {})
+        alloc = policy.get("resource_allocation", {})
+        self.enabled = settings.get("enabled", True)
+        self.limits = {
+            "memory_max_mb": settings.get("memory_max_mb", alloc.get("memory_limit_mb", 2048)),
+            "cpu_max_percent": settings.get("cpu_max_percent", 100),
+            # Without an explicit cpuset each worker gets the policy's cpu_cores
+            "cpuset": settings.get("cpuset") or default_cpuset(alloc.get("cpu_cores")),
+        }
+
+    def isolates(self, factory: Callable[[], Any]) -> bool:
+        """Whether agents built by factory run in a worker; agent classes opt out with isolated = False"""
+        target = getattr(factory, "func", factory)
+        return self.enabled and getattr(target, "isolated", True)
+
+    def start_worker(self, name: str, factory: Callable[[], Any]) -> AgentWorker:
+        """A started worker hosting factory()'s agent, warmed up; blocks until it is ready"""
+        worker = AgentWorker(self, name, factory)
+        worker.start()
+        return worker
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) once in a worker of its own and return its result"""
+        if not self.enabled:
+            if asyncio.iscoroutinefunction(fn):
+                return await fn(*args, **kwargs)
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+        worker = await asyncio.to_thread(self.start_worker, "task", None)
+        try:
+            return await worker.call(fn, *args, timeout=timeout, **kwargs)
+        finally:
+            await asyncio.to_thread(worker.stop)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "disabled" if not self.enabled else ("cgroup" if self.cgroups else "rlimit"),
+            "limits": dict(self.limits),
+            "workers": len(self.workers),
+            "running": self.running,
+            "completed_total": self.completed_total,
+            "killed_total": self.killed_total,
+            "oom_killed_total": self.oom_killed_total,
+        }
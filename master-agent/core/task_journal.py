@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+import time
+import logging
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = ("completed", "failed", "cancelled")
+
+
+class TaskJournal:
+    """Append-only task log with group commit, compaction and crash recovery"""
+
+    def __init__(self, path: str = "state/tasks.journal", settings: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self._tasks: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._finished: deque = deque()
+        self._pending: List[tuple] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._file = None
+        self._records_since_compact = 0
+        self.commits_total = 0
+        self.records_total = 0
+        self.configure(settings or {})
+
+    def configure(self, settings):
+        self.commit_window = settings.get("commit_window_ms", 2.0) / 1000
+        self.compact_after = settings.get("compact_after_records", 50000)
+        self.retain_completed = settings.get("retain_completed", 10000)
+
+    def _apply(self, record: Dict[str, Any]):
+        task_id = record["id"]
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            entry = self._tasks[task_id] = {"task_id": task_id}
+        for key, value in record.items():
+            if key not in ("id", "t"):
+                entry[key] = value
+        entry["updated_at"] = record["t"]
+        entry.setdefault("submitted_at", record["t"])
+
+        if record.get("state") in TERMINAL_STATES:
+            entry.pop("payload", None)
+            self._finished.append(task_id)
+            while len(self._finished) > self.retain_completed:
+                self._tasks.pop(self._finished.popleft(), None)
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Replay the journal; returns tasks that never reached a terminal state"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        replayed = 0
+        if self.path.exists():
+            valid_bytes = 0
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # A crash mid-write leaves a torn final line; drop it so appends stay aligned
+                        logger.warning("Truncating torn record at the end of %s", self.path)
+                        break
+                    valid_bytes += len(line)
+                    try:
+                        self._apply(json.loads(line))
+                        replayed += 1
+                    except (ValueError, KeyError):
+                        logger.warning("Skipping corrupt journal line in %s", self.path)
+            if valid_bytes < self.path.stat().st_size:
+                os.truncate(self.path, valid_bytes)
+        self._records_since_compact = replayed
+        self._file = open(self.path, 'a')
+
+        unfinished = [
+            {"task_id": entry["task_id"], "payload": entry["payload"]}
+            for entry in self._tasks.values()
+            if entry.get("state") not in TERMINAL_STATES and "payload" in entry
+        ]
+        logger.info("📒 Task journal: replayed %s records, %s unfinished", replayed, len(unfinished))
+        return unfinished
+
+    def record(self, task_id: str, state: str, **fields) -> asyncio.Future:
+        """Apply to the index now; the returned future resolves once the record is on disk"""
+        record = {"id": task_id, "t": time.time(), "state": state, **fields}
+        self._apply(record)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((json.dumps(record, default=str) + "\n", future))
+        self._wakeup.set()
+        return future
+
+    async def submitted(self, task_id: str, payload: Dict[str, Any]):
+        # Only intake is awaited: a lost completion just re-runs the task on recovery
+        await self.record(task_id, "submitted", payload=payload)
+
+    def started(self, task_id: str):
+        self.record(task_id, "started")
+
+    def completed(self, task_id: str, result: Dict[str, Any]):
+        self.record(task_id, "completed", result=result)
+
+    def failed(self, task_id: str, error: str):
+        self.record(task_id, "failed", error=error)
+
+    def cancelled(self, task_id: str, reason: str):
+        """Abandoned by the client: terminal, so recovery does not re-run it"""
+        self.record(task_id, "cancelled", reason=reason)
+
+    async def interrupted(self, entries: List[Dict[str, Any]]):
+        """Persistence hook for GracefulShutdown: the payload is already journaled"""
+        await asyncio.gather(*(self.record(entry["task_id"], "interrupted") for entry in entries))
+
+    def _write_batch(self, lines: List[str]):
+        self._file.write("".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _compact(self, snapshot: List[Dict[str, Any]]):
+        """Rewrite the journal as one record per retained task"""
+        tmp_path = self.path.with_suffix(".compact")
+        with open(tmp_path, 'w') as f:
+            for entry in snapshot:
+                record = {key: value for key, value in entry.items() if key != "task_id"}
+                record.update({"id": entry["task_id"], "t": entry["updated_at"]})
+                f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file.close()
+        self._file = open(self.path, 'a')
+
+    async def _commit(self):
+        batch, self._pending = self._pending, []
+        try:
+            await asyncio.to_thread(self._write_batch, [line for line, _ in batch])
+        except OSError as e:
+            logger.error("Task journal write failed: %s", e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()
+            return
+
+        self.commits_total += 1
+        self.records_total += len(batch)
+        self._records_since_compact += len(batch)
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+        if self._records_since_compact >= self.compact_after:
+            snapshot = [dict(entry) for entry in self._tasks.values()]
+            await asyncio.to_thread(self._compact, snapshot)
+            self._records_since_compact = len(snapshot)
+            logger.info("🗜️ Compacted task journal to %s records", len(snapshot))
+
+    async def _writer(self):
+        while not self._closing:
+            await self._wakeup.wait()
+            # Let concurrent submissions pile up so one fsync covers them all
+            await asyncio.sleep(self.commit_window)
+            self._wakeup.clear()
+            await self._commit()
+
+    def start(self):
+        if self._writer_task is None:
+            self._wakeup = asyncio.Event()
+            self._writer_task = asyncio.get_running_loop().create_task(self._writer())
+
+    async def close(self):
+        if self._writer_task is not None:
+            # Let the writer finish its current batch instead of cancelling mid-fsync
+            self._closing = True
+            self._wakeup.set()
+            await self._writer_task
+            self._writer_task = None
+        if self._pending:
+            await self._commit()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._tasks.get(task_id)
+        return dict(entry) if entry is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tasks": len(self._tasks),
+            "pending_records": len(self._pending),
+            "records_total": self.records_total,
+            "commits_total": self.commits_total,
+            "records_per_commit": round(self.records_total / self.commits_total, 2) if self.commits_total else 0.0,
+        }
@@ -0,0 +1,400 @@
+import asyncio
+import os
+import secrets
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class VaultError(Exception):
+    """The sharded vault could not serve the request"""
+
+
+class SecretNotFound(VaultError, KeyError):
+    """No shard holds a share for the key"""
+
+    def __str__(self):
+        return f"No vault secret named {self.args[0]}"
+
+
+class VaultUnavailable(VaultError):
+    """Fewer than threshold shards answered in time"""
+
+
+# GF(256) with the AES polynomial; generator 3
+_EXP = [0] * 510
+_LOG = [0] * 256
+_x = 1
+for _i in range(255):
+    _EXP[_i] = _EXP[_i + 255] = _x
+    _LOG[_x] = _i
+    _x ^= (_x << 1) ^ (0x11b if _x & 0x80 else 0)
+
+
+def _mul(a: int, b: int) -> int:
+    if a == 0 or b == 0:
+        return 0
+    return _EXP[_LOG[a] + _LOG[b]]
+
+
+def _div(a: int, b: int) -> int:
+    if a == 0:
+        return 0
+    return _EXP[(_LOG[a] - _LOG[b]) % 255]
+
+
+def zeroize(buffer: bytearray):
+    buffer[:] = bytes(len(buffer))
+
+
+def split_secret(secret: bytes, threshold: int, shares: int) -> List[str]:
+    """Shamir-split secret into "<x>:<hex>" shares, any threshold of which rebuild it"""
+    if not 1 <= threshold <= shares <= 255:
+        raise ValueError("Need 1 <= threshold <= shares <= 255")
+    ys = [bytearray(len(secret)) for _ in range(shares)]
+    coefficients = bytearray(threshold)
+    for position, byte in enumerate(secret):
+        coefficients[0] = byte
+        coefficients[1:] = secrets.token_bytes(threshold - 1)
+        for index in range(shares):
+            x, y = index + 1, 0
+            # Horner, highest coefficient first
+            for coefficient in reversed(coefficients):
+                y = _mul(y, x) ^ coefficient
+            ys[index][position] = y
+    zeroize(coefficients)
+    encoded = [f"{index + 1}:{y.hex()}" for index, y in enumerate(ys)]
+    for y in ys:
+        zeroize(y)
+    return encoded
+
+
+def parse_share(text: str) -> Tuple[int, bytearray]:
+    x, _, hex_value = text.strip().partition(":")
+    if not x.isdigit() or not 1 <= int(x) <= 255:
+        raise ValueError("Malformed share")
+    return int(x), bytearray.fromhex(hex_value)
+
+
+def combine_shares(shares: Dict[int, bytearray]) -> bytearray:
+    """Lagrange interpolation at x=0 over {x: y-bytes}; the caller owns (and should zeroize) the result"""
+    xs = list(shares)
+    length = len(shares[xs[0]])
+    if any(len(y) != length for y in shares.values()):
+        raise ValueError("Shares have different lengths")
+    # The basis depends only on the x coordinates, so it is computed once per secret, not per byte
+    basis = {}
+    for xj in xs:
+        numerator = denominator = 1
+        for xm in xs:
+            if xm != xj:
+                numerator = _mul(numerator, xm)
+                denominator = _mul(denominator, xm ^ xj)
+        basis[xj] = _div(numerator, denominator)
+
+    secret = bytearray(length)
+    for xj, y in shares.items():
+        weight = basis[xj]
+        for position in range(length):
+            secret[position] ^= _mul(y[position], weight)
+    return secret
+
+
+class ShardPool:
+    """Persistent connections to one shard, each carrying one request at a time"""
+
+    def __init__(self, address: str, size: int, timeout: float):
+        self.address = address
+        self.size = size
+        host, _, port = address.rpartition(":")
+        self.host, self.port = host or "localhost", int(port)
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.opened_total = 0
+        self.errors_total = 0
+
+    async def _open(self):
+        connection = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        self.opened_total += 1
+        return connection
+
+    async def request(self, command: str) -> str:
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            while True:
+                fresh = connection is None
+                if fresh:
+                    connection = await self._open()
+                reader, writer = connection
+                try:
+                    writer.write(command.encode() + b"\n")
+                    await writer.drain()
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if not line:
+                        raise ConnectionResetError(f"shard {self.address} closed the connection")
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    # A late reply would be read as the answer to the next command
+                    writer.close()
+                    self.errors_total += 1
+                    raise
+                except (OSError, asyncio.IncompleteReadError):
+                    writer.close()
+                    self.errors_total += 1
+                    if fresh:
+                        raise
+                    # An idle pooled connection went stale; retry once on a new one
+                    connection = None
+                    continue
+                self._idle.append(connection)
+                return line.decode().rstrip("\n")
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"idle": len(self._idle), "opened_total": self.opened_total, "errors_total": self.errors_total}
+
+
+class SecretCache:
+    """Reconstructed secrets with a TTL; evicted values are overwritten in place"""
+
+    def __init__(self):
+        # key -> (secret, refresh_at, expires_at)
+        self._entries: "OrderedDict[str, Tuple[bytearray, float, float]]" = OrderedDict()
+        self.evicted_total = 0
+
+    def lookup(self, key: str) -> Optional[Tuple[bytes, bool]]:
+        """(copy of the secret, due for refresh) or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        secret, refresh_at, expires_at = entry
+        now = time.monotonic()
+        if now >= expires_at:
+            self.evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return bytes(secret), now >= refresh_at
+
+    def put(self, key: str, secret: bytearray, ttl: float, refresh_ahead: float, max_entries: int):
+        """Takes ownership of secret"""
+        self.evict(key)
+        now = time.monotonic()
+        self._entries[key] = (secret, now + max(ttl - refresh_ahead, 0), now + ttl)
+        while len(self._entries) > max_entries:
+            self.evict(next(iter(self._entries)))
+
+    def evict(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            zeroize(entry[0])
+            self.evicted_total += 1
+
+    def sweep(self):
+        now = time.monotonic()
+        for key in [key for key, (_, _, expires_at) in self._entries.items() if expires_at <= now]:
+            self.evict(key)
+
+    def clear(self):
+        for key in list(self._entries):
+            self.evict(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class VaultClient:
+    """Reads secrets from the sharded vault: parallel GETs, done at threshold shares, cached with refresh-ahead"""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.pools: Dict[str, ShardPool] = {}
+        self.cache = SecretCache()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Replies still outstanding after threshold was reached; they finish to keep connections reusable
+        self._stragglers: Set[asyncio.Task] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.failures = 0
+        self._fetch_ms_total = 0.0
+        self._fetches = 0
+        self.configure(settings or {})
+
+    def configure(self, settings):
+        self.enabled = settings.get("enabled", False)
+        threshold = os.getenv("VAULT_THRESHOLD", "")
+        self.threshold = int(threshold) if threshold.isdigit() else settings.get("threshold", 2)
+        self.timeout = settings.get("timeout_ms", 500) / 1000
+        self.ttl = settings.get("cache_ttl_seconds", 300)
+        self.refresh_ahead = settings.get("refresh_ahead_seconds", 60)
+        self.max_entries = settings.get("max_entries", 1000)
+        self.prefetch_keys = list(settings.get("prefetch", []))
+
+        addresses = list(settings.get("shards", []))
+        pool_size = settings.get("pool_size", 4)
+        for address in set(self.pools) - set(addresses):
+            self.pools.pop(address).close()
+        for address in addresses:
+            pool = self.pools.get(address)
+            if pool is None or pool.size != pool_size:
+                if pool is not None:
+                    pool.close()
+                self.pools[address] = ShardPool(address, pool_size, self.timeout)
+            else:
+                pool.timeout = self.timeout
+        if self.enabled and len(self.pools) < self.threshold:
+            logger.error("Vault threshold %s exceeds the %s configured shards", self.threshold, len(self.pools))
+
+    async def get(self, key: str) -> bytes:
+        """The secret for key; served from cache, fetched from shards on a miss"""
+        if not self.enabled:
+            raise VaultError("Vault client is disabled")
+        cached = self.cache.lookup(key)
+        if cached is not None:
+            self.hits += 1
+            secret, due = cached
+            if due and key not in self._inflight:
+                # Refresh-ahead: callers keep getting the cached value while it reloads
+                self.refreshes += 1
+                self._load(key).add_done_callback(self._log_refresh_failure)
+            return secret
+        if key in self._inflight:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        # Shielded: one caller giving up does not cancel the fetch others are waiting on
+        return await asyncio.shield(self._load(key))
+
+    def _load(self, key: str) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_cache(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            task.add_done_callback(self._reap)
+        return task
+
+    def _log_refresh_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Vault refresh failed, serving cached secret until it expires: %s", task.exception())
+
+    async def _fetch_and_cache(self, key: str) -> bytes:
+        started = time.monotonic()
+        try:
+            secret = await self._fetch(key)
+        except VaultError:
+            self.failures += 1
+            raise
+        self._fetches += 1
+        self._fetch_ms_total += (time.monotonic() - started) * 1000
+        value = bytes(secret)
+        self.cache.put(key, secret, self.ttl, self.refresh_ahead, self.max_entries)
+        return value
+
+    async def _fetch(self, key: str) -> bytearray:
+        if len(key.split()) != 1:
+            raise VaultError("Vault keys cannot contain whitespace")
+        requests = [asyncio.ensure_future(pool.request(f"GET {key}")) for pool in self.pools.values()]
+        shares: Dict[int, bytearray] = {}
+        errors: List[str] = []
+        try:
+            # After the overall timeout, every remaining reply raises TimeoutError
+            for reply in asyncio.as_completed(requests, timeout=self.timeout):
+                try:
+                    text = await reply
+                    if text.startswith("ERR"):
+                        errors.append(text)
+                        continue
+                    x, y = parse_share(text)
+                except asyncio.TimeoutError:
+                    errors.append("timed out")
+                    continue
+                except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+                    continue
+                shares[x] = y
+                if len(shares) >= self.threshold:
+                    return combine_shares(shares)
+        finally:
+            for share in shares.values():
+                zeroize(share)
+            for request in requests:
+                if not request.done():
+                    self._stragglers.add(request)
+                    request.add_done_callback(self._reap)
+
+        if not shares and errors and all("not found" in error.lower() for error in errors):
+            raise SecretNotFound(key)
+        raise VaultUnavailable(f"{len(shares)}/{self.threshold} shares for {key}: {'; '.join(errors) or 'no shards'}")
+
+    def _reap(self, task: asyncio.Task):
+        self._stragglers.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    async def store(self, key: str, secret: bytes):
+        """Split secret across every shard; all must accept, or the stored shares would disagree"""
+        if len(key.split()) != 1:
+            raise VaultError("Vault keys cannot contain whitespace")
+        shares = split_secret(secret, self.threshold, len(self.pools))
+        replies = await asyncio.gather(
+            *(pool.request(f"STORE {key} {share}") for pool, share in zip(self.pools.values(), shares)),
+            return_exceptions=True
+        )
+        self.cache.evict(key)
+        failed = [str(reply) for reply in replies if isinstance(reply, Exception) or not reply.startswith("OK")]
+        if failed:
+            raise VaultError(f"{len(failed)}/{len(shares)} shards rejected {key}: {'; '.join(failed)}")
+
+    async def prefetch(self, keys: Optional[Iterable[str]] = None):
+        """Warm the cache; failures are logged and the first real lookup retries"""
+        keys = list(keys if keys is not None else self.prefetch_keys)
+        results = await asyncio.gather(*(self.get(key) for key in keys), return_exceptions=True)
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                logger.warning("Vault prefetch of %s failed: %s", key, result)
+        loaded = sum(not isinstance(result, Exception) for result in results)
+        if keys:
+            logger.info("🔐 Prefetched %s/%s vault secrets", loaded, len(keys))
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(min(max(self.ttl / 4, 1.0), 30.0))
+            self.cache.sweep()
+
+    def start(self):
+        if self.enabled and self._sweeper is None:
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep())
+
+    async def close(self):
+        for task in [self._sweeper, *self._inflight.values(), *self._stragglers]:
+            if task is not None:
+                task.cancel()
+        self._sweeper = None
+        await asyncio.sleep(0)
+        self.cache.clear()
+        for pool in self.pools.values():
+            pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "entries": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "evicted_total": self.cache.evicted_total,
+            "fetch_ms_avg": round(self._fetch_ms_total / self._fetches, 3) if self._fetches else 0.0,
+            "shards": {address: pool.stats() for address, pool in self.pools.items()},
+        }
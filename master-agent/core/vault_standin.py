@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+In-memory stand-in for sharded-vault shards, speaking the same line protocol.
+Used for local runs and tests of VaultClient without the Rust service:
+
+    python core/vault_standin.py --shards 3 --threshold 2 --base-port 9000
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StandInShard:
+    """One shard: STORE/GET/STATUS, one command per line, connections kept open"""
+
+    def __init__(self, shard_id: int, threshold: int, total_shares: int, delay_ms: float = 0.0):
+        self.id = shard_id
+        self.threshold = threshold
+        self.total_shares = total_shares
+        # Simulated latency, and an off switch to exercise threshold behaviour
+        self.delay = delay_ms / 1000
+        self.available = True
+        self.shares: Dict[str, str] = {}
+        self.requests_total = 0
+        self.connections_total = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    async def _respond(self, command: str) -> str:
+        parts = command.split()
+        if not parts:
+            return "ERR: Empty command"
+        if parts[0] == "STORE" and len(parts) == 3:
+            self.shares[parts[1]] = parts[2]
+            return "OK: Secret stored"
+        if parts[0] == "GET" and len(parts) == 2:
+            share = self.shares.get(parts[1])
+            return share if share is not None else "ERR: Key not found"
+        if parts[0] == "STATUS":
+            return f"Shard: {self.id}/{self.total_shares} Threshold: {self.threshold} Keys: {len(self.shares)}"
+        return "ERR: Invalid command"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections_total += 1
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not self.available:
+                    # Like a crashed shard: the connection just goes away
+                    break
+                self.requests_total += 1
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write((await self._respond(line.decode().strip()) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Listen and return the bound port (an ephemeral one when port is 0)"""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Pooled clients never disconnect on their own
+            handlers = list(self._clients.values())
+            for writer in list(self._clients):
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def _serve(shards: int, threshold: int, base_port: int, delay_ms: float):
+    stand_ins = [StandInShard(index + 1, threshold, shards, delay_ms) for index in range(shards)]
+    for index, shard in enumerate(stand_ins):
+        port = await shard.start("127.0.0.1", base_port + index)
+        logger.info("🔐 Stand-in vault shard %s/%s on 127.0.0.1:%s", shard.id, shards, port)
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run in-memory sharded-vault stand-ins")
+    parser.add_argument("--shards", type=int, default=3)
+    parser.add_argument("--threshold", type=int, default=2)
+    parser.add_argument("--base-port", type=int, default=9000)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Latency added to every reply")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(_serve(args.shards, args.threshold, args.base_port, args.delay_ms))
+    except KeyboardInterrupt:
+        pass
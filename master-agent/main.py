@@ -6,11 +6,11 @@ FastAPI server with ACL, Resource Manager, and Multi-Agent Orchestration
 
 import asyncio
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, PositiveFloat, TypeAdapter, ValidationError, confloat, field_validator
+from typing import Dict, Any, AsyncIterator, List, Optional
 import signal
 import sys
 import psutil
@@ -21,284 +21,757 @@ import time
 import os # ✅ مُضاف
 import json # ✅ مُضاف
 
-# Configure logging
-logging.basicConfig(
-level=logging.INFO,
-format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-handlers=[
-logging.FileHandler("logs/master-agent.log"),
-logging.StreamHandler()
-]
-)
-logger = logging.getLogger(__name__)
-
-# Import core modules
+# Import core modules; common/ is copied into the image, and sits beside this directory in the repo
 sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent))
+
+from common.structured_logging import LogPipeline, request_id
+
+# Configure logging: records are written by a background thread, the file as JSON lines
+log_pipeline = LogPipeline("logs/master-agent.log", console_format=os.getenv("LOG_FORMAT", "text"))
+logger = logging.getLogger(__name__)
 
 from master.sovereign import SovereignMaster
+from core.policy_store import PolicyStore, PolicyValidationError
 from core.resource_manager import ResourceManager
+from core.startup import StartupTracker
+from core.admission_controller import AdmissionController, AdmissionRejected, AdmissionTimeout, classify_task
+from core.task_executor import IsolatedExecutor
 from core.acl_engine import ACLEngine, ACLDecision
 from core.trash_manager import TrashManager
 from core.alert_manager import AlertManager
 from core.auth_middleware import JWTVerifier, JWTGenerator, APIKeyManager
 from core.rate_limiter import setup_rate_limiting
-from core.shutdown import GracefulShutdown
+from core.shutdown import GracefulShutdown, ShuttingDown, TaskInterrupted
+from core.audit_log import AuditLog
+from core.decision_cache import DecisionCache
+from core.task_journal import TaskJournal
+from core.event_hub import EventHub, Subscriber, pump_websocket, serve_unix
+from core.vault_client import VaultClient
 from agents.math_agent import MathAgent
 from agents.code_agent import CodeAgent
 from agents.research_agent import ResearchAgent
+from core.agent_pool import build_pools
 
-# Pydantic models
-class TaskRequest(BaseModel):
-task: str
-priority: int = 5
-timeout_ms: int = 5000
-metadata: Dict[str, Any] = {}
-
-class ConfirmationResponse(BaseModel):
-operation_id: str
-approved: bool
-
-class ResourceUpdateRequest(BaseModel):
-ram_gb: Optional[int] = None
-cpu_cores: Optional[int] = None
-memory_limit_mb: Optional[int] = None
-
-class MasterApplication:
-def __init__(self):
-logger.info("🚀 Initializing AI Super Agent Core...")
-
-# Security and resource management
-self.policy_path = Path("config/security-policy.json")
-if not self.policy_path.exists():
-logger.error("❌ Security policy not found! Run: python scripts/generate_user_config.py")
-sys.exit(1)
-
-self.acl = ACLEngine(str(self.policy_path))
-self.resource_manager = ResourceManager(str(self.policy_path))
-self.alert_manager = AlertManager(self.acl.policy)
-
-# Initialize auth
-self.jwt_verifier = JWTVerifier()
-self.jwt_generator = JWTGenerator()
-self.api_key_manager = APIKeyManager()
-
-# Initialize agents
-self.agents = {
-"math": MathAgent(),
-"code": CodeAgent(),
-"research": ResearchAgent(),
+AGENT_FACTORIES = {
+    "math": MathAgent,
+    "code": CodeAgent,
+    "research": ResearchAgent,
 }
 
-self.master = SovereignMaster(self.agents)
-
-# Create FastAPI app
-self.app = FastAPI(
-title="AI Super Agent Core API",
-description="Production-ready multi-agent system with ACL and resource management",
-version="1.0.0",
-docs_url="/api/v1/docs" if os.getenv("ENV") != "prod" else None,
-redoc_url="/api/v1/redoc" if os.getenv("ENV") != "prod" else None
-)
-
-self._setup_middleware()
-self._setup_routes()
-self._setup_error_handlers()
-self._setup_shutdown_handler()
-
-logger.info("✅ Master Agent initialized successfully")
-logger.info(f"💾 Resource limits: {self.resource_manager.export_limits()}")
-
-def _setup_middleware(self):
-self.app.add_middleware(
-CORSMiddleware,
-allow_origins=["*"],
-allow_credentials=True,
-allow_methods=["*"],
-allow_headers=["*"],
-)
-setup_rate_limiting(self.app)
-
-def _setup_error_handlers(self):
-@self.app.exception_handler(HTTPException)
-async def http_exception_handler(request: Request, exc: HTTPException):
-return JSONResponse(
-status_code=exc.status_code,
-content={"detail": exc.detail, "timestamp": time.time()}
-)
-
-@self.app.exception_handler(Exception)
-async def general_exception_handler(request: Request, exc: Exception):
-logger.error(f"Unhandled error: {exc}", exc_info=True)
-return JSONResponse(
-status_code=500,
-content={"detail": "Internal server error", "error_id": str(uuid.uuid4())}
-)
-
-def _setup_shutdown_handler(self):
-self.shutdown_handler = GracefulShutdown(self.app)
-
-def _setup_routes(self):
-@self.app.get("/health")
-async def health():
-return {
-"status": "healthy",
-"agents": len(self.agents),
-"resources": self.resource_manager.export_limits(),
-"cpu_percent": psutil.cpu_percent(),
-"memory_percent": psutil.virtual_memory().percent
-}
+# Learned admission footprints, kept across restarts
+FOOTPRINTS_PATH = "state/footprints.json"
 
-@self.app.get("/metrics")
-async def metrics():
-return {
-"cpu_percent": psutil.cpu_percent(interval=1),
-"memory": psutil.virtual_memory()._asdict(),
-"disk": psutil.disk_usage('/')._asdict(),
-"agents": {k: v.get_status() for k, v in self.agents.items()}
-}
+# Append-only record of every submitted task
+JOURNAL_PATH = "state/tasks.journal"
 
-@self.app.post("/api/v1/task")
-async def submit_task(request: TaskRequest, background_tasks: BackgroundTasks, auth: dict = Depends(self.jwt_verifier.verify)):
-try:
-# ACL check
-decision = self.acl.check_resource_access("cpu", 1.0)
-if not decision.allowed:
-raise HTTPException(403, detail=decision.reason)
-
-if decision.requires_confirmation:
-operation_id = self.acl.request_confirmation(decision)
-confirmed = await asyncio.to_thread(
-self.acl.wait_for_confirmation, operation_id, 60.0
-)
-if not confirmed:
-raise HTTPException(403, detail="Operation denied by user")
-
-# Check resources
-estimated_memory = self._estimate_memory_usage(request.task)
-if not self.resource_manager.should_load_tool(estimated_memory):
-raise HTTPException(507, detail="Insufficient resources")
-
-# Process task
-result = await self.master.decide({
-"description": request.task,
-"priority": request.priority,
-"metadata": request.metadata
-})
-
-background_tasks.add_task(self._audit_log, "task_completed", {
-"task": request.task,
-"result": result
-})
-
-return {
-"task_id": str(uuid.uuid4()),
-"status": "completed",
-"decision": result,
-"confidence": result.confidence
-}
+# Event topics an operator watching confirmations needs
+ACL_TOPICS = ("acl_pending", "acl_resolved")
 
-except Exception as e:
-logger.error(f"Task failed: {e}")
-self.alert_manager.send_alert("task_failed", {"error": str(e)})
-raise HTTPException(500, detail=str(e))
+# Served while subsystems are still initializing
+READY_EXEMPT_PATHS = {"/health", "/api/v1/docs", "/api/v1/redoc", "/openapi.json"}
 
-@self.app.get("/api/v1/agents")
-async def get_agents(auth: dict = Depends(self.jwt_verifier.verify)):
-return {
-"agents": [agent.get_status() for agent in self.agents.values()],
-"count": len(self.agents)
+# Metadata keys the orchestrator reads, coerced where lax parsing allows ("0.5" -> 0.5)
+TASK_METADATA_FIELDS = {
+    "agents": TypeAdapter(List[str]),
+    "min_confidence": TypeAdapter(confloat(ge=0.0, le=1.0)),
+    "agent_timeout_ms": TypeAdapter(Dict[str, PositiveFloat]),
 }
 
-@self.app.get("/api/v1/acl/pending")
-async def get_pending_confirmations(auth: dict = Depends(self.jwt_verifier.verify)):
-return {
-"pending": [
-{
-"operation_id": op_id,
-"reason": decision.reason
-}
-for op_id, decision in self.acl.get_pending_confirmations().items()
-]
-}
+# Pydantic models
+class TaskRequest(BaseModel):
+    task: str
+    priority: int = 5
+    timeout_ms: int = 5000
+    metadata: Dict[str, Any] = {}
+
+    @field_validator("metadata")
+    @classmethod
+    def check_metadata(cls, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        metadata = dict(metadata)
+        for key, adapter in TASK_METADATA_FIELDS.items():
+            if metadata.get(key) is None:
+                continue
+            try:
+                metadata[key] = adapter.validate_python(metadata[key])
+            except ValidationError as e:
+                raise ValueError(f"metadata.{key}: {e.errors()[0]['msg']}")
+        return metadata
+
+class BatchRequest(BaseModel):
+    tasks: List[TaskRequest]
+    # NDJSON, one line per task as it finishes, instead of one aggregated body
+    stream: bool = False
 
-@self.app.post("/api/v1/acl/confirm")
-async def confirm_operation(response: ConfirmationResponse, auth: dict = Depends(self.jwt_verifier.verify)):
-self.acl.confirm_operation(response.operation_id, response.approved)
-return {"status": "confirmed"}
-
-@self.app.get("/api/v1/trash")
-async def list_trash(auth: dict = Depends(self.jwt_verifier.verify)):
-trash = TrashManager(str(self.policy_path))
-return {"items": trash.list_trash()}
-
-@self.app.post("/api/v1/resource/update")
-async def update_resource(request: ResourceUpdateRequest, auth: dict = Depends(self.jwt_verifier.verify)):
-try:
-self.resource_manager.update_config(request.dict(exclude_unset=True))
-return {"status": "updated", "new_limits": self.resource_manager.export_limits()}
-except Exception as e:
-raise HTTPException(500, detail=str(e))
-
-# Auth endpoints
-@self.app.get("/api/v1/auth/token")
-async def generate_token(service: str, auth: dict = Depends(self.jwt_verifier.verify)):
-token = self.jwt_generator.generate_service_token(service)
-return {"token": token, "expires_in": 86400}
-
-@self.app.post("/api/v1/auth/api-key")
-async def create_api_key(service: str, auth: dict = Depends(self.jwt_verifier.verify)):
-key = self.api_key_manager.create_key(service)
-return {"api_key": key, "service": service, "note": "Save this key"}
-
-@self.app.get("/api/v1/auth/verify")
-async def verify_auth(request: Request, auth: dict = Depends(self.jwt_verifier.verify)):
-return {
-"authenticated": True,
-"user": request.state.user,
-"scopes": request.state.scopes
-}
+class ConfirmationResponse(BaseModel):
+    operation_id: str
+    approved: bool
 
-def _estimate_memory_usage(self, task: str) -> int:
-"""Estimate memory needed in MB"""
-if "image" in task.lower() or "video" in task.lower():
-return 4096
-elif "model" in task.lower() or "train" in task.lower():
-return 8192
-elif "research" in task.lower() or "search" in task.lower():
-return 2048
-else:
-return 1024
-
-def _audit_log(self, event: str, data: Dict[str, Any]):
-"""Async audit logging"""
-audit_file = Path("logs/audit.log")
-audit_file.parent.mkdir(exist_ok=True)
-
-with open(audit_file, 'a') as f:
-f.write(json.dumps({
-"timestamp": time.time(),
-"event": event,
-"data": data
-}) + "\n")
-
-def run(self, host: str = "0.0.0.0", port: int = 8000):
-"""Run the production server"""
-logger.info(f"🚀 Starting server on {host}:{port}")
-
-uvicorn.run(
-self.app,
-host=host,
-port=port,
-workers=1,
-log_level="info",
-access_log=True,
-loop="uvloop",
-timeout_keep_alive=30,
-ssl_certfile="docker/ssl/cert.pem" if os.getenv("ENV") == "prod" else None,
-ssl_keyfile="docker/ssl/key.pem" if os.getenv("ENV") == "prod" else None
-)
+class ResourceUpdateRequest(BaseModel):
+    ram_gb: Optional[int] = None
+    cpu_cores: Optional[int] = None
+    memory_limit_mb: Optional[int] = None
+
+class MasterApplication:
+    def __init__(self):
+        logger.info("🚀 Initializing AI Super Agent Core...")
+
+        # Security and resource management
+        self.policy_path = Path("config/security-policy.json")
+        if not self.policy_path.exists():
+            logger.error("❌ Security policy not found! Run: python scripts/generate_user_config.py")
+            sys.exit(1)
+
+        # Subsystems are built after the server binds; see _initialize()
+        self.startup = StartupTracker()
+        # Set by serve(); a failed startup stops it
+        self.server: Optional[uvicorn.Server] = None
+
+        # Auth is needed to declare the routes, and is cheap to build
+        self.jwt_verifier = JWTVerifier()
+        self.audit = AuditLog()
+
+        # Create FastAPI app
+        self.app = FastAPI(
+            title="AI Super Agent Core API",
+            description="Production-ready multi-agent system with ACL and resource management",
+            version="1.0.0",
+            docs_url="/api/v1/docs" if os.getenv("ENV") != "prod" else None,
+            redoc_url="/api/v1/redoc" if os.getenv("ENV") != "prod" else None
+        )
+
+        self._setup_middleware()
+        self._setup_routes()
+        self._setup_error_handlers()
+        self._setup_shutdown_handler()
+
+    async def _initialize(self):
+        """Build subsystems concurrently, then flip readiness"""
+        try:
+            # Single owner of the policy file; components read its live snapshot
+            self.policy_store = await self.startup.step("policy", PolicyStore, str(self.policy_path))
+            log_pipeline.configure(self.policy_store.get("logging", {}))
+            self.policy_store.subscribe(lambda old, new: log_pipeline.configure(new.get("logging", {})))
+            self.acl = ACLEngine(store=self.policy_store)
+
+            built = await self.startup.stage(
+                executor=(IsolatedExecutor, self.policy_store),
+                alerts=(AlertManager, self.policy_store),
+                trash=(TrashManager, str(self.policy_path), self.policy_store),
+                jwt_generator=(JWTGenerator,),
+                api_keys=(APIKeyManager,),
+            )
+            self.executor = built["executor"]
+            self.alert_manager = built["alerts"]
+            self.trash = built["trash"]
+            self.jwt_generator = built["jwt_generator"]
+            self.api_key_manager = built["api_keys"]
+            # Isolated agents are built and warmed up inside the executor's workers
+            self.agents = await self.startup.step(
+                "agents", build_pools, AGENT_FACTORIES, self.policy_store.get("agent_pools", {}), self.executor
+            )
+            self.policy_store.subscribe(self._resize_pools)
+
+            self.resource_manager = await self.startup.step(
+                "resources", ResourceManager, str(self.policy_path), self.policy_store, self.acl
+            )
+            self.admission = AdmissionController(self.resource_manager)
+            self.master = SovereignMaster(
+                self.agents, settings=self.policy_store.get("orchestration", {}), admission=self.admission
+            )
+            self.policy_store.subscribe(lambda old, new: self.master.configure(new.get("orchestration", {})))
+            self.decision_cache = DecisionCache(self.agents, self.policy_store.get("decision_cache", {}))
+            self.policy_store.subscribe(lambda old, new: self.decision_cache.configure(new.get("decision_cache", {})))
+            self.journal = TaskJournal(JOURNAL_PATH, self.policy_store.get("journal", {}))
+            self.policy_store.subscribe(lambda old, new: self.journal.configure(new.get("journal", {})))
+            self.events = EventHub(self.policy_store.get("events", {}))
+            self.policy_store.subscribe(lambda old, new: self.events.configure(new.get("events", {})))
+            self.vault = VaultClient(self.policy_store.get("vault", {}))
+            self.policy_store.subscribe(lambda old, new: self.vault.configure(new.get("vault", {})))
+            self.acl.add_listener(
+                lambda event, operation_id, data: self.events.publish(
+                    f"acl_{event}", {"operation_id": operation_id, **data}
+                )
+            )
+
+            await self.startup.step("footprints", self.admission.load_footprints, FOOTPRINTS_PATH)
+            await self.startup.step("router", self.master.router.learn_from_audit, str(self.audit.path))
+            unfinished = await self.startup.step("journal", self.journal.load)
+            self._register_shutdown_hooks()
+
+            self.policy_store.start_watching()
+            self.audit.start()
+            self.journal.start()
+            self.events.start()
+            self.alert_manager.start()
+            self.vault.start()
+            self._metrics_task = asyncio.create_task(self._publish_metrics())
+            socket_path = self.policy_store.get("events", {}).get("unix_socket")
+            self.operator_socket = await serve_unix(
+                socket_path, self.events, lambda: self._operator_subscriber(ACL_TOPICS),
+                self._handle_operator_message
+            ) if socket_path else None
+            self.startup.mark_ready()
+            logger.info("💾 Resource limits: %s", self.resource_manager.export_limits())
+            if self.vault.enabled:
+                # Warmed after readiness: shard round trips never hold up startup
+                asyncio.create_task(self.vault.prefetch())
+
+            for entry in unfinished:
+                asyncio.create_task(self._resume_task(entry))
+            if unfinished:
+                logger.info("♻️ Resuming %s unfinished tasks from the journal", len(unfinished))
+        except Exception as e:
+            # Not-ready forever is invisible to a supervisor; exiting gets us restarted
+            if self.server is not None:
+                self.server.should_exit = True
+            self.startup.mark_failed(e)
+
+    def _setup_middleware(self):
+        self.app.add_middleware(
+            CORSMiddleware,
+            allow_origins=["*"],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+        setup_rate_limiting(self.app)
+
+        @self.app.middleware("http")
+        async def require_ready(request: Request, call_next):
+            # Only health and docs are served until every subsystem is up
+            if not self.startup.ready and request.url.path not in READY_EXEMPT_PATHS:
+                return JSONResponse(
+                    status_code=503,
+                    content={"detail": f"Service {self.startup.state}", "timestamp": time.time()},
+                    headers={"Retry-After": "1"}
+                )
+            return await call_next(request)
+
+        @self.app.middleware("http")
+        async def tag_request(request: Request, call_next):
+            # Added last so it wraps everything: every log line written while
+            # serving the request, including 503s above, carries its id
+            rid = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+            token = request_id.set(rid)
+            try:
+                response = await call_next(request)
+            finally:
+                request_id.reset(token)
+            response.headers["X-Request-ID"] = rid
+            return response
+
+    def _setup_error_handlers(self):
+        @self.app.exception_handler(HTTPException)
+        async def http_exception_handler(request: Request, exc: HTTPException):
+            return JSONResponse(
+                status_code=exc.status_code,
+                content={"detail": exc.detail, "timestamp": time.time()},
+                headers=exc.headers
+            )
+
+        @self.app.exception_handler(Exception)
+        async def general_exception_handler(request: Request, exc: Exception):
+            logger.error("Unhandled error: %s", exc, exc_info=True)
+            return JSONResponse(
+                status_code=500,
+                content={"detail": "Internal server error", "error_id": str(uuid.uuid4())}
+            )
+
+    def _setup_shutdown_handler(self):
+        self.shutdown_handler = GracefulShutdown(self.app)
+
+        @self.app.on_event("startup")
+        async def start_initialization():
+            # Not awaited: the server binds and answers /health while this runs
+            self._init_task = asyncio.create_task(self._initialize())
+
+        @self.app.on_event("shutdown")
+        async def shutdown():
+            # Already done when the drain was triggered by a signal
+            await self.shutdown_handler.drain()
+            if self.startup.ready:
+                await self.policy_store.stop_watching()
+
+    def _resize_pools(self, old, new):
+        settings = new.get("agent_pools", {})
+        for name, pool in self.agents.items():
+            pool.resize(settings.get("sizes", {}).get(name, settings.get("default_size", 1)))
+
+    def _register_shutdown_hooks(self):
+        self.shutdown_handler.configure(self.policy_store.snapshot)
+        self.policy_store.subscribe(lambda old, new: self.shutdown_handler.configure(new))
+
+        # Requests blocked on a confirmation would otherwise hold the drain open
+        self.shutdown_handler.on_drain("acl_confirmations", self.acl.deny_all_pending)
+        self.shutdown_handler.persist_unfinished = self.journal.interrupted
+        self.shutdown_handler.on_flush("journal", self.journal.close)
+        self.shutdown_handler.on_flush("events", self._close_events)
+        self.shutdown_handler.on_flush("alerts", self.alert_manager.close)
+        self.shutdown_handler.on_flush("audit", self.audit.close)
+        self.shutdown_handler.on_flush("vault", self.vault.close)
+        self.shutdown_handler.on_flush("agents", self._close_agents)
+        self.shutdown_handler.on_flush(
+            "footprints", lambda: asyncio.to_thread(self.admission.save_footprints, FOOTPRINTS_PATH)
+        )
+
+    async def _close_agents(self):
+        await asyncio.gather(*(asyncio.to_thread(pool.close) for pool in self.agents.values()))
+
+    async def _close_events(self):
+        self._metrics_task.cancel()
+        await self.events.close()
+        if self.operator_socket is not None:
+            self.operator_socket.close()
+            await self.operator_socket.wait_closed()
+
+    def _operator_subscriber(self, topics=None) -> Subscriber:
+        subscriber = self.events.subscribe(topics)
+        # A new operator sees confirmations that are already waiting
+        if subscriber.wants("acl_pending"):
+            for pending in self._pending_confirmations():
+                subscriber.offer(EventHub.encode("acl_pending", pending))
+        return subscriber
+
+    def _pending_confirmations(self) -> List[Dict[str, Any]]:
+        return [
+            {"operation_id": op_id, "reason": decision.reason}
+            for op_id, decision in self.acl.get_pending_confirmations().items()
+        ]
+
+    async def _handle_operator_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Requests and answers from push-channel clients, e.g. security-cli"""
+        if message.get("type") == "ping":
+            return {"type": "pong"}
+        if message.get("type") == "pending":
+            return {"type": "pending", "pending": self._pending_confirmations()}
+        if message.get("type") != "confirm":
+            return None
+
+        operation_id = str(message.get("operation_id"))
+        try:
+            self.acl.confirm_operation(operation_id, bool(message.get("approved")))
+            return {"type": "confirm_result", "operation_id": operation_id, "ok": True}
+        except KeyError:
+            return {
+                "type": "confirm_result",
+                "operation_id": operation_id,
+                "ok": False,
+                "detail": f"No pending operation {operation_id}"
+            }
+
+    def _metrics_snapshot(self) -> Dict[str, Any]:
+        """Cheap subset of /metrics for the push channel"""
+        return {
+            "cpu_percent": psutil.cpu_percent(),
+            "memory_percent": psutil.virtual_memory().percent,
+            "admission": self.admission.stats(),
+            "agents": {
+                name: {key: status[key] for key in ("status", "in_flight", "waiting", "completed_total")}
+                for name, status in ((name, pool.get_status()) for name, pool in self.agents.items())
+            },
+            "journal": self.journal.stats(),
+            "decision_cache": self.decision_cache.stats(),
+            "events": self.events.stats()
+        }
+
+    async def _publish_metrics(self):
+        while True:
+            await asyncio.sleep(self.events.metrics_interval)
+            # Nothing is computed while nobody listens
+            if self.events.has_subscribers("metrics"):
+                self.events.publish("metrics", self._metrics_snapshot())
+
+    def _setup_routes(self):
+        @self.app.get("/health")
+        async def health():
+            if not self.startup.ready:
+                return JSONResponse(
+                    status_code=503,
+                    content={"status": self.startup.state, "startup": self.startup.report()}
+                )
+            if not self.shutdown_handler.accepting:
+                return JSONResponse(status_code=503, content={"status": "draining"})
+            return {
+                "status": "healthy",
+                "startup": self.startup.report(),
+                "agents": len(self.agents),
+                "resources": self.resource_manager.export_limits(),
+                "cpu_percent": psutil.cpu_percent(),
+                "memory_percent": psutil.virtual_memory().percent
+            }
+
+        @self.app.get("/metrics")
+        async def metrics():
+            return {
+                "cpu_percent": psutil.cpu_percent(interval=1),
+                "memory": psutil.virtual_memory()._asdict(),
+                "disk": psutil.disk_usage('/')._asdict(),
+                "admission": self.admission.stats(),
+                "isolation": self.executor.stats(),
+                "routing": self.master.router.stats(),
+                "decision_cache": self.decision_cache.stats(),
+                "journal": self.journal.stats(),
+                "events": self.events.stats(),
+                "alerts": self.alert_manager.stats(),
+                "logging": log_pipeline.stats(),
+                "vault": self.vault.stats(),
+                "agents": {k: v.get_status() for k, v in self.agents.items()}
+            }
+
+        @self.app.post("/api/v1/task")
+        async def submit_task(request: TaskRequest, auth: dict = Depends(self.jwt_verifier.verify)):
+            task_id = str(uuid.uuid4())
+            if not self.shutdown_handler.accepting:
+                raise HTTPException(503, detail="Server is shutting down", headers={"Retry-After": "5"})
+            cached = self._cached_response(task_id, request)
+            if cached is not None:
+                return cached
+            # Durable before any work starts, so a crash can only re-run it
+            await self.journal.submitted(task_id, request.dict())
+            try:
+                return await self.shutdown_handler.run(
+                    task_id, request.dict(), self._process_task(task_id, request)
+                )
+            except (ShuttingDown, TaskInterrupted) as e:
+                raise HTTPException(503, detail=str(e), headers={"Retry-After": "5"})
+
+        @self.app.post("/api/v1/tasks/batch")
+        async def submit_batch(batch: BatchRequest, auth: dict = Depends(self.jwt_verifier.verify)):
+            settings = self.policy_store.get("batch", {})
+            if not batch.tasks:
+                raise HTTPException(422, detail="Batch is empty")
+            if len(batch.tasks) > settings.get("max_tasks", 1000):
+                raise HTTPException(413, detail=f"Batch exceeds {settings.get('max_tasks', 1000)} tasks")
+            if not self.shutdown_handler.accepting:
+                raise HTTPException(503, detail="Server is shutting down", headers={"Retry-After": "5"})
+
+            task_ids = [str(uuid.uuid4()) for _ in batch.tasks]
+            # One group commit covers the whole batch
+            await asyncio.gather(*(
+                self.journal.submitted(task_id, request.dict()) for task_id, request in zip(task_ids, batch.tasks)
+            ))
+
+            # Admission and authorization run once for the batch, inside the result generator
+            results = self._run_batch(task_ids, batch.tasks, settings.get("concurrency", 32))
+            try:
+                concurrency = await results.__anext__()
+            except Exception as e:
+                raise self._task_error(task_ids, e)
+
+            if batch.stream:
+                return StreamingResponse(
+                    (json.dumps(item, default=str) + "\n" async for item in results),
+                    media_type="application/x-ndjson"
+                )
+
+            items = sorted([item async for item in results], key=lambda item: item["index"])
+            return {
+                "count": len(items),
+                "completed": sum(1 for item in items if item["status"] == "completed"),
+                "failed": sum(1 for item in items if item["status"] != "completed"),
+                "concurrency": concurrency,
+                "results": items
+            }
+
+        @self.app.websocket("/ws")
+        async def event_socket(websocket: WebSocket, token: str = "", topics: str = ""):
+            if not self.startup.ready or not self.shutdown_handler.accepting:
+                await websocket.close(code=1013)
+                return
+            try:
+                self.jwt_verifier.verify_token(token)
+            except Exception:
+                await websocket.close(code=1008)
+                return
+
+            await websocket.accept()
+            subscriber = self._operator_subscriber([topic for topic in topics.split(",") if topic])
+            try:
+                await pump_websocket(websocket, subscriber, self._handle_operator_message)
+            finally:
+                self.events.unsubscribe(subscriber)
+
+        @self.app.get("/api/v1/task/{task_id}")
+        async def get_task(task_id: str, auth: dict = Depends(self.jwt_verifier.verify)):
+            entry = self.journal.get(task_id)
+            if entry is None:
+                raise HTTPException(404, detail=f"Unknown task {task_id}")
+            return entry
+
+        @self.app.get("/api/v1/agents")
+        async def get_agents(auth: dict = Depends(self.jwt_verifier.verify)):
+            agents = [pool.get_status() for pool in self.agents.values()]
+            return {
+                "agents": agents,
+                "count": len(self.agents),
+                "in_flight": sum(agent["in_flight"] for agent in agents),
+                "saturated": [agent["name"] for agent in agents if agent["status"] == "saturated"]
+            }
+
+        @self.app.get("/api/v1/acl/pending")
+        async def get_pending_confirmations(auth: dict = Depends(self.jwt_verifier.verify)):
+            return {"pending": self._pending_confirmations()}
+
+        @self.app.get("/api/v1/acl/events")
+        async def acl_events(auth: dict = Depends(self.jwt_verifier.verify)):
+            """Server-sent confirmation events; answers go to /api/v1/acl/confirm"""
+            subscriber = self._operator_subscriber(ACL_TOPICS)
+
+            async def stream():
+                try:
+                    while True:
+                        try:
+                            message = await asyncio.wait_for(subscriber.get(), 15.0)
+                        except asyncio.TimeoutError:
+                            # Comment line so proxies and dead clients are noticed
+                            yield ": keepalive\n\n"
+                            continue
+                        if message is None:
+                            return
+                        yield f"data: {message}\n\n"
+                finally:
+                    self.events.unsubscribe(subscriber)
+
+            return StreamingResponse(
+                stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+            )
+
+        @self.app.post("/api/v1/acl/confirm")
+        async def confirm_operation(response: ConfirmationResponse, auth: dict = Depends(self.jwt_verifier.verify)):
+            try:
+                self.acl.confirm_operation(response.operation_id, response.approved)
+            except KeyError:
+                raise HTTPException(404, detail=f"No pending operation {response.operation_id}")
+            return {"status": "confirmed"}
+
+        @self.app.get("/api/v1/trash")
+        async def list_trash(auth: dict = Depends(self.jwt_verifier.verify)):
+            items = await asyncio.to_thread(self.trash.list_trash)
+            return {"items": items}
+
+        @self.app.post("/api/v1/resource/update")
+        async def update_resource(request: ResourceUpdateRequest, auth: dict = Depends(self.jwt_verifier.verify)):
+            try:
+                await self.resource_manager.update_config(request.dict(exclude_unset=True))
+                return {"status": "updated", "new_limits": self.resource_manager.export_limits()}
+            except PolicyValidationError as e:
+                raise HTTPException(422, detail=str(e))
+            except Exception as e:
+                raise HTTPException(500, detail=str(e))
+
+        # Auth endpoints
+        @self.app.get("/api/v1/auth/token")
+        async def generate_token(service: str, auth: dict = Depends(self.jwt_verifier.verify)):
+            token = self.jwt_generator.generate_service_token(service)
+            return {"token": token, "expires_in": 86400}
+
+        @self.app.post("/api/v1/auth/api-key")
+        async def create_api_key(service: str, auth: dict = Depends(self.jwt_verifier.verify)):
+            key = self.api_key_manager.create_key(service)
+            return {"api_key": key, "service": service, "note": "Save this key"}
+
+        @self.app.get("/api/v1/auth/verify")
+        async def verify_auth(request: Request, auth: dict = Depends(self.jwt_verifier.verify)):
+            return {
+                "authenticated": True,
+                "user": request.state.user,
+                "scopes": request.state.scopes
+            }
+
+    async def _authorize(self, amount: float):
+        """ACL check, blocking on operator confirmation when the policy asks for it"""
+        decision = self.acl.check_resource_access("cpu", amount)
+        if not decision.allowed:
+            raise HTTPException(403, detail=decision.reason)
+
+        if decision.requires_confirmation:
+            operation_id = self.acl.request_confirmation(decision)
+            confirmed = await asyncio.to_thread(
+                self.acl.wait_for_confirmation, operation_id, 60.0
+            )
+            if not confirmed:
+                raise HTTPException(403, detail="Operation denied by user")
+
+    def _task_error(self, task_ids: List[str], e: Exception) -> HTTPException:
+        """Journal the failure and map it to the HTTP error the client sees"""
+        detail = str(e.detail) if isinstance(e, HTTPException) else str(e)
+        for task_id in task_ids:
+            self.journal.failed(task_id, detail)
+            self.events.publish("task_failed", {"task_id": task_id, "detail": detail})
+        if isinstance(e, HTTPException):
+            return e
+        if isinstance(e, AdmissionRejected):
+            return HTTPException(507, detail=str(e))
+        if isinstance(e, AdmissionTimeout):
+            return HTTPException(503, detail=str(e), headers={"Retry-After": "5"})
+        logger.error("Task failed: %s", e)
+        self.alert_manager.send_alert("task_failed", {"error": str(e)})
+        return HTTPException(500, detail=str(e))
+
+    def _task_cancelled(self, task_id: str):
+        """Journal work the client abandoned; work cut off by a drain stays resumable"""
+        if self.shutdown_handler.accepting:
+            self.journal.cancelled(task_id, "client disconnected")
+            self.events.publish("task_cancelled", {"task_id": task_id})
+
+    async def _process_task(self, task_id: str, request: TaskRequest) -> Dict[str, Any]:
+        try:
+            await self._authorize(1.0)
+            return await self._run_task(task_id, request)
+        except asyncio.CancelledError:
+            self._task_cancelled(task_id)
+            raise
+        except Exception as e:
+            raise self._task_error([task_id], e)
+
+    async def _run_task(self, task_id: str, request: TaskRequest, admit: bool = True) -> Dict[str, Any]:
+        """Decide an authorized task; admit=False when a batch reservation already covers it"""
+        self.journal.started(task_id)
+        task_class = classify_task(request.task, request.metadata)
+        cache_key = DecisionCache.key(request.task, request.metadata) if self.decision_cache.enabled else None
+        result, cached = await self.decision_cache.get_or_compute(
+            cache_key, lambda: self._decide(task_class, request, admit)
+        )
+        return self._task_completed(task_id, request, task_class, result, cached)
+
+    def _cached_response(self, task_id: str, request: TaskRequest) -> Optional[Dict[str, Any]]:
+        """Answer a local cache hit at intake: there is no work to recover, so nothing waits on the journal"""
+        if not self.decision_cache.enabled:
+            return None
+        decision = self.acl.check_resource_access("cpu", 1.0)
+        if not decision.allowed or decision.requires_confirmation:
+            # Denials and confirmations keep their usual path through _authorize
+            return None
+        result = self.decision_cache.lookup(DecisionCache.key(request.task, request.metadata))
+        if result is None:
+            return None
+        task_class = classify_task(request.task, request.metadata)
+        return self._task_completed(task_id, request, task_class, result, True)
+
+    def _task_completed(self, task_id: str, request: TaskRequest, task_class: str,
+                        result: Dict[str, Any], cached: bool) -> Dict[str, Any]:
+        self.audit.record("task_completed", {
+            "task_id": task_id,
+            "task": request.task,
+            "task_class": task_class,
+            "cached": cached,
+            "result": result
+        })
+
+        self.journal.completed(task_id, result)
+        response = {
+            "task_id": task_id,
+            "status": "completed",
+            "cached": cached,
+            "decision": result,
+            "confidence": result["confidence"]
+        }
+        self.events.publish("task_completed", response)
+        return response
+
+    async def _decide(self, task_class: str, request: TaskRequest, admit: bool = True) -> Dict[str, Any]:
+        task = {
+            "description": request.task,
+            "priority": request.priority,
+            "timeout_ms": request.timeout_ms,
+            "metadata": request.metadata
+        }
+        # Admission: each routed agent queues until its learned footprint fits
+        return await self.master.decide(task, task_class if admit else None)
+
+    async def _run_batch_item(self, index: int, task_id: str, request: TaskRequest) -> Dict[str, Any]:
+        try:
+            result = await self.shutdown_handler.run(
+                task_id, request.dict(), self._run_task(task_id, request, admit=False)
+            )
+            return {"index": index, **result}
+        except (ShuttingDown, TaskInterrupted) as e:
+            return {"index": index, "task_id": task_id, "status": "interrupted", "detail": str(e)}
+        except Exception as e:
+            error = self._task_error([task_id], e)
+            return {
+                "index": index,
+                "task_id": task_id,
+                "status": "failed",
+                "status_code": error.status_code,
+                "detail": error.detail
+            }
+
+    async def _run_batch(self, task_ids: List[str], requests: List[TaskRequest],
+                         max_concurrency: int) -> AsyncIterator[Any]:
+        """Admit and authorize the batch and yield its concurrency, then per-task results as they finish
+
+        The reservation is taken inside the generator: closing it, or the loop finalizing
+        it after a client went away before streaming began, releases it"""
+        task_classes = [classify_task(request.task, request.metadata) for request in requests]
+        async with self.admission.reserve_batch(task_classes, max_concurrency) as concurrency:
+            # One core per task the batch runs at once, capped by what the ACL lets one request hold
+            cpu_rule = self.policy_store.get("acl_rules", {}).get("resource_access", {}).get("cpu", {})
+            await self._authorize(float(min(concurrency, cpu_rule.get("max_cores", concurrency))))
+            yield concurrency
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded(index: int) -> Dict[str, Any]:
+                try:
+                    async with semaphore:
+                        return await self._run_batch_item(index, task_ids[index], requests[index])
+                except asyncio.CancelledError:
+                    # Queued or running, the task is abandoned along with the stream
+                    self._task_cancelled(task_ids[index])
+                    raise
+
+            futures = [asyncio.ensure_future(bounded(index)) for index in range(len(requests))]
+            try:
+                for future in asyncio.as_completed(futures):
+                    yield await future
+            finally:
+                # A disconnected stream must not leave the rest of the batch running
+                for future in futures:
+                    future.cancel()
+
+    async def _resume_task(self, entry: Dict[str, Any]):
+        """Re-run a journaled task that never finished, e.g. after a crash or forced shutdown"""
+        task_id = entry["task_id"]
+        request = TaskRequest(**entry["payload"])
+        try:
+            await self.shutdown_handler.run(task_id, entry["payload"], self._process_task(task_id, request))
+            logger.info("✅ Resumed task %s completed", task_id)
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else e
+            logger.error("Resumed task %s failed: %s", task_id, detail)
+
+    def run(self, host: str = "0.0.0.0", port: int = 8000):
+        """Run the production server"""
+        logger.info("🚀 Starting server on %s:%s", host, port)
+
+        config = uvicorn.Config(
+            self.app,
+            host=host,
+            port=port,
+            workers=1,
+            # No handlers or levels of uvicorn's own: its loggers, access lines included,
+            # propagate into the queued pipeline and follow the policy's level and sampling
+            log_config=None,
+            log_level=None,
+            access_log=True,
+            loop="uvloop",
+            timeout_keep_alive=30,
+            ssl_certfile="docker/ssl/cert.pem" if os.getenv("ENV") == "prod" else None,
+            ssl_keyfile="docker/ssl/key.pem" if os.getenv("ENV") == "prod" else None
+        )
+        self.serve(uvicorn.Server(config))
+
+    def serve(self, server: uvicorn.Server):
+        """Run until the server stops; exits non-zero when startup failed"""
+        self.server = server
+        self.shutdown_handler.attach(server)
+        server.run()
+        if self.startup.state == "failed":
+            sys.exit(1)
 
 if __name__ == "__main__":
-import json
-app = MasterApplication()
-app.run()
+    import json
+    app = MasterApplication()
+    app.run()
@@ -1,7 +1,382 @@
-# Placeholder for SovereignMaster
+import asyncio
+import heapq
+import json
+import math
+import random
+import re
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from core.admission_controller import AdmissionRejected, AdmissionTimeout
+
+logger = logging.getLogger(__name__)
+
+# Bare numbers are left out: nearly every one is unique and says nothing about the agent
+TOKEN_RE = re.compile(r"[a-z][a-z0-9_]+|[+\-*/^=]")
+
+# Pseudo-observations so routing is sensible before any history exists
+SEED_VOCABULARY = {
+    "math": "solve equation integral derivative calculate compute sum product prime matrix "
+            "probability statistics algebra number formula + - * / ^ =",
+    "code": "code function bug debug python javascript rust compile refactor test api class "
+            "script error exception stack library implement",
+    "research": "research search paper summarize summary find compare source article study "
+                "explain history review literature news",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class TaskRouter:
+    """Naive Bayes over TF-IDF weighted tokens, compiled into a token -> per-agent weight table"""
+
+    def __init__(self, agent_names: Iterable[str], settings: Optional[Dict[str, Any]] = None):
+        self.agent_names = list(agent_names)
+        self.configure(settings or {})
+        self._counts: Dict[str, List[float]] = {}
+        self._totals = [0.0] * len(self.agent_names)
+        self._doc_freq: Dict[str, int] = {}
+        self._docs = 0
+        self._labels = [0] * len(self.agent_names)
+        self._weights: Dict[str, Tuple[float, ...]] = {}
+        self._prior: Tuple[float, ...] = tuple(0.0 for _ in self.agent_names)
+        self._since_compile = 0
+        self._compiling: Optional[asyncio.Task] = None
+        self.routed_total = 0
+        self.skipped_calls_total = 0
+        self.pruned_total = 0
+
+        self._seed_tokens = set()
+        for name, words in SEED_VOCABULARY.items():
+            if name in self.agent_names:
+                self._seed_tokens.update(tokenize(words))
+                self._learn(tokenize(words), [name])
+        self.compile()
+
+    def configure(self, settings):
+        self.enabled = settings.get("enabled", True)
+        self.min_share = settings.get("min_share", 0.2)
+        self.max_agents = settings.get("max_agents", 2)
+        self.explore_rate = settings.get("explore_rate", 0.05)
+        self.recompile_every = settings.get("recompile_every", 100)
+        self.max_features = settings.get("max_features", 5000)
+        self.min_doc_freq = settings.get("min_doc_freq", 2)
+        self.replay_records = settings.get("replay_records", 5000)
+
+    def _learn(self, tokens: List[str], winners: List[str]):
+        self._docs += 1
+        for token in set(tokens):
+            self._doc_freq[token] = self._doc_freq.get(token, 0) + 1
+        for name in winners:
+            index = self.agent_names.index(name)
+            self._labels[index] += 1
+            for token in tokens:
+                counts = self._counts.setdefault(token, [0.0] * len(self.agent_names))
+                counts[index] += 1.0
+                self._totals[index] += 1.0
+
+    def _prune(self):
+        """Forget tokens beyond the max_features most frequent ones, preferring those seen min_doc_freq times"""
+        if len(self._doc_freq) <= self.max_features:
+            return
+        keep = [token for token, df in self._doc_freq.items() if df >= self.min_doc_freq]
+        if len(keep) > self.max_features:
+            keep = heapq.nlargest(self.max_features, keep, key=self._doc_freq.__getitem__)
+        keep = set(keep) | self._seed_tokens
+        for token in [token for token in self._doc_freq if token not in keep]:
+            del self._doc_freq[token]
+            for index, count in enumerate(self._counts.pop(token, ())):
+                self._totals[index] -= count
+            self.pruned_total += 1
+
+    def _tables(self):
+        """Copy of what compile reads, so the weights can be built off the event loop"""
+        self._prune()
+        self._since_compile = 0
+        counts = {token: tuple(values) for token, values in self._counts.items()}
+        return counts, list(self._totals), dict(self._doc_freq), self._docs, list(self._labels)
+
+    def _build(self, counts, totals, doc_freq, docs, labels):
+        """Log-likelihood ratios scaled by IDF for tokens seen in at least min_doc_freq tasks"""
+        vocabulary = max(len(counts), 1)
+        denominators = [total + vocabulary for total in totals]
+        weights = {}
+        for token, values in counts.items():
+            df = doc_freq.get(token, 0)
+            if df < self.min_doc_freq and token not in self._seed_tokens:
+                continue
+            idf = math.log((1 + docs) / (1 + df)) + 1.0
+            logs = [math.log((count + 1.0) / denominator) for count, denominator in zip(values, denominators)]
+            mean = sum(logs) / len(logs)
+            weights[token] = tuple(idf * (value - mean) for value in logs)
+        total_labels = sum(labels) + len(self.agent_names)
+        return weights, tuple(math.log((count + 1) / total_labels) for count in labels)
+
+    def compile(self):
+        """Rebuild the token -> per-agent weight table"""
+        self._weights, self._prior = self._build(*self._tables())
+
+    async def _compile_in_thread(self):
+        try:
+            self._weights, self._prior = await asyncio.to_thread(self._build, *self._tables())
+        except Exception as e:
+            logger.error("Task router compile failed: %s", e)
+        finally:
+            self._compiling = None
+
+    def route(self, text: str) -> List[str]:
+        """Candidate agents for a task, most likely first"""
+        if not self.enabled or random.random() < self.explore_rate:
+            return list(self.agent_names)
+
+        scores = list(self._prior)
+        matched = False
+        weights = self._weights
+        for token in set(tokenize(text)):
+            vector = weights.get(token)
+            if vector is not None:
+                matched = True
+                for i, value in enumerate(vector):
+                    scores[i] += value
+        if not matched:
+            return list(self.agent_names)
+
+        top = max(scores)
+        shares = [math.exp(score - top) for score in scores]
+        total = sum(shares)
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        chosen = [self.agent_names[i] for i in ranked if shares[i] / total >= self.min_share]
+        chosen = chosen[:self.max_agents] or [self.agent_names[ranked[0]]]
+
+        self.routed_total += 1
+        self.skipped_calls_total += len(self.agent_names) - len(chosen)
+        return chosen
+
+    def observe(self, text: str, contributions: List[Dict[str, Any]], min_confidence: float = 0.5):
+        """Learn from which agents produced a confident answer"""
+        winners = [
+            item["agent"] for item in contributions
+            if item.get("status") == "ok" and item.get("confidence", 0.0) >= min_confidence
+            and item.get("agent") in self.agent_names
+        ]
+        if not winners:
+            return
+        self._learn(tokenize(text), winners)
+        self._since_compile += 1
+        if self._since_compile < self.recompile_every or self._compiling is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Replaying the audit log at startup runs in a worker thread
+            self.compile()
+            return
+        self._compiling = loop.create_task(self._compile_in_thread())
+
+    @staticmethod
+    def _tail(path: Path, lines: int, block: int = 65536) -> List[bytes]:
+        """The last lines of a file, read backwards so a long log costs only what is kept"""
+        with open(path, 'rb') as f:
+            f.seek(0, 2)
+            position = f.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= lines:
+                step = min(block, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        tail = data.splitlines()
+        # The first line may be cut in half unless the whole file was read
+        return tail[-lines:] if position == 0 else tail[1:][-lines:]
+
+    def learn_from_audit(self, path: str) -> int:
+        """Replay the most recent routing outcomes recorded in the audit log"""
+        audit_path = Path(path)
+        if not audit_path.exists() or self.replay_records <= 0:
+            return 0
+
+        learned = 0
+        for line in self._tail(audit_path, self.replay_records):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("event") != "task_completed":
+                continue
+            data = record.get("data", {})
+            result = data.get("result")
+            # A cached result repeats an outcome that was already learned
+            if data.get("cached") or not isinstance(result, dict) or not data.get("task"):
+                continue
+            before = self._docs
+            self.observe(data["task"], result.get("contributions", []))
+            learned += self._docs - before
+        self.compile()
+        logger.info("🧭 Task router learned %d outcomes from %s", learned, audit_path)
+        return learned
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "vocabulary": len(self._weights),
+            "observations": self._docs,
+            "pruned_total": self.pruned_total,
+            "routed_total": self.routed_total,
+            "skipped_calls_total": self.skipped_calls_total,
+        }
+
+
 class SovereignMaster:
-    def __init__(self, agents):
-        pass
+    """Fans a task out to agents concurrently and aggregates their answers by confidence"""
+
+    def __init__(self, agents, settings: Optional[Dict[str, Any]] = None, admission=None):
+        # Agent pools; each runs its work through the isolated executor
+        self.agents = agents
+        # AdmissionController; each agent call reserves the footprint learned for that agent
+        self.admission = admission
+        self.router = TaskRouter(agents)
+        self.configure(settings or {})
+
+    def configure(self, settings):
+        self.confidence_threshold = settings.get("confidence_threshold", 0.9)
+        self.default_timeout_ms = settings.get("default_timeout_ms", 5000)
+        self.router.configure(settings.get("routing", {}))
+
+    def _select_agents(self, task: Dict[str, Any]) -> List[str]:
+        requested = task.get("metadata", {}).get("agents")
+        if requested:
+            return [name for name in requested if name in self.agents]
+        return self.router.route(task.get("description", ""))
+
+    def _agent_timeout(self, name: str, task: Dict[str, Any]) -> float:
+        per_agent = task.get("metadata", {}).get("agent_timeout_ms", {})
+        timeout_ms = per_agent.get(name, task.get("timeout_ms", self.default_timeout_ms))
+        return timeout_ms / 1000
+
+    async def _invoke(self, name: str, task: Dict[str, Any], timeout: float,
+                      task_class: Optional[str] = None) -> Dict[str, Any]:
+        agent = self.agents[name]
+        started = time.monotonic()
+        admitted = task_class is None or self.admission is None
+
+        async def call():
+            nonlocal admitted
+            if admitted:
+                return await agent.handle(task)
+            async with self.admission.reserve(task_class, agent=name):
+                admitted = True
+                return await agent.handle(task)
+
+        refusal = None
+        try:
+            # One deadline covers the admission queue and the call itself
+            result = await asyncio.wait_for(call(), timeout)
+            status = "ok"
+        except asyncio.TimeoutError:
+            if admitted:
+                result, status = {}, "timeout"
+            else:
+                refusal = AdmissionTimeout(f"Agent {name} not admitted within {timeout}s")
+                result, status = {"error": str(refusal)}, "admission"
+        except (AdmissionRejected, AdmissionTimeout) as e:
+            refusal = e
+            result, status = {"error": str(e)}, "admission"
+        except Exception as e:
+            logger.warning("Agent %s failed: %s", name, e)
+            result, status = {"error": str(e)}, "error"
+
+        return {
+            **result,
+            "agent": name,
+            "status": status,
+            "confidence": float(result.get("confidence", 0.0)) if status == "ok" else 0.0,
+            "latency_ms": round((time.monotonic() - started) * 1000, 1),
+            # Re-raised by decide() if no routed agent was admitted at all
+            "refusal": refusal,
+        }
+
+    @staticmethod
+    def _aggregate(contributions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Pick the answer with the highest combined confidence across agreeing agents"""
+        by_answer: Dict[str, Dict[str, Any]] = {}
+        for item in contributions:
+            if item["status"] != "ok" or item.get("answer") is None:
+                continue
+            entry = by_answer.setdefault(repr(item["answer"]), {
+                "answer": item["answer"], "agents": [], "miss": 1.0
+            })
+            entry["agents"].append(item["agent"])
+            # Noisy-OR: agreeing agents reinforce each other
+            entry["miss"] *= 1.0 - min(max(item["confidence"], 0.0), 1.0)
+
+        if not by_answer:
+            return {"decision": "No decision", "confidence": 0.0, "agents": []}
+
+        best = min(by_answer.values(), key=lambda entry: entry["miss"])
+        return {
+            "decision": best["answer"],
+            "confidence": round(1.0 - best["miss"], 4),
+            "agents": best["agents"],
+        }
+
+    async def _fan_out(self, names: List[str], task: Dict[str, Any], threshold: float,
+                       task_class: Optional[str] = None):
+        pending = {
+            asyncio.ensure_future(self._invoke(name, task, self._agent_timeout(name, task), task_class)): name
+            for name in names
+        }
+        contributions: List[Dict[str, Any]] = []
+        early_exit = False
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    pending.pop(future)
+                    contributions.append(future.result())
+                if pending and self._aggregate(contributions)["confidence"] >= threshold:
+                    early_exit = True
+                    break
+        finally:
+            # Stragglers are not needed once the answer is confident enough
+            for future in pending:
+                future.cancel()
+        return contributions, sorted(pending.values()), early_exit
+
+    async def decide(self, task: Dict[str, Any], task_class: Optional[str] = None) -> Dict[str, Any]:
+        """task_class: admit each agent call under it; None when the caller already holds a reservation"""
+        names = self._select_agents(task)
+        threshold = task.get("metadata", {}).get("min_confidence", self.confidence_threshold)
+        started = time.monotonic()
+
+        contributions, cancelled, early_exit = await self._fan_out(names, task, threshold, task_class)
+        refusals = [item["refusal"] for item in contributions if item["status"] == "admission"]
+        if refusals and len(refusals) == len(contributions):
+            # Nothing ran: let the caller see the backpressure instead of "No decision"
+            raise refusals[0]
+
+        # A wrong route must not cost the answer: fall back to the skipped agents
+        skipped = [name for name in self.agents if name not in names]
+        if skipped and not task.get("metadata", {}).get("agents") \
+                and self._aggregate(contributions)["decision"] == "No decision":
+            more, cancelled, early_exit = await self._fan_out(skipped, task, threshold, task_class)
+            contributions += more
+            names = names + skipped
+
+        self.router.observe(task.get("description", ""), contributions)
 
-    async def decide(self, task):
-        return {"decision": "No decision", "confidence": 0.0}
+        decision = self._aggregate(contributions)
+        decision.update({
+            "routed": names,
+            "early_exit": early_exit,
+            "cancelled": cancelled,
+            "contributions": [
+                {key: item.get(key) for key in ("agent", "status", "confidence", "latency_ms")}
+                for item in contributions
+            ],
+            "latency_ms": round((time.monotonic() - started) * 1000, 1),
+        })
+        return decision
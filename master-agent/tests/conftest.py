@@ -0,0 +1,99 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+MASTER_DIR = Path(__file__).resolve().parent.parent
+POLICY_PATH = MASTER_DIR.parent / "config" / "security-policy.json"
+
+for _path in (MASTER_DIR, MASTER_DIR.parent):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+from core.policy_store import PolicyStore
+
+
+@pytest.fixture
+def policy_file(tmp_path):
+    """Writable copy of the shipped policy; call with section overrides to change it"""
+    path = tmp_path / "security-policy.json"
+    policy = json.loads(POLICY_PATH.read_text())
+
+    def write(**sections):
+        for section, values in sections.items():
+            policy.setdefault(section, {}).update(values)
+        path.write_text(json.dumps(policy, indent=2))
+        return path
+
+    write()
+    return write
+
+
+@pytest.fixture
+def policy_store(policy_file):
+    def build(**sections):
+        return PolicyStore(str(policy_file(**sections)))
+    return build
+
+
+class StubAgent:
+    """Answers every task with a fixed answer after an optional delay"""
+
+    isolated = False
+
+    def __init__(self, name: str, confidence: float = 0.95, delay: float = 0.0):
+        self.name = name
+        self.confidence = confidence
+        self.delay = delay
+        self.calls = 0
+
+    def get_status(self):
+        return {"name": self.name, "status": "ready"}
+
+    async def handle(self, task):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {"agent": self.name, "answer": f"{self.name} answer", "confidence": self.confidence}
+
+
+@pytest.fixture
+def master_app(tmp_path, monkeypatch, policy_file):
+    """Start a MasterApplication with stub agents in a scratch directory; yields (app, client)"""
+    pytest.importorskip("torch")
+    from fastapi.testclient import TestClient
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    (tmp_path / "config").mkdir()
+    import main
+
+    started = []
+
+    def start(delay: float = 0.0, wait_ready: bool = True, prepare=None, **sections):
+        sections.setdefault("isolation", {"enabled": False})
+        (tmp_path / "config" / "security-policy.json").write_text(policy_file(**sections).read_text())
+        agents = {name: StubAgent(name, delay=delay) for name in ("math", "code", "research")}
+        monkeypatch.setattr(main, "AGENT_FACTORIES", {name: (lambda a=agent: a) for name, agent in agents.items()})
+
+        app = main.MasterApplication()
+        if prepare is not None:
+            prepare(app)
+        client = TestClient(app.app)
+        client.__enter__()
+        started.append(client)
+        if wait_ready:
+            deadline = time.monotonic() + 30
+            while client.get("/health").status_code != 200:
+                assert app.startup.state != "failed", app.startup.error
+                assert time.monotonic() < deadline, "master-agent not ready"
+                time.sleep(0.02)
+        app.stub_agents = agents
+        return app, client
+
+    yield start
+    for client in started:
+        client.__exit__(None, None, None)
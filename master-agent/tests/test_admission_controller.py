@@ -0,0 +1,156 @@
+import asyncio
+from contextlib import AsyncExitStack
+
+import pytest
+
+from core.admission_controller import AdmissionController, AdmissionTimeout, classify_task, current_reservation
+from master.sovereign import SovereignMaster
+
+
+class FakeResources:
+    """ResourceManager with a settable amount of available memory"""
+
+    def __init__(self, store, available_mb):
+        self.store = store
+        self.available_mb = available_mb
+
+    @property
+    def config(self):
+        return self.store.snapshot.data
+
+    def get_available_memory(self):
+        return self.available_mb
+
+    def check_task_limits(self, size_mb):
+        return size_mb <= self.config["resource_allocation"]["memory_limit_mb"]
+
+
+@pytest.fixture
+def controller(policy_store):
+    def build(available_mb=1000, **admission):
+        store = policy_store(admission={"headroom_mb": 0, "recheck_interval_seconds": 0.01, **admission})
+        admission_controller = AdmissionController(FakeResources(store, available_mb))
+        # Fixed numbers, not whatever this machine's cgroup reports
+        admission_controller.cgroup = None
+        admission_controller._memory_state = lambda: (admission_controller.resource_manager.available_mb, None)
+        return admission_controller
+    return build
+
+
+def test_classify_task():
+    assert classify_task("Train a model") == "training"
+    assert classify_task("anything", {"task_class": "custom"}) == "custom"
+    assert classify_task("add two numbers") == "general"
+
+
+def test_cold_start_estimates_are_capped_at_the_task_limit(controller):
+    admission = controller()
+    limit = admission.resource_manager.config["resource_allocation"]["memory_limit_mb"]
+    assert admission.estimate("*", "training") == limit
+
+    async def scenario():
+        async with admission.reserve("training"):
+            pass
+
+    asyncio.run(scenario())
+
+
+def test_margin_never_pushes_a_fitting_task_over_the_limit(controller):
+    admission = controller(safety_margin=1.2)
+    limit = admission.resource_manager.config["resource_allocation"]["memory_limit_mb"]
+    admission.footprints[("*", "general")] = 100
+    assert admission.estimate("*", "general") == pytest.approx(120)
+    admission.footprints[("*", "general")] = limit - 1
+    assert admission.estimate("*", "general") == limit
+
+
+def test_queues_until_memory_is_released(controller):
+    admission = controller(available_mb=1000)
+    admission.footprints[("*", "general")] = 500
+
+    async def hold(done: asyncio.Event):
+        async with admission.reserve("general"):
+            await done.wait()
+
+    async def scenario():
+        first_done, second_done = asyncio.Event(), asyncio.Event()
+        first = asyncio.ensure_future(hold(first_done))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(hold(second_done))
+        # 600 + 600 > 1000: the second waits instead of being rejected
+        await asyncio.sleep(0.05)
+        assert admission.stats()["queued"] == 1 and admission.in_flight == 1
+        first_done.set()
+        await first
+        await asyncio.sleep(0.01)
+        assert admission.stats()["queued"] == 0 and admission.in_flight == 1
+        second_done.set()
+        await second
+        return admission.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["queued_total"] == 1 and stats["in_flight"] == 0
+
+
+def test_queue_timeout(controller):
+    admission = controller(available_mb=1000, queue_timeout_seconds=0.05)
+    admission.footprints[("*", "general")] = 800
+
+    async def scenario():
+        async with admission.reserve("general"):
+            with pytest.raises(AdmissionTimeout):
+                async with admission.reserve("general"):
+                    pass
+
+    asyncio.run(scenario())
+    assert admission.stats()["timed_out_total"] == 1
+
+
+def test_allocated_memory_is_not_counted_twice(controller):
+    # Would time out rather than hang if the third task were refused
+    admission = controller(available_mb=1000, safety_margin=1.0, queue_timeout_seconds=0.2)
+    admission.footprints[("*", "general")] = 300
+
+    async def scenario():
+        async with AsyncExitStack() as stack:
+            for _ in range(3):
+                await stack.enter_async_context(admission.reserve("general"))
+                # The task allocates what it reserved
+                admission.resource_manager.available_mb -= 300
+            return admission.stats()
+
+    # 3 x 300MB on a 1000MB node: the third fits once the first two have allocated
+    stats = asyncio.run(scenario())
+    assert stats["admitted_total"] == 3 and stats["queued_total"] == 0
+    assert stats["unallocated_mb"] == 0
+
+
+def test_footprints_are_learned_per_routed_agent(controller):
+    admission = controller(available_mb=10000)
+
+    class MeasuredAgent:
+        def __init__(self, name, peak_mb):
+            self.name, self.peak_mb = name, peak_mb
+
+        async def handle(self, task):
+            current_reservation.get().observe_peak(self.peak_mb)
+            return {"answer": "42", "confidence": 0.99}
+
+    agents = {"math": MeasuredAgent("math", 100), "code": MeasuredAgent("code", 700)}
+    master = SovereignMaster(agents, settings={"routing": {"enabled": False}}, admission=admission)
+
+    asyncio.run(master.decide({"description": "add numbers", "metadata": {"agents": ["math", "code"]}}, "general"))
+    assert admission.footprints[("math", "general")] == 100
+    assert admission.footprints[("code", "general")] == 700
+    assert ("*", "general") in admission.footprints
+    assert admission.estimate("code", "general") > admission.estimate("math", "general")
+
+
+def test_footprints_survive_a_restart(controller, tmp_path):
+    admission = controller()
+    admission.record_footprint("math", "general", 321)
+    admission.save_footprints(str(tmp_path / "footprints.json"))
+
+    restarted = controller()
+    restarted.load_footprints(str(tmp_path / "footprints.json"))
+    assert restarted.footprints[("math", "general")] == 321
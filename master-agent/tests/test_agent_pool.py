@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+from conftest import StubAgent
+from core.agent_pool import AgentPool
+
+
+class SlowStartAgent(StubAgent):
+    """Takes a while to warm up, blocking its thread the way a model load does"""
+
+    warm_up_seconds = 0.2
+    fail_after = None
+    built = 0
+
+    def __init__(self):
+        super().__init__("math", delay=0.05)
+        type(self).built += 1
+        self.index = type(self).built
+
+    def warm_up(self):
+        time.sleep(self.warm_up_seconds)
+        if self.fail_after is not None and self.index > self.fail_after:
+            raise RuntimeError("model weights missing")
+
+
+def settle(pool, timeout=5.0):
+    async def wait():
+        deadline = time.monotonic() + timeout
+        while pool.spawning and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+    return wait()
+
+
+def test_checkout_bounds_concurrency_to_the_pool_size():
+    async def scenario():
+        pool = AgentPool("math", lambda: StubAgent("math", delay=0.1), size=2)
+        peak = 0
+
+        async def watch():
+            nonlocal peak
+            while True:
+                peak = max(peak, pool.in_flight)
+                await asyncio.sleep(0.005)
+
+        watcher = asyncio.ensure_future(watch())
+        started = time.monotonic()
+        results = await asyncio.gather(*(pool.handle({}) for _ in range(6)))
+        elapsed = time.monotonic() - started
+        watcher.cancel()
+        return pool, results, peak, elapsed
+
+    pool, results, peak, elapsed = asyncio.run(scenario())
+    assert len(results) == 6 and peak == 2
+    assert 0.25 < elapsed < 1.0
+    assert sorted(agent.calls for agent in pool.instances) == [3, 3]
+    assert pool.get_status()["avg_wait_ms"] > 0
+
+
+def test_growing_does_not_block_the_loop(monkeypatch):
+    monkeypatch.setattr(SlowStartAgent, "built", 0)
+    pool = AgentPool("math", SlowStartAgent, size=1)
+
+    async def scenario():
+        started = time.monotonic()
+        pool.resize(3)
+        returned = time.monotonic() - started
+        spawning = pool.spawning
+        # The loop keeps serving the existing instance while the new ones warm up
+        await pool.handle({})
+        served_while_growing = pool.spawning > 0
+        await settle(pool)
+        return returned, spawning, served_while_growing
+
+    returned, spawning, served_while_growing = asyncio.run(scenario())
+    assert returned < 0.05 and spawning == 2 and served_while_growing
+    assert len(pool.instances) == 3 and pool.get_status()["idle"] == 3
+
+
+def test_resize_while_instances_are_checked_out(monkeypatch):
+    monkeypatch.setattr(SlowStartAgent, "warm_up_seconds", 0.0)
+
+    async def scenario():
+        pool = AgentPool("math", SlowStartAgent, size=2)
+        async with pool.checkout() as first, pool.checkout() as second:
+            pool.resize(4)
+            await settle(pool)
+            grown = (len(pool.instances), pool.get_status()["idle"])
+
+            # Idle instances go at once; the checked-out ones stay until returned
+            pool.resize(1)
+            shrunk = (len(pool.instances), pool.get_status()["idle"])
+        return pool, first, second, grown, shrunk
+
+    pool, first, second, grown, shrunk = asyncio.run(scenario())
+    assert grown == (4, 2)
+    assert shrunk == (2, 0)
+    assert len(pool.instances) == 1 and pool.instances[0] in (first, second)
+    assert pool.get_status()["idle"] == 1
+
+
+def test_shrinking_while_instances_start_discards_them(monkeypatch):
+    monkeypatch.setattr(SlowStartAgent, "built", 0)
+    pool = AgentPool("math", SlowStartAgent, size=1)
+
+    async def scenario():
+        pool.resize(3)
+        pool.resize(1)
+        await settle(pool)
+
+    asyncio.run(scenario())
+    assert len(pool.instances) == 1 and pool.spawning == 0
+
+
+def test_failing_warm_up_leaves_the_pool_serving(monkeypatch):
+    monkeypatch.setattr(SlowStartAgent, "built", 0)
+    monkeypatch.setattr(SlowStartAgent, "warm_up_seconds", 0.0)
+    monkeypatch.setattr(SlowStartAgent, "fail_after", 1)
+    pool = AgentPool("math", SlowStartAgent, size=1)
+
+    async def scenario():
+        pool.resize(3)
+        await settle(pool)
+        return await pool.handle({})
+
+    result = asyncio.run(scenario())
+    status = pool.get_status()
+    assert result["agent"] == "math"
+    assert (status["size"], status["target_size"], status["spawn_failed_total"]) == (1, 3, 2)
@@ -0,0 +1,144 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from core.alert_manager import AlertManager
+from core.policy_store import PolicyValidationError
+
+
+@pytest.fixture
+def stub_webhook(monkeypatch):
+    """Route the manager's webhook client to an in-process handler; statuses are served in order"""
+    requests = []
+    urls = []
+    statuses = []
+    client_class = httpx.AsyncClient
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        urls.append(str(request.url))
+        return httpx.Response(statuses.pop(0) if len(statuses) > 1 else statuses[0])
+
+    monkeypatch.setattr(
+        httpx, "AsyncClient", lambda **kwargs: client_class(transport=httpx.MockTransport(handler), **kwargs)
+    )
+
+    def serve(*codes):
+        statuses[:] = codes
+        return requests
+
+    serve.urls = urls
+    return serve
+
+
+def run_alerts(policy_store, scenario, **settings):
+    settings.setdefault("webhook", "http://alerts.test/hook")
+    store = policy_store(alerts=settings)
+
+    async def main():
+        manager = AlertManager(store)
+        manager.start()
+        try:
+            await scenario(manager)
+        finally:
+            await manager.close(timeout=2.0)
+        return manager.stats()
+    return asyncio.run(main())
+
+
+def test_burst_is_coalesced_and_transient_failure_retried(policy_store, stub_webhook):
+    requests = stub_webhook(503, 200)
+
+    async def burst(manager):
+        for _ in range(25):
+            manager.send_alert("agent_down", {"agent": "math"})
+        manager.send_alert("disk_full", {"mount": "/"})
+        # Let the coalescing window close so the repeat summary goes out
+        await asyncio.sleep(0.4)
+
+    stats = run_alerts(
+        policy_store, burst,
+        coalesce_window_seconds=0.1, rate_per_minute=0, burst=1, backoff_seconds=0.01, max_retries=2
+    )
+
+    assert [(item["event"], item["count"]) for item in requests] == [
+        ("agent_down", 1), ("agent_down", 1), ("disk_full", 1), ("agent_down", 24)
+    ]
+    assert requests[-1]["repeated"] is True
+    assert stats["received_total"] == 26
+    assert stats["coalesced_total"] == 24
+    assert stats["channels"]["webhook"] == {
+        "queued": 0, "sent_total": 3, "failed_total": 0, "retried_total": 1, "dropped_total": 0
+    }
+
+
+def test_retries_stop_after_max_retries(policy_store, stub_webhook):
+    requests = stub_webhook(500)
+
+    async def one(manager):
+        manager.send_alert("agent_down", {"agent": "code"})
+
+    stats = run_alerts(policy_store, one, backoff_seconds=0.01, max_retries=2)
+
+    assert len(requests) == 3
+    assert stats["channels"]["webhook"]["retried_total"] == 2
+    assert stats["channels"]["webhook"]["failed_total"] == 1
+
+
+def test_client_errors_are_not_retried(policy_store, stub_webhook):
+    requests = stub_webhook(400)
+
+    async def one(manager):
+        manager.send_alert("agent_down", {"agent": "code"})
+
+    stats = run_alerts(policy_store, one, backoff_seconds=0.01, max_retries=3)
+
+    assert len(requests) == 1
+    assert stats["channels"]["webhook"]["retried_total"] == 0
+    assert stats["channels"]["webhook"]["failed_total"] == 1
+
+
+def test_repeats_are_summarized_on_close(policy_store, stub_webhook):
+    requests = stub_webhook(200)
+
+    async def repeats(manager):
+        for _ in range(3):
+            manager.send_alert("agent_down", {"agent": "research"})
+
+    run_alerts(policy_store, repeats, coalesce_window_seconds=60)
+
+    assert [(item["event"], item["count"]) for item in requests] == [("agent_down", 1), ("agent_down", 2)]
+
+
+def test_channels_follow_policy_changes(policy_store, stub_webhook):
+    requests = stub_webhook(200)
+
+    async def reconfigure(manager):
+        manager.send_alert("before", {})
+        await manager.store.update("alerts", {"webhook": "http://alerts.test/hook"})
+        manager.send_alert("added", {})
+        await asyncio.sleep(0.05)
+        await manager.store.update("alerts", {"webhook": "http://alerts.test/other"})
+        manager.send_alert("moved", {})
+        await asyncio.sleep(0.05)
+        await manager.store.update("alerts", {"webhook": ""})
+        manager.send_alert("removed", {})
+        await asyncio.sleep(0.05)
+
+    stats = run_alerts(policy_store, reconfigure, webhook="")
+
+    assert [item["event"] for item in requests] == ["added", "moved"]
+    assert stub_webhook.urls == ["http://alerts.test/hook", "http://alerts.test/other"]
+    assert stats["channels"] == {}
+
+
+def test_burst_below_one_is_rejected(policy_store):
+    store = policy_store()
+    with pytest.raises(PolicyValidationError):
+        asyncio.run(store.update("alerts", {"burst": 0}))
+    assert store.get("alerts").get("burst", 1) >= 1
+
+    with pytest.raises(PolicyValidationError):
+        policy_store(alerts={"burst": 0.5})
@@ -0,0 +1,34 @@
+from core.acl_engine import ACLDecision
+
+
+def test_batch_is_authorized_once_for_its_concurrency(master_app, monkeypatch):
+    app, client = master_app()
+    max_cores = app.policy_store.get("acl_rules")["resource_access"]["cpu"]["max_cores"]
+    requested = []
+
+    def check(resource, amount):
+        if resource == "cpu":
+            requested.append(amount)
+        return ACLDecision(amount <= max_cores, f"{amount} cores exceeds {max_cores}")
+
+    monkeypatch.setattr(app.acl, "check_resource_access", check)
+    tasks = [{"task": f"solve equation {index}"} for index in range(max_cores * 3)]
+    response = client.post("/api/v1/tasks/batch", json={"tasks": tasks})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["completed"] == len(tasks)
+    assert requested == [float(min(body["concurrency"], max_cores))]
+
+
+def test_denied_batch_fails_every_task_and_releases_admission(master_app, monkeypatch):
+    app, client = master_app()
+    monkeypatch.setattr(
+        app.acl, "check_resource_access",
+        lambda resource, amount: ACLDecision(resource != "cpu", "denied")
+    )
+
+    response = client.post("/api/v1/tasks/batch", json={"tasks": [{"task": "a"}, {"task": "b"}, {"task": "c"}]})
+    assert response.status_code == 403
+    assert app.admission.stats()["in_flight"] == 0
+    assert not any(agent.calls for agent in app.stub_agents.values())
@@ -0,0 +1,48 @@
+import asyncio
+
+from core.task_journal import TaskJournal
+
+
+def test_disconnected_batch_is_journaled_as_cancelled(master_app):
+    app, client = master_app(delay=0.5, batch={"concurrency": 2})
+    from main import BatchRequest
+    batch = BatchRequest(tasks=[{"task": f"ledger {index}"} for index in range(6)], stream=True)
+
+    async def disconnect_after_first():
+        task_ids = [f"cancel-{index}" for index in range(len(batch.tasks))]
+        for task_id, request in zip(task_ids, batch.tasks):
+            await app.journal.submitted(task_id, request.dict())
+        results = app._run_batch(task_ids, batch.tasks, 2)
+        await results.__anext__()
+        first = await results.__anext__()
+        # What StreamingResponse does when the client goes away
+        await results.aclose()
+        await asyncio.sleep(0.1)
+        return task_ids, first
+
+    task_ids, first = client.portal.call(disconnect_after_first)
+    states = {task_id: app.journal.get(task_id)["state"] for task_id in task_ids}
+    assert states[first["task_id"]] == "completed"
+    assert set(states.values()) == {"completed", "cancelled"}
+    assert list(states.values()).count("cancelled") >= 4
+    # Cancelled tasks are terminal, so a restart does not re-run them
+    assert all(entry["task_id"] not in states for entry in TaskJournal(str(app.journal.path)).load())
+
+
+def test_batch_dropped_before_streaming_releases_its_reservation(master_app):
+    app, client = master_app()
+    from main import BatchRequest
+    batch = BatchRequest(tasks=[{"task": f"ledger {index}"} for index in range(3)], stream=True)
+
+    async def admit_then_drop():
+        results = app._run_batch([f"drop-{index}" for index in range(3)], batch.tasks, 2)
+        await results.__anext__()
+        held = app.admission.stats()["in_flight"]
+        # A client gone before the response started: nothing iterates or closes the stream
+        del results
+        await asyncio.sleep(0.1)
+        return held, app.admission.stats()["in_flight"]
+
+    held, after = client.portal.call(admit_then_drop)
+    assert held == 1 and after == 0
+    assert not any(agent.calls for agent in app.stub_agents.values())
@@ -0,0 +1,49 @@
+from core.acl_engine import ACLDecision
+
+
+def count_submissions(app, monkeypatch):
+    submitted = []
+    original = app.journal.submitted
+
+    async def submitted_spy(task_id, payload):
+        submitted.append(task_id)
+        await original(task_id, payload)
+
+    monkeypatch.setattr(app.journal, "submitted", submitted_spy)
+    return submitted
+
+
+def test_cache_hit_skips_the_journal_commit(master_app, monkeypatch):
+    app, client = master_app(decision_cache={"enabled": True})
+    submitted = count_submissions(app, monkeypatch)
+
+    first = client.post("/api/v1/task", json={"task": "solve equation 2x = 4"}).json()
+    calls = sum(agent.calls for agent in app.stub_agents.values())
+    second = client.post("/api/v1/task", json={"task": "solve  equation 2x = 4"}).json()
+
+    assert first["cached"] is False and second["cached"] is True
+    assert second["decision"] == first["decision"]
+    assert sum(agent.calls for agent in app.stub_agents.values()) == calls
+    assert submitted == [first["task_id"]]
+    # The hit is still recorded, just not waited on
+    assert client.get(f"/api/v1/task/{second['task_id']}").json()["state"] == "completed"
+
+
+def test_cache_hit_still_needs_authorization(master_app, monkeypatch):
+    app, client = master_app(decision_cache={"enabled": True})
+    assert client.post("/api/v1/task", json={"task": "solve equation 2x = 4"}).status_code == 200
+
+    monkeypatch.setattr(
+        app.acl, "check_resource_access",
+        lambda resource, amount: ACLDecision(resource != "cpu", "denied")
+    )
+    assert client.post("/api/v1/task", json={"task": "solve equation 2x = 4"}).status_code == 403
+
+
+def test_disabled_cache_journals_every_task(master_app, monkeypatch):
+    app, client = master_app()
+    submitted = count_submissions(app, monkeypatch)
+
+    for _ in range(2):
+        assert client.post("/api/v1/task", json={"task": "solve equation 2x = 4"}).json()["cached"] is False
+    assert len(submitted) == 2
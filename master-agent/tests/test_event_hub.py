@@ -0,0 +1,127 @@
+import asyncio
+import importlib.util
+import json
+import threading
+from pathlib import Path
+
+from core.acl_engine import ACLDecision
+from core.event_hub import EventHub
+
+SECURITY_CLI = Path(__file__).resolve().parents[2] / "scripts" / "security-cli.py"
+
+
+def run_hub(scenario, **settings):
+    async def main():
+        hub = EventHub(settings)
+        hub.start()
+        try:
+            return await scenario(hub)
+        finally:
+            await hub.close()
+    return asyncio.run(main())
+
+
+def drain(subscriber):
+    messages = []
+    while not subscriber.queue.empty():
+        message = subscriber.queue.get_nowait()
+        messages.append(None if message is None else json.loads(message))
+    return messages
+
+
+def test_full_queue_keeps_the_newest_events():
+    async def scenario(hub):
+        subscriber = hub.subscribe()
+        for index in range(5):
+            hub.publish("tick", {"index": index})
+        return drain(subscriber), subscriber.dropped, hub.stats()
+
+    messages, dropped, stats = run_hub(scenario, max_queue=3)
+    assert [message["data"]["index"] for message in messages] == [2, 3, 4]
+    assert dropped == 2 and stats["dropped_total"] == 2
+    assert stats["published_total"] == 5
+
+
+def test_slow_consumer_is_evicted_without_affecting_the_others():
+    async def scenario(hub):
+        slow, fast = hub.subscribe(), hub.subscribe()
+        received = []
+        for index in range(10):
+            hub.publish("tick", {"index": index})
+            received += drain(fast)
+        return drain(slow), slow.closed, received, hub.stats()
+
+    slow_messages, closed, received, stats = run_hub(scenario, max_queue=2, max_dropped=4)
+    # Closing empties the queue and leaves the wake-up sentinel for the reader
+    assert closed and slow_messages == [None]
+    assert [message["data"]["index"] for message in received] == list(range(10))
+    assert stats["evicted_total"] == 1 and stats["subscribers"] == 1
+
+
+def test_subscribers_only_see_their_topics():
+    async def scenario(hub):
+        acl_only, everything = hub.subscribe(["acl_pending"]), hub.subscribe()
+        hub.publish("acl_pending", {"operation_id": "op_1"})
+        hub.publish("task_completed", {"task_id": "t1"})
+        wanted = hub.has_subscribers("metrics"), hub.has_subscribers("acl_pending")
+        hub.unsubscribe(everything)
+        return drain(acl_only), drain(everything), wanted, hub.has_subscribers("metrics")
+
+    acl_only, everything, wanted, after = run_hub(scenario)
+    assert [message["type"] for message in acl_only] == ["acl_pending"]
+    assert [message["type"] for message in everything] == ["acl_pending", "task_completed"]
+    assert wanted == (True, True) and after is False
+
+
+def test_publish_from_a_worker_thread_is_delivered_on_the_loop():
+    async def scenario(hub):
+        subscriber = hub.subscribe()
+        thread = threading.Thread(target=hub.publish, args=("acl_resolved", {"operation_id": "op_2"}))
+        thread.start()
+        thread.join()
+        return json.loads(await asyncio.wait_for(subscriber.get(), 1.0))
+
+    assert run_hub(scenario)["data"] == {"operation_id": "op_2"}
+
+
+def test_websocket_receives_task_completed(master_app):
+    app, client = master_app()
+    token = app.jwt_generator.generate_service_token("test")
+
+    with client.websocket_connect(f"/ws?token={token}&topics=task_completed") as websocket:
+        response = client.post("/api/v1/task", json={"task": "solve 2 + 2"})
+        assert response.status_code == 200
+        event = json.loads(websocket.receive_text())
+
+        websocket.send_text(json.dumps({"type": "ping"}))
+        reply = json.loads(websocket.receive_text())
+
+    assert event["type"] == "task_completed"
+    assert event["data"]["task_id"] == response.json()["task_id"]
+    assert event["data"]["decision"] == response.json()["decision"]
+    assert reply["type"] == "pong"
+
+
+def test_security_cli_answers_through_the_server(master_app, monkeypatch, capsys):
+    import httpx
+    app, client = master_app()
+    spec = importlib.util.spec_from_file_location("security_cli", SECURITY_CLI)
+    cli = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cli)
+    # The http transport is served by the test client instead of a listening server
+    monkeypatch.setattr(httpx, "request", lambda method, url, **kwargs: client.request(
+        method, url.removeprefix(cli.DEFAULT_URL), json=kwargs["json"], headers=kwargs["headers"]
+    ))
+    first = app.acl.request_confirmation(ACLDecision(True, "delete the archive", True))
+    second = app.acl.request_confirmation(ACLDecision(True, "rotate the keys", True))
+    socket_path = "state/operator.sock"
+
+    assert cli.list_pending("http") and cli.list_pending("unix", socket_path=socket_path)
+    listed = capsys.readouterr().out
+    assert listed.count(f"ID: {first}") == 2 and listed.count("Reason: rotate the keys") == 2
+
+    assert cli.confirm(first, True, "unix", socket_path=socket_path)
+    assert cli.confirm(second, False)
+    assert not cli.confirm("op_unknown", True)
+    assert app.acl.get_pending_confirmations() == {}
+    assert "No pending operation" in capsys.readouterr().out
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from core.policy_store import PolicyStore, PolicyValidationError
+
+
+def edit(path, section, **changes):
+    """Change the policy file the way an operator's editor would"""
+    policy = json.loads(path.read_text())
+    policy.setdefault(section, {}).update(changes)
+    path.write_text(json.dumps(policy))
+    # Same-size rewrites inside one mtime tick would otherwise look unchanged
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_snapshot_is_read_only(policy_store):
+    store = policy_store()
+    with pytest.raises(TypeError):
+        store.snapshot["resource_allocation"]["cpu_cores"] = 64
+    with pytest.raises(TypeError):
+        store.get("acl_rules")["resource_access"]["cpu"]["max_cores"] = 64
+    # Callers wanting to change something work on a copy
+    copy = store.snapshot.to_dict()
+    copy["resource_allocation"]["cpu_cores"] = 64
+    assert store.get("resource_allocation")["cpu_cores"] != 64
+
+
+def test_invalid_policy_is_rejected_at_load(policy_file):
+    with pytest.raises(PolicyValidationError):
+        PolicyStore(str(policy_file(resource_allocation={"cpu_cores": 0})))
+
+
+def test_update_persists_and_notifies(policy_store):
+    store = policy_store()
+    seen = []
+    store.subscribe(lambda old, new: seen.append((old.version, new.version, new["batch"]["max_tasks"])))
+
+    async def scenario():
+        await store.update("batch", {"max_tasks": 7})
+        # Our own write must not be picked up again as an external edit
+        return await store.reload()
+
+    assert asyncio.run(scenario()) is None
+    assert seen == [(1, 2, 7)]
+    assert json.loads(store.path.read_text())["batch"]["max_tasks"] == 7
+    assert not list(store.path.parent.glob(".security-policy.*"))
+
+
+def test_update_rejects_invalid_changes(policy_store):
+    store = policy_store()
+    with pytest.raises(PolicyValidationError):
+        asyncio.run(store.update("resource_allocation", {"ram_gb": -1}))
+    assert store.snapshot.version == 1
+    assert json.loads(store.path.read_text())["resource_allocation"]["ram_gb"] > 0
+
+
+def test_reload_applies_external_edits_and_keeps_policy_on_bad_ones(policy_store):
+    store = policy_store()
+    versions = []
+    store.subscribe(lambda old, new: versions.append(new.version))
+
+    async def scenario():
+        edit(store.path, "batch", max_tasks=3)
+        assert (await store.reload()).get("batch")["max_tasks"] == 3
+
+        edit(store.path, "resource_allocation", cpu_cores="many")
+        assert await store.reload() is None
+
+        store.path.write_text("{ half written")
+        assert await store.reload() is None
+
+    asyncio.run(scenario())
+    assert versions == [2]
+    assert store.get("batch")["max_tasks"] == 3
+    assert store.get("resource_allocation")["cpu_cores"] != "many"
+
+
+def test_watcher_picks_up_edits(policy_file):
+    store = PolicyStore(str(policy_file()), poll_interval=0.01)
+
+    async def scenario():
+        store.start_watching()
+        try:
+            edit(store.path, "batch", max_tasks=11)
+            for _ in range(200):
+                if store.get("batch")["max_tasks"] == 11:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await store.stop_watching()
+
+    asyncio.run(scenario())
+    assert store.get("batch")["max_tasks"] == 11
+
+
+def test_failing_subscriber_does_not_block_the_others(policy_store):
+    store = policy_store()
+    seen = []
+
+    def broken(old, new):
+        raise RuntimeError("boom")
+
+    async def notified(old, new):
+        seen.append("async")
+
+    store.subscribe(broken)
+    store.subscribe(lambda old, new: seen.append("sync"))
+    store.subscribe(notified)
+
+    async def scenario():
+        await store.update("batch", {"max_tasks": 5})
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert seen == ["sync", "async"]
+    assert store.snapshot.version == 2
@@ -0,0 +1,136 @@
+import asyncio
+import inspect
+import json
+import threading
+import time
+
+import pytest
+
+from core.shutdown import GracefulShutdown, ShuttingDown, TaskInterrupted
+from core.task_journal import TaskJournal
+
+
+def test_new_work_is_refused_while_draining():
+    async def scenario():
+        shutdown = GracefulShutdown(app=None, drain_timeout=5.0)
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        running = asyncio.ensure_future(shutdown.run("a", {}, work()))
+        await asyncio.sleep(0)
+        draining = asyncio.ensure_future(shutdown.drain())
+        while shutdown.accepting:
+            await asyncio.sleep(0)
+
+        refused = work()
+        with pytest.raises(ShuttingDown):
+            await shutdown.run("b", {}, refused)
+        # Never started, and closed so it is not reported as never awaited
+        assert inspect.getcoroutinestate(refused) == inspect.CORO_CLOSED
+        assert shutdown.state == "draining"
+
+        release.set()
+        await draining
+        return await running
+
+    # Work already running when the drain began is allowed to finish
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_drain_deadline_interrupts_and_journals_in_flight_work(tmp_path):
+    path = tmp_path / "tasks.journal"
+
+    async def scenario():
+        journal = TaskJournal(str(path))
+        journal.load()
+        journal.start()
+        shutdown = GracefulShutdown(app=None, drain_timeout=0.1)
+        shutdown.persist_unfinished = journal.interrupted
+        shutdown.on_flush("journal", journal.close)
+
+        await journal.submitted("slow", {"task": "slow"})
+        running = asyncio.ensure_future(shutdown.run("slow", {"task": "slow"}, asyncio.sleep(60)))
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        await shutdown.drain()
+        with pytest.raises(TaskInterrupted):
+            await running
+        return journal.get("slow")["state"], time.monotonic() - started
+
+    state, elapsed = asyncio.run(scenario())
+    assert state == "interrupted" and elapsed < 2.0
+    # Interrupted is not terminal: the next start replays the task
+    assert TaskJournal(str(path)).load() == [{"task_id": "slow", "payload": {"task": "slow"}}]
+
+
+def test_hooks_run_in_order_once_even_when_one_fails():
+    calls = []
+
+    async def scenario():
+        shutdown = GracefulShutdown(app=None, drain_timeout=1.0)
+
+        async def flush_async():
+            await asyncio.sleep(0)
+            calls.append("flush async")
+
+        def broken():
+            raise RuntimeError("disk gone")
+
+        async def work():
+            await asyncio.sleep(0.05)
+            calls.append("work finished")
+
+        shutdown.on_drain("release waiters", lambda: calls.append("drain"))
+        shutdown.on_flush("broken", broken)
+        shutdown.on_flush("flush sync", lambda: calls.append("flush sync"))
+        shutdown.on_flush("flush async", flush_async)
+
+        running = asyncio.ensure_future(shutdown.run("a", {}, work()))
+        await asyncio.sleep(0)
+        await asyncio.gather(shutdown.drain(), shutdown.drain())
+        await running
+        await shutdown.drain()
+
+    asyncio.run(scenario())
+    assert calls == ["drain", "work finished", "flush sync", "flush async"]
+
+
+def journal_states(path):
+    states = {}
+    for line in path.read_text().splitlines():
+        record = json.loads(line)
+        states[record["id"]] = record["state"]
+    return states
+
+
+def test_interrupted_task_is_refused_then_resumed_on_the_next_start(master_app, tmp_path):
+    app, client = master_app(delay=5.0, shutdown={"drain_timeout_seconds": 0.2})
+    responses = []
+    submit = threading.Thread(
+        target=lambda: responses.append(client.post("/api/v1/task", json={"task": "reconcile the ledger"}))
+    )
+    submit.start()
+    deadline = time.monotonic() + 10
+    while not any(pool.in_flight for pool in app.agents.values()):
+        assert time.monotonic() < deadline, "task never started"
+        time.sleep(0.01)
+
+    client.portal.call(app.shutdown_handler.drain)
+    submit.join(10)
+    assert responses[0].status_code == 503
+    refused = client.post("/api/v1/task", json={"task": "another"})
+    assert refused.status_code == 503 and refused.headers["Retry-After"] == "5"
+
+    journal_path = tmp_path / "state" / "tasks.journal"
+    interrupted = [task_id for task_id, state in journal_states(journal_path).items() if state == "interrupted"]
+    assert len(interrupted) == 1
+
+    resumed, _ = master_app(delay=0.0)
+    deadline = time.monotonic() + 10
+    while (resumed.journal.get(interrupted[0]) or {}).get("state") != "completed":
+        assert time.monotonic() < deadline, "interrupted task was not resumed"
+        time.sleep(0.02)
+    assert sum(agent.calls for agent in resumed.stub_agents.values()) >= 1
@@ -0,0 +1,150 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+from conftest import StubAgent
+from core.admission_controller import AdmissionRejected, AdmissionTimeout
+from master.sovereign import SovereignMaster
+
+
+class TrackedAgent(StubAgent):
+    """StubAgent that records when it starts and whether it was cancelled"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.started_at = None
+        self.cancelled = False
+
+    async def handle(self, task):
+        self.started_at = time.monotonic()
+        try:
+            return await super().handle(task)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+class Gate:
+    """Admission stand-in that refuses some agents and queues others forever"""
+
+    def __init__(self, refuse=(), hold=()):
+        self.refuse = refuse
+        self.hold = hold
+
+    @asynccontextmanager
+    async def reserve(self, task_class, agent="*"):
+        if agent in self.refuse:
+            raise AdmissionRejected(f"{agent} does not fit")
+        if agent in self.hold:
+            await asyncio.Event().wait()
+        yield
+
+
+def decide(agents, admission=None, **metadata):
+    settings = {"confidence_threshold": 0.9, "routing": {"explore_rate": 0.0}}
+    master = SovereignMaster(agents, settings, admission=admission)
+    task = {"description": "anything", "metadata": {"agents": list(agents), **metadata}}
+
+    async def main():
+        started = time.monotonic()
+        decision = await master.decide(task, "general" if admission else None)
+        return decision, time.monotonic() - started
+    return asyncio.run(main())
+
+
+def test_agents_run_concurrently():
+    agents = {name: TrackedAgent(name, confidence=0.5, delay=0.3) for name in ("math", "code", "research")}
+    decision, elapsed = decide(agents)
+
+    assert elapsed < 0.6
+    starts = [agent.started_at for agent in agents.values()]
+    assert max(starts) - min(starts) < 0.1
+    assert sorted(item["agent"] for item in decision["contributions"]) == ["code", "math", "research"]
+    assert not decision["early_exit"]
+
+
+def test_confident_answer_exits_early_and_cancels_the_rest():
+    agents = {
+        "math": TrackedAgent("math", confidence=0.95),
+        "code": TrackedAgent("code", delay=5.0),
+        "research": TrackedAgent("research", delay=5.0),
+    }
+    decision, elapsed = decide(agents)
+
+    assert elapsed < 1.0
+    assert decision["early_exit"] and decision["decision"] == "math answer"
+    assert decision["cancelled"] == ["code", "research"]
+    assert agents["code"].cancelled and agents["research"].cancelled
+    assert not agents["math"].cancelled
+
+
+def test_min_confidence_from_metadata_overrides_the_threshold():
+    agents = {"math": TrackedAgent("math", confidence=0.6), "code": TrackedAgent("code", delay=5.0)}
+    decision, elapsed = decide(agents, min_confidence=0.5)
+
+    assert decision["early_exit"] and decision["cancelled"] == ["code"]
+    assert elapsed < 1.0
+
+
+def test_slow_agent_times_out_without_failing_the_decision():
+    agents = {"math": TrackedAgent("math", confidence=0.5), "code": TrackedAgent("code", delay=5.0)}
+    decision, _ = decide(agents, agent_timeout_ms={"code": 100})
+
+    statuses = {item["agent"]: item["status"] for item in decision["contributions"]}
+    assert statuses == {"math": "ok", "code": "timeout"}
+    assert decision["decision"] == "math answer"
+
+
+def test_refused_agent_does_not_abort_the_decision():
+    agents = {"math": TrackedAgent("math", confidence=0.5), "code": TrackedAgent("code")}
+    decision, _ = decide(agents, Gate(refuse={"code"}))
+
+    statuses = {item["agent"]: item["status"] for item in decision["contributions"]}
+    assert statuses == {"math": "ok", "code": "admission"}
+    assert decision["decision"] == "math answer" and agents["code"].calls == 0
+
+
+def test_admission_wait_is_bounded_by_the_agent_timeout():
+    agents = {"math": TrackedAgent("math", confidence=0.5), "code": TrackedAgent("code")}
+    decision, elapsed = decide(agents, Gate(hold={"code"}), agent_timeout_ms={"code": 100})
+
+    statuses = {item["agent"]: item["status"] for item in decision["contributions"]}
+    assert statuses == {"math": "ok", "code": "admission"}
+    assert elapsed < 1.0
+
+
+def test_decision_fails_when_no_agent_is_admitted():
+    agents = {"math": TrackedAgent("math"), "code": TrackedAgent("code")}
+    with pytest.raises(AdmissionRejected):
+        decide(agents, Gate(refuse={"math", "code"}))
+    with pytest.raises(AdmissionTimeout):
+        decide(agents, Gate(hold={"math", "code"}), agent_timeout_ms={"math": 50, "code": 50})
+
+
+@pytest.mark.parametrize("metadata", [
+    {"agent_timeout_ms": 100},
+    {"agent_timeout_ms": {"math": -1}},
+    {"min_confidence": "high"},
+    {"min_confidence": 1.5},
+    {"agents": "math"},
+])
+def test_malformed_metadata_is_rejected(master_app, metadata):
+    app, client = master_app()
+    response = client.post("/api/v1/task", json={"task": "solve 2 + 2", "metadata": metadata})
+    assert response.status_code == 422
+    assert not any(agent.calls for agent in app.stub_agents.values())
+
+
+def test_metadata_values_are_coerced(master_app):
+    app, client = master_app()
+    import main
+    request = main.TaskRequest(task="x", metadata={"min_confidence": "0.5", "agent_timeout_ms": {"math": "250"}})
+    assert request.metadata == {"min_confidence": 0.5, "agent_timeout_ms": {"math": 250.0}}
+
+    response = client.post("/api/v1/task", json={
+        "task": "solve 2 + 2", "metadata": {"agents": ["math"], "min_confidence": "0.5"}
+    })
+    assert response.status_code == 200
+    assert app.stub_agents["math"].calls == 1 and app.stub_agents["code"].calls == 0
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from core.startup import StartupTracker
+
+
+class FakeServer:
+    def __init__(self):
+        self.should_exit = False
+
+    def handle_exit(self, sig, frame):
+        self.should_exit = True
+
+    def run(self):
+        pass
+
+
+def test_stage_runs_initializers_concurrently():
+    tracker = StartupTracker()
+
+    async def scenario():
+        started = time.monotonic()
+        results = await tracker.stage(a=(time.sleep, 0.2), b=(time.sleep, 0.2), c=(lambda: "built",))
+        return results, time.monotonic() - started
+
+    results, elapsed = asyncio.run(scenario())
+    assert results["c"] == "built"
+    assert elapsed < 0.35
+    assert set(tracker.timings_ms) == {"a", "b", "c"}
+
+
+def test_failed_startup_stops_the_server(master_app, monkeypatch):
+    import main
+
+    def broken(*args):
+        raise RuntimeError("journal volume missing")
+
+    monkeypatch.setattr(main, "TaskJournal", broken)
+    server = FakeServer()
+    app, client = master_app(wait_ready=False, prepare=lambda app: setattr(app, "server", server))
+
+    deadline = time.monotonic() + 10
+    while app.startup.state == "starting" and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert app.startup.state == "failed"
+    assert server.should_exit
+    health = client.get("/health")
+    assert health.status_code == 503 and "journal volume missing" in health.json()["startup"]["error"]
+
+
+def test_serve_exits_non_zero_after_a_failed_startup(master_app):
+    app, _ = master_app()
+    app.startup.state = "failed"
+    with pytest.raises(SystemExit) as exit_info:
+        app.serve(FakeServer())
+    assert exit_info.value.code == 1
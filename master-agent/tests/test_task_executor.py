@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from core.agent_pool import AgentPool
+from core.task_executor import IsolatedExecutor, TaskKilled, default_cpuset, parse_cpuset
+
+
+class PidAgent:
+    async def handle(self, task):
+        return {"pid": os.getpid()}
+
+
+class InProcessAgent(PidAgent):
+    isolated = False
+
+
+class WarmAgent:
+    def __init__(self):
+        self.warm_pid = None
+
+    def warm_up(self):
+        self.warm_pid = os.getpid()
+
+    def get_status(self):
+        return {"name": "warm", "status": "ready"}
+
+    async def handle(self, task):
+        if task.get("hang"):
+            await asyncio.sleep(60)
+        return {"pid": os.getpid(), "warm_pid": self.warm_pid, "main_loaded": "main" in sys.modules}
+
+
+def add(a, b):
+    return a + b
+
+
+def sleep_forever():
+    import time
+    time.sleep(60)
+
+
+def allocate(mb):
+    return len(bytearray(mb * 1024 * 1024))
+
+
+@pytest.fixture
+def executor(policy_store):
+    # Controllers are rarely delegated to a test run; the rlimit fallback is what is exercised
+    return IsolatedExecutor(policy_store(isolation={"cgroup_root": "/nonexistent", "memory_max_mb": 256}))
+
+
+def test_parse_cpuset():
+    assert parse_cpuset("0-2,5") == [0, 1, 2, 5]
+    assert parse_cpuset("") == []
+
+
+def test_default_cpuset_is_empty_when_every_core_is_allowed():
+    cores = sorted(os.sched_getaffinity(0))
+    assert default_cpuset(len(cores)) == ""
+    assert default_cpuset(None) == ""
+    if len(cores) > 1:
+        assert default_cpuset(1) == str(cores[0])
+
+
+def test_runs_in_a_child_process(executor):
+    assert asyncio.run(executor.run(add, 2, 3)) == 5
+    assert asyncio.run(executor.run(PidAgent().handle, {}))["pid"] != os.getpid()
+    assert executor.stats()["completed_total"] == 2
+
+
+def test_timeout_kills_the_child(executor):
+    with pytest.raises(TaskKilled):
+        asyncio.run(executor.run(sleep_forever, timeout=0.5))
+    assert executor.stats()["killed_total"] == 1
+    assert executor.stats()["running"] == 0
+
+
+def test_memory_limit_confines_only_the_task(executor):
+    with pytest.raises((TaskKilled, RuntimeError)):
+        asyncio.run(executor.run(allocate, 512))
+    # Only the task failed; the next one runs normally
+    assert asyncio.run(executor.run(allocate, 16)) == 16 * 1024 * 1024
+
+
+def test_pools_isolate_agents_by_default(executor):
+    async def scenario():
+        isolated = AgentPool("pid", PidAgent, executor=executor)
+        in_process = AgentPool("local", InProcessAgent, executor=executor)
+        try:
+            return await isolated.handle({}), await in_process.handle({})
+        finally:
+            isolated.close()
+
+    isolated, in_process = asyncio.run(scenario())
+    assert isolated["pid"] != os.getpid()
+    assert in_process["pid"] == os.getpid()
+
+
+def test_warm_worker_serves_every_task(executor):
+    # Built off the loop, as at startup, so both workers are up before the first task
+    pool = AgentPool("warm", WarmAgent, size=2, executor=executor)
+
+    async def scenario():
+        try:
+            results = await asyncio.gather(*(pool.handle({}) for _ in range(6)))
+            return results, pool.get_status(), executor.stats()
+        finally:
+            pool.close()
+
+    results, status, stats = asyncio.run(scenario())
+    # Each task ran on an instance warmed up in the same long-lived worker
+    assert all(result["pid"] == result["warm_pid"] for result in results)
+    assert len({result["pid"] for result in results}) == 2
+    assert not any(result["main_loaded"] for result in results)
+    assert sum(instance["calls_total"] for instance in status["instances"]) == 6
+    assert stats["workers"] == 2 and executor.stats()["workers"] == 0
+
+
+def test_killed_worker_is_replaced_on_the_next_task(executor):
+    async def scenario():
+        pool = AgentPool("warm", WarmAgent, executor=executor)
+        try:
+            first = await pool.handle({})
+            with pytest.raises(TaskKilled):
+                await pool.handle({"hang": True}, timeout=0.5)
+            return first, await pool.handle({}), pool.get_status()
+        finally:
+            pool.close()
+
+    first, second, status = asyncio.run(scenario())
+    assert second["pid"] != first["pid"] and second["pid"] == second["warm_pid"]
+    assert status["instances"][0]["restarts"] == 1
+    assert status["failed_total"] == 1 and executor.stats()["killed_total"] == 1
+
+
+def test_disabled_isolation_runs_in_process(policy_store):
+    executor = IsolatedExecutor(policy_store(isolation={"enabled": False}))
+    assert asyncio.run(executor.run(PidAgent().handle, {}))["pid"] == os.getpid()
+    assert executor.stats()["mode"] == "disabled"
@@ -0,0 +1,88 @@
+import asyncio
+
+from core.task_journal import TaskJournal
+
+
+def run_journal(path, scenario, **settings):
+    async def main():
+        journal = TaskJournal(str(path), settings)
+        unfinished = journal.load()
+        journal.start()
+        try:
+            await scenario(journal)
+        finally:
+            await journal.close()
+        return journal, unfinished
+    return asyncio.run(main())
+
+
+def test_replay_returns_only_unfinished_tasks(tmp_path):
+    path = tmp_path / "tasks.journal"
+
+    async def first_run(journal):
+        for name in ("done", "broken", "abandoned", "running"):
+            await journal.submitted(name, {"task": name})
+        journal.started("running")
+        journal.completed("done", {"confidence": 1.0})
+        journal.failed("broken", "boom")
+        journal.cancelled("abandoned", "client disconnected")
+
+    async def nothing(journal):
+        pass
+
+    run_journal(path, first_run)
+    journal, unfinished = run_journal(path, nothing)
+    assert unfinished == [{"task_id": "running", "payload": {"task": "running"}}]
+    assert journal.get("done")["result"] == {"confidence": 1.0}
+    assert journal.get("abandoned")["state"] == "cancelled"
+    assert "payload" not in journal.get("abandoned")
+
+
+def test_submissions_share_a_group_commit(tmp_path):
+    async def burst(journal):
+        await asyncio.gather(*(journal.submitted(f"t{index}", {}) for index in range(100)))
+
+    journal, _ = run_journal(tmp_path / "tasks.journal", burst, commit_window_ms=20)
+    assert journal.stats()["records_total"] == 100
+    assert journal.stats()["commits_total"] < 10
+
+
+def test_torn_final_line_is_truncated(tmp_path):
+    path = tmp_path / "tasks.journal"
+
+    async def one(journal):
+        await journal.submitted("kept", {"task": "kept"})
+
+    run_journal(path, one)
+    with open(path, "a") as f:
+        f.write('{"id": "torn", "t": 1, "sta')
+
+    async def nothing(journal):
+        pass
+
+    journal, unfinished = run_journal(path, nothing)
+    assert [entry["task_id"] for entry in unfinished] == ["kept"]
+    assert path.read_text().endswith("\n")
+
+
+def test_compaction_keeps_one_record_per_task(tmp_path):
+    path = tmp_path / "tasks.journal"
+
+    async def churn(journal):
+        for index in range(30):
+            await journal.submitted(f"t{index}", {"task": index})
+            journal.started(f"t{index}")
+            if index % 3:
+                journal.completed(f"t{index}", {"confidence": 0.5})
+        await asyncio.sleep(0.05)
+
+    journal, _ = run_journal(path, churn, compact_after_records=40, retain_completed=5)
+    lines = path.read_text().splitlines()
+    assert len(lines) < 60
+
+    async def nothing(journal):
+        pass
+
+    restarted, unfinished = run_journal(path, nothing)
+    assert sorted(entry["task_id"] for entry in unfinished) == sorted(f"t{index}" for index in range(0, 30, 3))
+    assert restarted.get("t29")["state"] == "completed"
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import time
+
+from master.sovereign import TaskRouter, tokenize
+
+AGENTS = ["math", "code", "research"]
+
+
+def ok(*agents):
+    return [{"agent": name, "status": "ok", "confidence": 0.9} for name in agents]
+
+
+def router(**settings):
+    return TaskRouter(AGENTS, {"explore_rate": 0.0, **settings})
+
+
+def test_numbers_are_not_tokens():
+    assert tokenize("Order 12345 of 7 widgets + 2") == ["order", "of", "widgets", "+"]
+
+
+def test_seed_vocabulary_routes_before_any_history():
+    assert router().route("solve this integral")[0] == "math"
+    assert router().route("debug my python function")[0] == "code"
+
+
+def test_learns_from_confident_answers():
+    r = router(recompile_every=1)
+    for _ in range(20):
+        r.observe("quarterly ledger reconciliation", ok("research"))
+    assert r.route("ledger reconciliation")[0] == "research"
+
+
+def test_low_confidence_answers_are_not_learned():
+    r = router()
+    r.observe("quarterly ledger", [{"agent": "code", "status": "ok", "confidence": 0.1}])
+    assert r.stats()["observations"] == len(AGENTS)
+
+
+def test_vocabulary_stays_bounded_under_unique_tokens():
+    r = router(max_features=500, recompile_every=100)
+    started = time.monotonic()
+    for index in range(20000):
+        r.observe(f"ticket t{index} for widget w{index % 7}", ok("code"))
+    assert time.monotonic() - started < 30
+    assert len(r._doc_freq) <= 500 + 100 * 3
+    assert r.stats()["vocabulary"] <= 500 + len(r._seed_tokens)
+    assert r.stats()["pruned_total"] > 0
+    # Frequent tokens survive pruning
+    assert "widget" in r._weights
+
+
+def test_compile_runs_off_the_event_loop():
+    async def scenario():
+        r = router(recompile_every=10)
+        before = r._weights
+        for index in range(10):
+            r.observe(f"ledger entry {index}", ok("research"))
+        assert r._compiling is not None
+        await r._compiling
+        return r, before
+
+    r, before = asyncio.run(scenario())
+    assert r._weights is not before
+    assert r._compiling is None
+
+
+def test_audit_replay_is_limited_and_skips_cached(tmp_path):
+    path = tmp_path / "audit.log"
+    records = []
+    for index in range(50):
+        records.append({"event": "task_completed", "data": {
+            "task": f"ledger item {index}", "cached": index % 2 == 1,
+            "result": {"contributions": ok("research")}
+        }})
+    records.append({"event": "other", "data": {}})
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+    assert router(replay_records=1000).learn_from_audit(str(path)) == 25
+    # Only the last 11 lines are read: the trailing record and 10 tasks, half of them cached
+    assert router(replay_records=11).learn_from_audit(str(path)) == 5
+    assert router(replay_records=0).learn_from_audit(str(path)) == 0
+
+
+def test_tail_reads_across_blocks(tmp_path):
+    path = tmp_path / "log"
+    path.write_text("".join(f"line {index}\n" for index in range(1000)))
+    assert TaskRouter._tail(path, 3, block=16) == [b"line 997", b"line 998", b"line 999"]
+    assert len(TaskRouter._tail(path, 5000, block=64)) == 1000
@@ -0,0 +1,137 @@
+import asyncio
+import itertools
+import secrets
+
+import pytest
+
+from core.vault_client import (
+    SecretCache, SecretNotFound, VaultClient, VaultUnavailable, combine_shares, parse_share, split_secret
+)
+from core.vault_standin import StandInShard
+
+
+@pytest.fixture(autouse=True)
+def no_threshold_override(monkeypatch):
+    monkeypatch.delenv("VAULT_THRESHOLD", raising=False)
+
+
+def test_any_threshold_of_shares_rebuilds_the_secret():
+    secret = secrets.token_bytes(32)
+    shares = [parse_share(text) for text in split_secret(secret, 3, 5)]
+
+    for subset in itertools.combinations(shares, 3):
+        assert combine_shares(dict(subset)) == secret
+    assert combine_shares(dict(shares)) == secret
+    assert combine_shares(dict(shares[:2])) != secret
+
+
+def test_split_rejects_impossible_thresholds():
+    for threshold, shares in ((0, 3), (4, 3), (2, 256)):
+        with pytest.raises(ValueError):
+            split_secret(b"secret", threshold, shares)
+
+
+def test_parse_share_rejects_malformed_shares():
+    assert parse_share("2:00ff\n") == (2, bytearray(b"\x00\xff"))
+    for text in ("0:00", "256:00", "x:00", "00ff"):
+        with pytest.raises(ValueError):
+            parse_share(text)
+
+
+def test_combine_rejects_shares_of_different_lengths():
+    with pytest.raises(ValueError):
+        combine_shares({1: bytearray(b"ab"), 2: bytearray(b"abc")})
+
+
+def test_evicted_secrets_are_zeroized():
+    cache = SecretCache()
+    first, second = bytearray(b"first"), bytearray(b"second")
+    cache.put("a", first, ttl=60, refresh_ahead=10, max_entries=1)
+    assert cache.lookup("a") == (b"first", False)
+
+    cache.put("b", second, ttl=60, refresh_ahead=10, max_entries=1)
+    assert first == bytearray(5) and cache.lookup("a") is None
+
+    cache.clear()
+    assert second == bytearray(6) and len(cache) == 0
+
+
+def test_cache_reports_refresh_due_then_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("core.vault_client.time.monotonic", lambda: now[0])
+    cache = SecretCache()
+    secret = bytearray(b"value")
+    cache.put("key", secret, ttl=60, refresh_ahead=10, max_entries=10)
+
+    now[0] += 55
+    assert cache.lookup("key") == (b"value", True)
+    now[0] += 5
+    assert cache.lookup("key") is None
+    assert secret == bytearray(5)
+
+
+def run_vault(scenario, shards=3, threshold=2, **settings):
+    async def main():
+        stand_ins = [StandInShard(index + 1, threshold, shards) for index in range(shards)]
+        ports = [await shard.start() for shard in stand_ins]
+        client = VaultClient({
+            "enabled": True, "threshold": threshold, "timeout_ms": 500,
+            "shards": [f"127.0.0.1:{port}" for port in ports], **settings
+        })
+        try:
+            return await scenario(client, stand_ins)
+        finally:
+            await client.close()
+            for shard in stand_ins:
+                await shard.close()
+    return asyncio.run(main())
+
+
+def test_store_then_get_is_cached_and_reuses_connections():
+    async def scenario(client, stand_ins):
+        await client.store("api-key", b"s3cret")
+        assert await client.get("api-key") == b"s3cret"
+        assert await client.get("api-key") == b"s3cret"
+        client.cache.evict("api-key")
+        assert await client.get("api-key") == b"s3cret"
+        return client.stats()
+
+    stats = run_vault(scenario)
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert all(shard["opened_total"] == 1 for shard in stats["shards"].values())
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def scenario(client, stand_ins):
+        await client.store("token", b"value")
+        results = await asyncio.gather(*(client.get("token") for _ in range(10)))
+        return results, client.stats(), [shard.requests_total for shard in stand_ins]
+
+    results, stats, requests = run_vault(scenario)
+    assert results == [b"value"] * 10
+    assert (stats["misses"], stats["coalesced"]) == (1, 9)
+    # One STORE and one GET per shard
+    assert requests == [2, 2, 2]
+
+
+def test_threshold_of_shards_is_enough():
+    async def scenario(client, stand_ins):
+        await client.store("token", b"value")
+        stand_ins[0].available = False
+        assert await client.get("token") == b"value"
+
+        client.cache.evict("token")
+        stand_ins[1].available = False
+        with pytest.raises(VaultUnavailable):
+            await client.get("token")
+
+    run_vault(scenario)
+
+
+def test_unknown_key_is_not_found():
+    async def scenario(client, stand_ins):
+        with pytest.raises(SecretNotFound):
+            await client.get("missing")
+        return client.stats()["failures"]
+
+    assert run_vault(scenario) == 1
@@ -1,164 +1,190 @@
 import asyncio
+import itertools
 import json
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
 
+from .shared_state import GatewayStatus, read_manifest, scan_tools
+from common.structured_logging import request_id
+
 logger = logging.getLogger(__name__)
 
 class MCPGatewayServer:
-"""MCP Protocol Server for tool integration"""
-
-def __init__(self, auth_handler, host: str = "0.0.0.0", port: int = 8080):
-self.host = host
-self.port = port
-self.auth_handler = auth_handler
-self.tools: Dict[str, Dict] = {}
-self.connections = {}
-
-# Load available tools
-self._load_tools()
-
-def _load_tools(self):
-"""Scan and register available tools"""
-tools_dir = Path("/opt/super-agent/tools-bundle")
-if not tools_dir.exists():
-logger.warning(f"Tools directory not found: {tools_dir}")
-return
-
-for tool_path in tools_dir.rglob("*.py"):
-if tool_path.name == "tool.py":
-tool_name = tool_path.parent.name
-self.tools[tool_name] = {
-"path": tool_path,
-"status": "available",
-"loaded": False
-}
-logger.info(f"📦 Registered tool: {tool_name}")
-
-async def start(self):
-"""Start TCP server"""
-server = await asyncio.start_server(
-self._handle_client,
-self.host,
-self.port
-)
-
-logger.info(f"✅ MCP Gateway listening on {self.host}:{self.port}")
-
-async with server:
-await server.serve_forever()
-
-async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
-"""Handle incoming MCP client connection"""
-peername = writer.get_extra_info('peername')
-logger.info(f"🔌 New connection from {peername}")
-
-try:
-# Authenticate first
-auth_data = await reader.readuntil(b'\n')
-if not self.auth_handler.authenticate(auth_data):
-writer.write(b"ERR: Authentication failed\n")
-await writer.drain()
-writer.close()
-return
-
-writer.write(b"OK: Authenticated\n")
-await writer.drain()
-
-# Process commands
-while True:
-data = await reader.readuntil(b'\n')
-if not data:
-break
-
-command = data.decode().strip()
-response = await self._process_command(command)
-writer.write(f"{response}\n".encode())
-await writer.drain()
-
-except asyncio.IncompleteReadError:
-logger.info(f"🔌 Connection closed by {peername}")
-except Exception as e:
-logger.error(f"❌ Error handling client {peername}: {e}")
-finally:
-writer.close()
-await writer.wait_closed()
-
-async def _process_command(self, command: str) -> str:
-"""Process MCP command"""
-parts = command.split()
-if not parts:
-return "ERR: Empty command"
-
-cmd = parts[0].upper()
-
-if cmd == "LIST_TOOLS":
-return json.dumps({
-"tools": list(self.tools.keys()),
-"count": len(self.tools)
-})
-
-elif cmd == "LOAD" and len(parts) == 2:
-tool_name = parts[1]
-return await self._load_tool(tool_name)
-
-elif cmd == "EXECUTE" and len(parts) >= 3:
-tool_name = parts[1]
-args = json.loads(" ".join(parts[2:]))
-return await self._execute_tool(tool_name, args)
-
-elif cmd == "STATUS":
-return json.dumps({
-"connections": len(self.connections),
-"tools": {
-name: {
-"status": tool["status"],
-"loaded": tool["loaded"]
-}
-for name, tool in self.tools.items()
-}
-})
-
-else:
-return f"ERR: Unknown command {cmd}"
-
-async def _load_tool(self, tool_name: str) -> str:
-"""Load a tool dynamically"""
-if tool_name not in self.tools:
-return f"ERR: Tool {tool_name} not found"
-
-tool = self.tools[tool_name]
-try:
-# Simulate tool loading
-tool["loaded"] = True
-tool["status"] = "ready"
-logger.info(f"✅ Tool loaded: {tool_name}")
-return f"OK: Tool {tool_name} loaded"
-except Exception as e:
-tool["status"] = f"error: {e}"
-return f"ERR: Failed to load {tool_name}: {e}"
-
-async def _execute_tool(self, tool_name: str, args: Dict) -> str:
-"""Execute a loaded tool"""
-if tool_name not in self.tools:
-return f"ERR: Tool {tool_name} not found"
-
-tool = self.tools[tool_name]
-if not tool["loaded"]:
-return f"ERR: Tool {tool_name} not loaded"
-
-try:
-# Simulate execution
-result = {
-"tool": tool_name,
-"status": "success",
-"output": f"Executed with args: {args}",
-"timestamp": datetime.utcnow().isoformat()
-}
-logger.info(f"⚙️ Tool executed: {tool_name}")
-return json.dumps(result)
-except Exception as e:
-logger.error(f"❌ Tool execution error: {e}")
-return f"ERR: Execution failed: {e}"
+    """MCP Protocol Server for tool integration"""
+
+    def __init__(self, auth_handler, host: str = "0.0.0.0", port: int = 8080,
+                 tools_dir: str = "/opt/super-agent/tools-bundle",
+                 manifest: Optional[str] = None, status: Optional[GatewayStatus] = None):
+        self.host = host
+        self.port = port
+        self.auth_handler = auth_handler
+        self.tools_dir = Path(tools_dir)
+        # Set when running as one of several workers; see gateway.workers
+        self.manifest = manifest
+        self.tools: Dict[str, Dict] = {}
+        self._connection_ids = itertools.count(1)
+
+        # Load available tools
+        self._load_tools()
+        self.status = status or GatewayStatus.local(len(self.tools))
+
+    def _load_tools(self):
+        """Register available tools, from the shared manifest when one is given"""
+        entries = read_manifest(Path(self.manifest)) if self.manifest else scan_tools(self.tools_dir)
+        for index, entry in enumerate(entries):
+            self.tools[entry["name"]] = {
+                "index": index,
+                "path": Path(entry["path"]),
+                "status": "available",
+            }
+
+    def _is_loaded(self, tool: Dict) -> bool:
+        # A LOAD on any worker counts on all of them
+        return self.status.is_loaded(tool["index"])
+
+    async def start(self):
+        """Start TCP server"""
+        server = await asyncio.start_server(
+            self._handle_client,
+            self.host,
+            self.port,
+            # Workers bind the same port; the kernel spreads connections across them
+            reuse_port=self.status.workers > 1
+        )
+
+        logger.info("✅ MCP Gateway listening on %s:%s", self.host, self.port)
+
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle incoming MCP client connection"""
+        peername = writer.get_extra_info('peername')
+        # Each connection runs in its own task, so its log lines share this id
+        request_id.set(f"w{self.status.worker}-conn-{next(self._connection_ids)}")
+        logger.debug("🔌 New connection from %s", peername)
+        self.status.incr("connections")
+        self.status.incr("connections_total")
+
+        try:
+            # Authenticate first
+            auth_data = await reader.readuntil(b'\n')
+            if not self.auth_handler.authenticate(auth_data):
+                self.status.incr("auth_failures")
+                writer.write(b"ERR: Authentication failed\n")
+                await writer.drain()
+                writer.close()
+                return
+
+            writer.write(b"OK: Authenticated\n")
+            await writer.drain()
+
+            # Process commands
+            while True:
+                data = await reader.readuntil(b'\n')
+                if not data:
+                    break
+
+                command = data.decode().strip()
+                self.status.incr("commands_total")
+                response = await self._process_command(command)
+                if response.startswith("ERR"):
+                    self.status.incr("errors_total")
+                writer.write(f"{response}\n".encode())
+                await writer.drain()
+
+        except asyncio.IncompleteReadError:
+            logger.debug("🔌 Connection closed by %s", peername)
+        except Exception as e:
+            logger.error("❌ Error handling client %s: %s", peername, e)
+        finally:
+            self.status.incr("connections", -1)
+            writer.close()
+            await writer.wait_closed()
+
+    async def _process_command(self, command: str) -> str:
+        """Process MCP command"""
+        parts = command.split()
+        if not parts:
+            return "ERR: Empty command"
+
+        cmd = parts[0].upper()
+
+        if cmd == "LIST_TOOLS":
+            return json.dumps({
+                "tools": list(self.tools.keys()),
+                "count": len(self.tools)
+            })
+
+        elif cmd == "LOAD" and len(parts) == 2:
+            tool_name = parts[1]
+            return await self._load_tool(tool_name)
+
+        elif cmd == "EXECUTE" and len(parts) >= 3:
+            tool_name = parts[1]
+            args = json.loads(" ".join(parts[2:]))
+            return await self._execute_tool(tool_name, args)
+
+        elif cmd == "STATUS":
+            # Summed over every worker, whichever one answers
+            totals = self.status.totals()
+            return json.dumps({
+                "connections": totals["connections"],
+                "workers": self.status.workers,
+                "counters": totals,
+                "worker_connections": [
+                    self.status.worker_counters(worker)["connections_total"] for worker in range(self.status.workers)
+                ],
+                "tools": {
+                    name: {
+                        "status": "ready" if self._is_loaded(tool) else tool["status"],
+                        "loaded": self._is_loaded(tool)
+                    }
+                    for name, tool in self.tools.items()
+                }
+            })
+
+        else:
+            return f"ERR: Unknown command {cmd}"
+
+    async def _load_tool(self, tool_name: str) -> str:
+        """Load a tool dynamically"""
+        if tool_name not in self.tools:
+            return f"ERR: Tool {tool_name} not found"
+
+        tool = self.tools[tool_name]
+        try:
+            # Simulate tool loading
+            self.status.set_loaded(tool["index"])
+            tool["status"] = "ready"
+            logger.info("✅ Tool loaded: %s", tool_name)
+            return f"OK: Tool {tool_name} loaded"
+        except Exception as e:
+            tool["status"] = f"error: {e}"
+            return f"ERR: Failed to load {tool_name}: {e}"
+
+    async def _execute_tool(self, tool_name: str, args: Dict) -> str:
+        """Execute a loaded tool"""
+        if tool_name not in self.tools:
+            return f"ERR: Tool {tool_name} not found"
+
+        tool = self.tools[tool_name]
+        if not self._is_loaded(tool):
+            return f"ERR: Tool {tool_name} not loaded"
+
+        try:
+            # Simulate execution
+            result = {
+                "tool": tool_name,
+                "status": "success",
+                "output": f"Executed with args: {args}",
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            self.status.incr("executions_total")
+            logger.debug("⚙️ Tool executed: %s", tool_name)
+            return json.dumps(result)
+        except Exception as e:
+            logger.error("❌ Tool execution error: %s", e)
+            return f"ERR: Execution failed: {e}"
@@ -0,0 +1,115 @@
+import json
+import mmap
+import os
+import logging
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-worker counters; "connections" is a gauge, the rest only grow
+COUNTERS = ("connections", "connections_total", "auth_failures", "commands_total", "executions_total", "errors_total")
+
+
+def scan_tools(tools_dir: Path) -> List[Dict[str, str]]:
+    """Every <tool>/tool.py under tools_dir, in a stable order"""
+    if not tools_dir.exists():
+        logger.warning("Tools directory not found: %s", tools_dir)
+        return []
+    tools = []
+    for tool_path in sorted(tools_dir.rglob("tool.py")):
+        tools.append({"name": tool_path.parent.name, "path": str(tool_path)})
+        logger.debug("📦 Registered tool: %s", tool_path.parent.name)
+    logger.info("📦 Registered %s tools from %s", len(tools), tools_dir)
+    return tools
+
+
+def write_manifest(path: Path, tools: List[Dict[str, str]]):
+    """Written once by the supervisor, then only ever mapped read-only"""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"tools": tools}))
+    os.chmod(tmp, 0o444)
+    os.replace(tmp, path)
+
+
+def read_manifest(path: Path) -> List[Dict[str, str]]:
+    with open(path, "rb") as f:
+        # Workers share the page cache copy instead of each re-scanning the bundle
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return json.loads(mapped[:])["tools"]
+
+
+class GatewayStatus:
+    """Counters and tool load flags in one int64 array: one counter slot per worker, then one flag per tool
+
+    Each worker writes only its own slot, so no locking is needed; readers sum all slots.
+    Load flags are set-only, so concurrent writers agree.
+    """
+
+    def __init__(self, buffer, workers: int, tool_count: int, worker: int = 0,
+                 shm: Optional[shared_memory.SharedMemory] = None):
+        self.workers = workers
+        self.tool_count = tool_count
+        self.worker = worker
+        self._shm = shm
+        self._values = memoryview(buffer).cast("q")
+        self._slot = worker * len(COUNTERS)
+        self._flags = workers * len(COUNTERS)
+
+    @staticmethod
+    def size(workers: int, tool_count: int) -> int:
+        return 8 * (workers * len(COUNTERS) + tool_count)
+
+    @classmethod
+    def local(cls, tool_count: int) -> "GatewayStatus":
+        """Single-process mode: same interface over ordinary memory"""
+        return cls(bytearray(cls.size(1, tool_count)), 1, tool_count)
+
+    @classmethod
+    def create(cls, workers: int, tool_count: int) -> "GatewayStatus":
+        # New segments are zero-filled
+        shm = shared_memory.SharedMemory(create=True, size=cls.size(workers, tool_count))
+        return cls(shm.buf, workers, tool_count, shm=shm)
+
+    @classmethod
+    def attach(cls, name: str, workers: int, tool_count: int, worker: int) -> "GatewayStatus":
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm.buf, workers, tool_count, worker, shm=shm)
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._shm.name if self._shm is not None else None
+
+    def incr(self, counter: str, amount: int = 1):
+        self._values[self._slot + COUNTERS.index(counter)] += amount
+
+    def reset_gauges(self, worker: int):
+        """A dead worker's open connections died with it; its totals still count"""
+        self._values[worker * len(COUNTERS) + COUNTERS.index("connections")] = 0
+
+    def worker_counters(self, worker: int) -> Dict[str, int]:
+        start = worker * len(COUNTERS)
+        return {name: self._values[start + offset] for offset, name in enumerate(COUNTERS)}
+
+    def totals(self) -> Dict[str, int]:
+        totals = dict.fromkeys(COUNTERS, 0)
+        for worker in range(self.workers):
+            for name, value in self.worker_counters(worker).items():
+                totals[name] += value
+        return totals
+
+    def set_loaded(self, tool_index: int):
+        self._values[self._flags + tool_index] = 1
+
+    def is_loaded(self, tool_index: int) -> bool:
+        return bool(self._values[self._flags + tool_index])
+
+    def close(self):
+        self._values.release()
+        if self._shm is not None:
+            self._shm.close()
+
+    def unlink(self):
+        if self._shm is not None:
+            self._shm.unlink()
@@ -0,0 +1,100 @@
+import asyncio
+import multiprocessing
+import multiprocessing.connection
+import shutil
+import signal
+import tempfile
+import time
+import logging
+from pathlib import Path
+from typing import Dict
+
+from .shared_state import GatewayStatus, scan_tools, write_manifest
+
+logger = logging.getLogger(__name__)
+
+# A worker that dies sooner than this after starting is restarted with a delay
+MIN_WORKER_UPTIME = 1.0
+
+
+def run_worker(index: int, workers: int, host: str, port: int, manifest: str, status_name: str, tool_count: int):
+    """Worker process: one event loop serving its share of connections"""
+    # Started with spawn, so main.py's module-level LogPipeline setup has already run here
+    from .auth_handler import MCPAuthHandler
+    from .server import MCPGatewayServer
+
+    status = GatewayStatus.attach(status_name, workers, tool_count, index)
+    server = MCPGatewayServer(MCPAuthHandler(), host, port, manifest=manifest, status=status)
+    try:
+        asyncio.run(server.start())
+    except KeyboardInterrupt:
+        # Ctrl+C reaches the whole process group; the supervisor handles shutdown
+        pass
+
+
+class WorkerSupervisor:
+    """N gateway processes sharing one port via SO_REUSEPORT, one tool manifest and one status block"""
+
+    def __init__(self, host: str, port: int, tools_dir: str, workers: int):
+        self.host = host
+        self.port = port
+        self.tools_dir = Path(tools_dir)
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._started_at: Dict[int, float] = {}
+        self._stopping = False
+
+    def _spawn(self, index: int, manifest: Path, status: GatewayStatus, tool_count: int):
+        process = self._context.Process(
+            target=run_worker, name=f"mcp-gateway-{index}",
+            args=(index, self.workers, self.host, self.port, str(manifest), status.name, tool_count)
+        )
+        process.start()
+        self._processes[index] = process
+        self._started_at[index] = time.monotonic()
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+
+    def run(self):
+        # tmpfs when available: the manifest and its mappings never touch disk
+        state_dir = Path(tempfile.mkdtemp(prefix="mcp-gateway-", dir="/dev/shm" if Path("/dev/shm").is_dir() else None))
+        manifest = state_dir / "tools.manifest.json"
+        tools = scan_tools(self.tools_dir)
+        write_manifest(manifest, tools)
+        status = GatewayStatus.create(self.workers, len(tools))
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        logger.info("👷 Starting %s gateway workers on %s:%s", self.workers, self.host, self.port)
+        try:
+            for index in range(self.workers):
+                self._spawn(index, manifest, status, len(tools))
+
+            while not self._stopping:
+                sentinels = [process.sentinel for process in self._processes.values()]
+                multiprocessing.connection.wait(sentinels, timeout=1.0)
+                for index, process in list(self._processes.items()):
+                    if process.is_alive() or self._stopping:
+                        continue
+                    logger.error("❌ Gateway worker %s exited with code %s, restarting", index, process.exitcode)
+                    status.reset_gauges(index)
+                    if time.monotonic() - self._started_at[index] < MIN_WORKER_UPTIME:
+                        # e.g. the port is taken; don't spin
+                        time.sleep(MIN_WORKER_UPTIME)
+                    self._spawn(index, manifest, status, len(tools))
+        finally:
+            for process in self._processes.values():
+                if process.is_alive():
+                    process.terminate()
+            for process in self._processes.values():
+                process.join(10)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+            self._processes.clear()
+            status.close()
+            status.unlink()
+            shutil.rmtree(state_dir, ignore_errors=True)
+            logger.info("🛑 Gateway workers stopped")
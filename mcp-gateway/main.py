@@ -6,35 +6,77 @@ Handles external tool connections and authentication
 
 import asyncio
 import logging
+import os
 from pathlib import Path
+import socket
 import sys
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
+# common/ is copied into the image, and sits beside this directory in the repo
 sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent))
+
+from common.structured_logging import LogPipeline, parse_sampling
+
+# Per-connection lines are DEBUG; LOG_SAMPLING thins out high-frequency loggers,
+# e.g. LOG_SAMPLING="gateway.auth_handler=0.1"
+log_pipeline = LogPipeline(os.getenv("LOG_FILE"), console_format=os.getenv("LOG_FORMAT", "text"))
+log_pipeline.configure({
+    "level": os.getenv("LOG_LEVEL", "INFO"),
+    "sampling": parse_sampling(os.getenv("LOG_SAMPLING", "")),
+})
+logger = logging.getLogger(__name__)
 
 from gateway.server import MCPGatewayServer
 from gateway.auth_handler import MCPAuthHandler
+from gateway.workers import WorkerSupervisor
+
+def worker_count(value: str, maximum: str = "") -> int:
+    """MCP_WORKERS: a number, or "auto" for one per core this process may run on;
+    MCP_MAX_WORKERS caps either"""
+    if value == "auto":
+        # Container CPU limits and taskset show up in the affinity mask, not in cpu_count
+        try:
+            count = len(os.sched_getaffinity(0))
+        except AttributeError:
+            count = os.cpu_count() or 1
+    else:
+        count = int(value)
+    if maximum:
+        count = min(count, int(maximum))
+    return max(count, 1)
 
 class MCPGateway:
-def __init__(self, host: str = "0.0.0.0", port: int = 8080):
-self.host = host
-self.port = port
-self.auth_handler = MCPAuthHandler()
-self.server = MCPGatewayServer(self.auth_handler, host, port)
-
-logger.info(f"🔌 MCP Gateway starting on {host}:{port}")
-
-def run(self):
-"""Run the MCP gateway server"""
-try:
-asyncio.run(self.server.start())
-except KeyboardInterrupt:
-logger.info("🛑 MCP Gateway stopped")
-except Exception as e:
-logger.error(f"❌ MCP Gateway error: {e}", exc_info=True)
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080, workers: int = 1):
+        self.host = host
+        self.port = port
+        # Fails fast on a missing MCP_SECRET_KEY, before any worker starts
+        self.auth_handler = MCPAuthHandler()
+        tools_dir = os.getenv("MCP_TOOLS_DIR", "/opt/super-agent/tools-bundle")
+
+        if workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+            logger.warning("SO_REUSEPORT not supported here, running a single worker")
+            workers = 1
+        self.supervisor = WorkerSupervisor(host, port, tools_dir, workers) if workers > 1 else None
+        self.server = None if self.supervisor else MCPGatewayServer(
+            self.auth_handler, host, port, tools_dir=tools_dir
+        )
+
+        logger.info("🔌 MCP Gateway starting on %s:%s (%s worker%s)", host, port, workers, 's' if workers > 1 else '')
+
+    def run(self):
+        """Run the MCP gateway server"""
+        try:
+            if self.supervisor:
+                self.supervisor.run()
+            else:
+                asyncio.run(self.server.start())
+        except KeyboardInterrupt:
+            logger.info("🛑 MCP Gateway stopped")
+        except Exception as e:
+            logger.error("❌ MCP Gateway error: %s", e, exc_info=True)
+        finally:
+            log_pipeline.stop()
 
 if __name__ == "__main__":
-gateway = MCPGateway()
-gateway.run()
+    gateway = MCPGateway(workers=worker_count(os.getenv("MCP_WORKERS", "1"), os.getenv("MCP_MAX_WORKERS", "")))
+    gateway.run()
@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+GATEWAY_DIR = Path(__file__).resolve().parent.parent
+
+# Appended: master-agent's tests also import a top-level "main", and theirs must win
+for _path in (GATEWAY_DIR, GATEWAY_DIR.parent):
+    if str(_path) not in sys.path:
+        sys.path.append(str(_path))
@@ -0,0 +1,71 @@
+import stat
+
+import pytest
+
+from gateway.shared_state import COUNTERS, GatewayStatus, read_manifest, scan_tools, write_manifest
+
+
+@pytest.fixture
+def shared_status():
+    status = GatewayStatus.create(workers=3, tool_count=4)
+    attached = [GatewayStatus.attach(status.name, 3, 4, worker) for worker in range(3)]
+    yield status, attached
+    for view in attached:
+        view.close()
+    status.close()
+    status.unlink()
+
+
+def test_totals_sum_every_worker_slot(shared_status):
+    status, workers = shared_status
+    for worker, view in enumerate(workers):
+        view.incr("connections_total", worker + 1)
+        view.incr("commands_total", 10)
+    workers[2].incr("connections", 2)
+
+    assert status.totals() == {
+        **dict.fromkeys(COUNTERS, 0), "connections_total": 6, "commands_total": 30, "connections": 2
+    }
+    assert [status.worker_counters(worker)["connections_total"] for worker in range(3)] == [1, 2, 3]
+    # Any worker answering STATUS sees the same totals
+    assert workers[0].totals() == workers[1].totals() == status.totals()
+
+
+def test_dead_worker_keeps_its_totals_but_not_its_connections(shared_status):
+    status, workers = shared_status
+    workers[1].incr("connections", 5)
+    workers[1].incr("connections_total", 5)
+
+    status.reset_gauges(1)
+    assert status.worker_counters(1)["connections"] == 0
+    assert status.worker_counters(1)["connections_total"] == 5
+
+
+def test_tool_loads_are_visible_to_every_worker(shared_status):
+    status, workers = shared_status
+    workers[0].set_loaded(2)
+    assert [view.is_loaded(2) for view in workers] == [True] * 3
+    assert not any(view.is_loaded(tool) for view in workers for tool in (0, 1, 3))
+
+
+def test_local_status_has_the_same_interface():
+    status = GatewayStatus.local(tool_count=2)
+    status.incr("executions_total")
+    status.set_loaded(1)
+    assert status.name is None
+    assert status.totals()["executions_total"] == 1
+    assert status.is_loaded(1) and not status.is_loaded(0)
+
+
+def test_manifest_round_trip_is_read_only(tmp_path):
+    for name in ("beta", "alpha"):
+        (tmp_path / "tools" / name).mkdir(parents=True)
+        (tmp_path / "tools" / name / "tool.py").write_text("def run(**kwargs):\n    return kwargs\n")
+    manifest = tmp_path / "tools.manifest.json"
+
+    tools = scan_tools(tmp_path / "tools")
+    write_manifest(manifest, tools)
+
+    assert [tool["name"] for tool in read_manifest(manifest)] == ["alpha", "beta"]
+    assert not manifest.stat().st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+    assert scan_tools(tmp_path / "missing") == []
@@ -0,0 +1,118 @@
+import json
+import multiprocessing
+import socket
+import time
+
+import pytest
+
+from gateway.auth_handler import MCPAuthHandler
+from gateway.workers import WorkerSupervisor
+
+SECRET = "gateway-test-secret"
+
+
+def serve(port: int, tools_dir: str, workers: int):
+    WorkerSupervisor("127.0.0.1", port, tools_dir, workers).run()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Session:
+    """One authenticated gateway connection"""
+
+    def __init__(self, port: int, secret: str = SECRET):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+        self.file = self.sock.makefile("rwb")
+        self.authenticated = self.call(MCPAuthHandler(secret).generate_auth_header()).startswith("OK")
+
+    def call(self, line: str) -> str:
+        self.file.write(line.encode() + b"\n")
+        self.file.flush()
+        return self.file.readline().decode().rstrip("\n")
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def status(port: int):
+    session = Session(port)
+    try:
+        return json.loads(session.call("STATUS"))
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def gateway(tmp_path, monkeypatch):
+    """Two SO_REUSEPORT workers under a supervisor in a child process; yields the port"""
+    if not hasattr(socket, "SO_REUSEPORT"):
+        pytest.skip("SO_REUSEPORT not supported")
+    for name in ("alpha", "beta"):
+        (tmp_path / "tools" / name).mkdir(parents=True)
+        (tmp_path / "tools" / name / "tool.py").write_text("def run(**kwargs):\n    return kwargs\n")
+    # Inherited by the supervisor and its workers
+    monkeypatch.setenv("MCP_SECRET_KEY", SECRET)
+
+    port = free_port()
+    process = multiprocessing.get_context("spawn").Process(target=serve, args=(port, str(tmp_path / "tools"), 2))
+    process.start()
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            assert process.is_alive(), f"gateway exited with code {process.exitcode}"
+            assert time.monotonic() < deadline, "gateway not ready"
+            try:
+                # Ready once every worker is listening and has taken a connection
+                if all(status(port)["worker_connections"]):
+                    break
+            except OSError:
+                pass
+            time.sleep(0.05)
+        yield port
+    finally:
+        process.terminate()
+        process.join(15)
+        if process.is_alive():
+            process.kill()
+
+
+def test_status_sums_counters_across_workers(gateway):
+    before = status(gateway)
+    assert before["workers"] == 2
+
+    for _ in range(20):
+        session = Session(gateway)
+        assert session.authenticated
+        assert json.loads(session.call("LIST_TOOLS"))["count"] == 2
+        session.close()
+    rejected = Session(gateway, secret="wrong")
+    assert not rejected.authenticated
+    rejected.close()
+
+    after = status(gateway)
+    served = [now - then for now, then in zip(after["worker_connections"], before["worker_connections"])]
+    # 20 sessions, the rejected one and the STATUS connection itself
+    assert after["counters"]["connections_total"] - before["counters"]["connections_total"] == 22
+    assert sum(served) == 22
+    assert all(count > 0 for count in served), f"one worker took every connection: {served}"
+    assert after["counters"]["auth_failures"] - before["counters"]["auth_failures"] == 1
+
+
+def test_tool_loaded_on_one_worker_runs_on_all(gateway):
+    loader = Session(gateway)
+    assert loader.call("LOAD alpha").startswith("OK")
+    loader.close()
+
+    for _ in range(10):
+        session = Session(gateway)
+        assert json.loads(session.call('EXECUTE alpha {"n": 1}'))["status"] == "success"
+        assert session.call('EXECUTE beta {"n": 1}').startswith("ERR")
+        session.close()
+
+    tools = status(gateway)["tools"]
+    assert tools["alpha"]["loaded"] and not tools["beta"]["loaded"]
@@ -43,7 +43,82 @@ def generate_config(user_id: str = "default-user", protection_level: str = "para
     "alerts": {
     "email": os.getenv("ALERT_EMAIL", ""),
     "webhook": os.getenv("ALERT_WEBHOOK", ""),
-    "enable_sound": True
+    "enable_sound": True,
+    "coalesce_window_seconds": 60,
+    "max_queue": 1000,
+    "rate_per_minute": 30,
+    "burst": 10,
+    "max_retries": 3,
+    "backoff_seconds": 0.5,
+    "timeout_seconds": 5
+    },
+    "admission": {
+    "ema_alpha": 0.3,
+    "safety_margin": 1.2,
+    "headroom_mb": 256,
+    "pressure_threshold": 10.0,
+    "queue_timeout_seconds": 30,
+    "max_queue": 1000
+    },
+    "isolation": {
+    "enabled": True,
+    "memory_max_mb": 2048,
+    "cpu_max_percent": 100,
+    "cpuset": "",
+    "cgroup_root": ""
+    },
+    "shutdown": {
+    "drain_timeout_seconds": 30
+    },
+    "orchestration": {
+    "confidence_threshold": 0.9,
+    "default_timeout_ms": 5000,
+    "routing": {
+        "enabled": True, "min_share": 0.2, "max_agents": 2, "explore_rate": 0.05,
+        "max_features": 5000, "min_doc_freq": 2, "replay_records": 5000
+    }
+    },
+    "decision_cache": {
+    "enabled": False,
+    "ttl_seconds": 300,
+    "max_entries": 10000,
+    "redis": False,
+    "uncacheable_agents": []
+    },
+    "agent_pools": {
+    "default_size": 1,
+    "sizes": {"math": 2, "code": 2, "research": 2}
+    },
+    "journal": {
+    "commit_window_ms": 2.0,
+    "compact_after_records": 50000,
+    "retain_completed": 10000
+    },
+    "batch": {
+    "max_tasks": 1000,
+    "concurrency": 32
+    },
+    "events": {
+    "max_queue": 256,
+    "max_dropped": 1000,
+    "metrics_interval_seconds": 5,
+    "redis": False,
+    "unix_socket": "state/operator.sock"
+    },
+    "logging": {
+    "level": "INFO",
+    "sampling": {}
+    },
+    "vault": {
+    "enabled": False,
+    "shards": ["vault-shard-1:9000", "vault-shard-2:9001", "vault-shard-3:9002"],
+    "threshold": 2,
+    "pool_size": 4,
+    "timeout_ms": 500,
+    "cache_ttl_seconds": 300,
+    "refresh_ahead_seconds": 60,
+    "max_entries": 1000,
+    "prefetch": []
     }
     }
 
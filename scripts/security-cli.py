@@ -4,84 +4,280 @@ Security CLI for confirming operations
 """
 
 import sys
-from pathlib import Path
+import os
+import asyncio
 import argparse
 import json
-import time
-
-# Add parent to path
-sys.path.append(str(Path(__file__).parent.parent / "master-agent"))
-
-from core.acl_engine import ACLEngine
-
-def list_pending():
-"""List pending confirmations"""
-acl = ACLEngine()
-pending = acl.get_pending_confirmations()
-
-if not pending:
-print("✅ No pending confirmations")
-return
-
-print(f"📋 {len(pending)} pending confirmations:\n")
-for op_id, decision in pending.items():
-print(f"ID: {op_id}")
-print(f"Reason: {decision.reason}")
-print(f"Requires confirmation: {decision.requires_confirmation}")
-print(f"Allowed: {decision.allowed}")
-print("-" * 50)
-
-def confirm(operation_id: str, approve: bool):
-"""Confirm or deny an operation"""
-acl = ACLEngine()
-
-try:
-acl.confirm_operation(operation_id, approve)
-action = "approved" if approve else "denied"
-print(f"✅ Operation {operation_id} {action}")
-except Exception as e:
-print(f"❌ Error: {e}")
-
-def watch():
-"""Watch for pending confirmations"""
-print("👀 Watching for pending confirmations (Ctrl+C to stop)...")
-acl = ACLEngine()
-
-try:
-while True:
-pending = acl.get_pending_confirmations()
-if pending:
-print(f"\n🚨 {len(pending)} new pending confirmations!")
-list_pending()
-time.sleep(2)
-except KeyboardInterrupt:
-print("\n👋 Stopped")
+from typing import Dict, Any, List, Optional
+
+DEFAULT_URL = os.getenv("SUPER_AGENT_URL", "http://localhost:8000")
+DEFAULT_SOCKET = os.getenv("SUPER_AGENT_SOCKET", "state/operator.sock")
+ACL_TOPICS = "acl_pending,acl_resolved"
+REQUEST_TIMEOUT_SECONDS = 10.0
+
+def request_http(method: str, path: str, url: str, token: str, body: Optional[Dict[str, Any]] = None):
+    try:
+        import httpx
+    except ImportError:
+        sys.exit("❌ The http transport needs: pip install httpx")
+
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return httpx.request(method, url.rstrip("/") + path, json=body, headers=headers,
+                         timeout=REQUEST_TIMEOUT_SECONDS)
+
+async def request_unix(path: str, message: Dict[str, Any], reply_type: str) -> Dict[str, Any]:
+    """Send one message over the operator socket and return its reply, skipping streamed events"""
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        writer.write((json.dumps(message) + "\n").encode())
+        await writer.drain()
+        while True:
+            line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT_SECONDS)
+            if not line:
+                raise ConnectionError("server closed the socket")
+            reply = json.loads(line)
+            if reply.get("type") == reply_type:
+                return reply
+    finally:
+        writer.close()
+
+def fetch_pending(transport: str, url: str, token: str, socket_path: str) -> List[Dict[str, Any]]:
+    if transport == "unix":
+        return asyncio.run(request_unix(socket_path, {"type": "pending"}, "pending"))["pending"]
+    response = request_http("GET", "/api/v1/acl/pending", url, token)
+    response.raise_for_status()
+    return response.json()["pending"]
+
+def list_pending(transport: str = "http", url: str = DEFAULT_URL, token: str = "",
+                 socket_path: str = DEFAULT_SOCKET):
+    """List pending confirmations held by the running server"""
+    try:
+        pending = fetch_pending(transport, url, token, socket_path)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+    if not pending:
+        print("✅ No pending confirmations")
+        return True
+
+    print(f"📋 {len(pending)} pending confirmations:\n")
+    for item in pending:
+        print(f"ID: {item['operation_id']}")
+        print(f"Reason: {item['reason']}")
+        print("-" * 50)
+    return True
+
+def confirm(operation_id: str, approve: bool, transport: str = "http", url: str = DEFAULT_URL,
+            token: str = "", socket_path: str = DEFAULT_SOCKET):
+    """Confirm or deny an operation waiting on the running server"""
+    try:
+        if transport == "unix":
+            reply = asyncio.run(request_unix(socket_path, {
+                "type": "confirm", "operation_id": operation_id, "approved": approve
+            }, "confirm_result"))
+            error = None if reply.get("ok") else reply.get("detail")
+        else:
+            response = request_http("POST", "/api/v1/acl/confirm", url, token, {
+                "operation_id": operation_id, "approved": approve
+            })
+            error = None if response.status_code == 200 else response.json().get("detail")
+    except Exception as e:
+        error = e
+
+    if error is not None:
+        print(f"❌ Error: {error}")
+        return False
+    action = "approved" if approve else "denied"
+    print(f"✅ Operation {operation_id} {action}")
+    return True
+
+class WatchSession:
+    """Prints each confirmation once and turns typed answers into confirm messages"""
+
+    def __init__(self):
+        self.seen = set()
+        self.latest: Optional[str] = None
+
+    def show(self, event: Dict[str, Any]):
+        data = event.get("data", {})
+        operation_id = data.get("operation_id") or event.get("operation_id")
+
+        if event.get("type") == "acl_pending":
+            # Reconnects replay what is still pending; only new items are printed
+            if operation_id in self.seen:
+                return
+            self.seen.add(operation_id)
+            self.latest = operation_id
+            print(f"\n🚨 {operation_id}: {data.get('reason')}")
+            print("   answer with: y|n [operation_id]")
+        elif event.get("type") == "acl_resolved" and operation_id in self.seen:
+            action = "approved" if data.get("approved") else "denied"
+            suffix = " (expired)" if data.get("expired") else ""
+            print(f"{'✅' if data.get('approved') else '⛔'} {operation_id} {action}{suffix}")
+            if self.latest == operation_id:
+                self.latest = None
+        elif event.get("type") == "confirm_result" and not event.get("ok"):
+            print(f"❌ Error: {event.get('detail')}")
+
+    def parse_answer(self, line: str) -> Optional[Dict[str, Any]]:
+        parts = line.split()
+        if not parts:
+            return None
+        if parts[0].lower() not in ("y", "yes", "n", "no"):
+            print("answer with: y|n [operation_id]")
+            return None
+        operation_id = parts[1] if len(parts) > 1 else self.latest
+        if operation_id is None:
+            print("❌ No pending operation to answer")
+            return None
+        return {"type": "confirm", "operation_id": operation_id, "approved": parts[0].lower() in ("y", "yes")}
+
+async def watch_websocket(session: WatchSession, answers: asyncio.Queue, url: str, token: str):
+    try:
+        import websockets
+    except ImportError:
+        sys.exit("❌ The websocket transport needs: pip install websockets")
+
+    ws_url = url.replace("http", "ws", 1).rstrip("/") + f"/ws?token={token}&topics={ACL_TOPICS}"
+    async with websockets.connect(ws_url) as ws:
+        async def send_answers():
+            while True:
+                await ws.send(json.dumps(await answers.get()))
+
+        sender = asyncio.ensure_future(send_answers())
+        try:
+            async for raw in ws:
+                session.show(json.loads(raw))
+        finally:
+            sender.cancel()
+
+async def watch_unix(session: WatchSession, answers: asyncio.Queue, path: str):
+    reader, writer = await asyncio.open_unix_connection(path)
+
+    async def send_answers():
+        while True:
+            writer.write((json.dumps(await answers.get()) + "\n").encode())
+            await writer.drain()
+
+    sender = asyncio.ensure_future(send_answers())
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("server closed the socket")
+            session.show(json.loads(line))
+    finally:
+        sender.cancel()
+        writer.close()
+
+async def watch_sse(session: WatchSession, answers: asyncio.Queue, url: str, token: str):
+    try:
+        import httpx
+    except ImportError:
+        sys.exit("❌ The sse transport needs: pip install httpx")
+
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    async with httpx.AsyncClient(base_url=url, headers=headers, timeout=None) as client:
+        # SSE is one-way; answers go over the same keep-alive client
+        async def send_answers():
+            while True:
+                answer = await answers.get()
+                response = await client.post("/api/v1/acl/confirm", json={
+                    "operation_id": answer["operation_id"],
+                    "approved": answer["approved"]
+                })
+                if response.status_code != 200:
+                    print(f"❌ Error: {response.json().get('detail')}")
+
+        sender = asyncio.ensure_future(send_answers())
+        try:
+            async with client.stream("GET", "/api/v1/acl/events") as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line.startswith("data:"):
+                        session.show(json.loads(line[5:]))
+        finally:
+            sender.cancel()
+
+async def _watch(transport: str, url: str, token: str, socket_path: str):
+    session = WatchSession()
+    answers: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def read_answer():
+        line = sys.stdin.readline()
+        if not line:
+            loop.remove_reader(sys.stdin)
+            return
+        answer = session.parse_answer(line)
+        if answer is not None:
+            answers.put_nowait(answer)
+
+    try:
+        loop.add_reader(sys.stdin, read_answer)
+    except (PermissionError, ValueError):
+        # e.g. stdin redirected from a file; events are still shown
+        print("⚠️ stdin is not interactive, answers are disabled")
+
+    while True:
+        try:
+            if transport == "unix":
+                await watch_unix(session, answers, socket_path)
+            elif transport == "sse":
+                await watch_sse(session, answers, url, token)
+            else:
+                await watch_websocket(session, answers, url, token)
+        except Exception as e:
+            print(f"⚠️ Event stream lost ({e}), reconnecting...")
+        await asyncio.sleep(1)
+
+def watch(transport: str = "ws", url: str = DEFAULT_URL, token: str = "", socket_path: str = DEFAULT_SOCKET):
+    """Stream confirmations from the running server and answer them in place"""
+    print(f"👀 Watching for pending confirmations over {transport} (Ctrl+C to stop)...")
+
+    try:
+        asyncio.run(_watch(transport, url, token, socket_path))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
 
 def main():
-parser = argparse.ArgumentParser(description="Security CLI for Super Agent")
-subparsers = parser.add_subparsers(dest="command", help="Available commands")
+    parser = argparse.ArgumentParser(description="Security CLI for Super Agent")
+    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+
+    def add_connection_args(subparser, transports, default):
+        subparser.add_argument("--transport", choices=transports, default=default,
+                               help="How to reach the master agent")
+        subparser.add_argument("--url", default=DEFAULT_URL, help="Master agent base URL")
+        subparser.add_argument("--token", default=os.getenv("SUPER_AGENT_TOKEN", ""), help="API token")
+        subparser.add_argument("--socket", default=DEFAULT_SOCKET, help="Operator socket for --transport unix")
 
-# List command
-list_parser = subparsers.add_parser("list", help="List pending confirmations")
+    # List command
+    list_parser = subparsers.add_parser("list", help="List pending confirmations")
+    add_connection_args(list_parser, ["http", "unix"], "http")
 
-# Confirm command
-confirm_parser = subparsers.add_parser("confirm", help="Confirm an operation")
-confirm_parser.add_argument("operation_id", help="Operation ID")
-confirm_parser.add_argument("action", choices=["yes", "no"], help="Approve or deny")
+    # Confirm command
+    confirm_parser = subparsers.add_parser("confirm", help="Confirm an operation")
+    confirm_parser.add_argument("operation_id", help="Operation ID")
+    confirm_parser.add_argument("action", choices=["yes", "no"], help="Approve or deny")
+    add_connection_args(confirm_parser, ["http", "unix"], "http")
 
-# Watch command
-watch_parser = subparsers.add_parser("watch", help="Watch for pending confirmations")
+    # Watch command
+    watch_parser = subparsers.add_parser("watch", help="Watch for pending confirmations")
+    add_connection_args(watch_parser, ["ws", "sse", "unix"], "ws")
 
-args = parser.parse_args()
+    args = parser.parse_args()
 
-if args.command == "list":
-list_pending()
-elif args.command == "confirm":
-confirm(args.operation_id, args.action == "yes")
-elif args.command == "watch":
-watch()
-else:
-parser.print_help()
+    if args.command == "list":
+        if not list_pending(args.transport, args.url, args.token, args.socket):
+            sys.exit(1)
+    elif args.command == "confirm":
+        if not confirm(args.operation_id, args.action == "yes", args.transport, args.url, args.token, args.socket):
+            sys.exit(1)
+    elif args.command == "watch":
+        watch(args.transport, args.url, args.token, args.socket)
+    else:
+        parser.print_help()
 
 if __name__ == "__main__":
-main()
+    main()